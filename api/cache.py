@@ -0,0 +1,77 @@
+import hashlib
+import threading
+from django.core.cache import caches
+
+
+def hash_uploaded_file(file):
+    """Returns the SHA-256 hex digest of an uploaded file's contents."""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    # Rewind so the file can be read again when it is saved
+    file.seek(0)
+    return digest.hexdigest()
+
+
+class CountingCache:
+    """
+    Thin wrapper around one of the Django caches in settings.CACHES that
+    namespaces keys and keeps hit/miss counters for this process.
+    """
+
+    def __init__(self, alias, namespace):
+        self.alias = alias
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self):
+        return caches[self.alias]
+
+    def make_key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def _count(self, value):
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def get(self, key):
+        value = self.backend.get(self.make_key(key))
+        return self._count(value)
+
+    def set(self, key, value, timeout=None):
+        if timeout is None:
+            self.backend.set(self.make_key(key), value)
+        else:
+            self.backend.set(self.make_key(key), value, timeout)
+
+    async def aget(self, key):
+        value = await self.backend.aget(self.make_key(key))
+        return self._count(value)
+
+    async def aset(self, key, value, timeout=None):
+        if timeout is None:
+            await self.backend.aset(self.make_key(key), value)
+        else:
+            await self.backend.aset(self.make_key(key), value, timeout)
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Extracted resume text and parsed LLM output, keyed by the SHA-256 of the file
+resume_text_cache = CountingCache("resumes", "text")
+resume_parse_cache = CountingCache("resumes", "parsed")
@@ -0,0 +1,425 @@
+"""
+Text extraction routines that run in worker processes.
+
+This module must not import Django (or anything that does): it is imported
+by freshly spawned worker processes that have no configured settings, so
+every limit is passed in as an argument.
+
+Every extractor takes a source, which is either a file path or the file's
+contents as bytes, so uploads can be parsed without being saved first.
+"""
+import codecs
+import io
+import os
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+from html.parser import HTMLParser
+import pdfplumber
+import pypdfium2 as pdfium
+
+
+def open_source(source):
+    """A path as is, or bytes wrapped in a file object, for libraries that accept either."""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return source
+
+
+def read_source(source):
+    """The contents of a source as bytes."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def check_pdf(source, max_bytes, reject_pages, sample_pages):
+    """
+    Cheap pre-check run before any pdfplumber layout analysis. Uses pdfium to
+    read the page count and count the characters in the text layer of the
+    first sample_pages pages.
+
+    Returns the page count, or raises ValueError for oversized PDFs and PDFs
+    with no text layer (scanned or image-only documents).
+    """
+    size = len(source) if isinstance(source, (bytes, bytearray)) else os.path.getsize(source)
+    if max_bytes and size > max_bytes:
+        raise ValueError(f"PDF is too large ({size} bytes, limit is {max_bytes})")
+
+    pdf = pdfium.PdfDocument(source)
+    try:
+        page_count = len(pdf)
+        if reject_pages and page_count > reject_pages:
+            raise ValueError(f"PDF has too many pages ({page_count}, limit is {reject_pages})")
+
+        for index in range(min(page_count, sample_pages)):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            try:
+                if textpage.count_chars() > 0:
+                    return page_count
+            finally:
+                textpage.close()
+                page.close()
+        raise ValueError("PDF has no text layer; scanned or image-only resumes are not supported")
+    finally:
+        pdf.close()
+
+
+def extract_pdf_pages(source, start, stop, max_chars=None):
+    """
+    Extracts the text of pages [start, stop) with pdfplumber. Stops early
+    once max_chars characters have been collected.
+    """
+    texts = []
+    collected = 0
+    with pdfplumber.open(open_source(source), pages=range(start + 1, stop + 1)) as pdf:
+        for page in pdf.pages:
+            text = page.extract_text() or ""
+            # Drop the page's parsed objects as soon as we have its text
+            page.close()
+            texts.append(text)
+            collected += len(text)
+            if max_chars and collected >= max_chars:
+                break
+    return texts
+
+
+# WordprocessingML namespaces: transitional (what Word writes) and strict
+WORD_NAMESPACES = (
+    "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "http://purl.oclc.org/ooxml/wordprocessingml/main",
+)
+MARKUP_COMPATIBILITY_NAMESPACE = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+DOCX_HEADER_PART = re.compile(r"^word/header(\d*)\.xml$")
+DOCX_FOOTER_PART = re.compile(r"^word/footer(\d*)\.xml$")
+
+
+def _docx_parts(names, pattern):
+    """The header or footer parts in a DOCX archive, in numeric order."""
+    numbered = []
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            numbered.append((int(match.group(1) or 0), name))
+    return [name for _, name in sorted(numbered)]
+
+
+def _docx_part_lines(stream):
+    """
+    Streams one WordprocessingML part and returns its text as lines, in
+    document order. Each paragraph becomes a line and each table row a line of
+    tab-separated cells. Text box paragraphs are emitted just before the
+    paragraph that anchors them, and the legacy mc:Fallback copy of a text box
+    is skipped so its text is not duplicated.
+
+    Elements are dropped as soon as they have been read, so memory use stays
+    flat regardless of the size of the part.
+    """
+    sinks = [[]]  # Where finished lines go: the part, or the innermost table cell
+    rows = []  # Cells of the open table rows, innermost last
+    runs = []  # Text of the open paragraphs, innermost last
+    elements = []
+    skipping = 0
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        namespace, _, tag = elem.tag[1:].partition("}")
+        if event == "start":
+            elements.append(elem)
+            if namespace == MARKUP_COMPATIBILITY_NAMESPACE and tag == "Fallback":
+                skipping += 1
+            elif skipping or namespace not in WORD_NAMESPACES:
+                pass
+            elif tag == "p":
+                runs.append([])
+            elif tag == "tr":
+                rows.append([])
+            elif tag == "tc":
+                sinks.append([])
+            continue
+
+        elements.pop()
+        if namespace == MARKUP_COMPATIBILITY_NAMESPACE and tag == "Fallback":
+            skipping -= 1
+        elif skipping or namespace not in WORD_NAMESPACES:
+            pass
+        elif tag == "t" and runs:
+            runs[-1].append(elem.text or "")
+        elif tag == "tab" and runs:
+            runs[-1].append("\t")
+        elif tag in ("br", "cr") and runs:
+            runs[-1].append("\n")
+        elif tag == "p":
+            text = "".join(runs.pop())
+            # Blank paragraphs are kept as spacing in the body but not inside cells
+            if text or len(sinks) == 1:
+                sinks[-1].append(text)
+        elif tag == "tc":
+            rows[-1].append(" ".join(sinks.pop()))
+        elif tag == "tr":
+            line = "\t".join(rows.pop()).strip()
+            if line:
+                sinks[-1].append(line)
+
+        # The finished element is its parent's only remaining child
+        if elements:
+            del elements[-1][:]
+    return sinks[0]
+
+
+def extract_docx_text(source):
+    """
+    Extracts text from DOCX files without building a document model.
+
+    Streams word/document.xml with an incremental XML parser, covering
+    paragraphs, tables and text boxes in document order. Headers come before
+    the body and footers after it, with repeated headers and footers (first
+    page, even page) included once.
+    """
+    with zipfile.ZipFile(open_source(source)) as archive:
+        names = archive.namelist()
+        if "word/document.xml" not in names:
+            raise ValueError("Not a DOCX file: word/document.xml is missing")
+
+        def read_parts(parts):
+            lines = []
+            seen = set()
+            for part in parts:
+                with archive.open(part) as stream:
+                    text = "\n".join(_docx_part_lines(stream)).strip()
+                if text and text not in seen:
+                    seen.add(text)
+                    lines.append(text)
+            return lines
+
+        headers = read_parts(_docx_parts(names, DOCX_HEADER_PART))
+        with archive.open("word/document.xml") as stream:
+            body = _docx_part_lines(stream)
+        footers = read_parts(_docx_parts(names, DOCX_FOOTER_PART))
+    return "\n".join(headers + body + footers)
+
+
+def decode_text(data):
+    """Decodes a text file: UTF-8 or UTF-16 when marked or valid, else Windows-1252."""
+    if data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return data.decode("utf-16", errors="replace")
+    try:
+        return data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return data.decode("cp1252", errors="replace")
+
+
+def extract_plain_text(source):
+    """Extracts text from plain text files."""
+    return decode_text(read_source(source))
+
+
+# Tokens of an RTF document: control words with their optional numeric
+# argument, hex-escaped bytes, control symbols, group braces, and plain text
+RTF_TOKEN = re.compile(r"\\([a-z]{1,32})(-?\d{1,10})? ?|\\'([0-9a-f]{2})|\\([^a-z])|([{}])|[\r\n]+|(.)", re.I | re.S)
+
+# Destination groups whose contents are not document text
+RTF_DESTINATIONS = {
+    "fonttbl", "colortbl", "stylesheet", "info", "pict", "shppict", "nonshppict",
+    "listtable", "listoverridetable", "rsidtbl", "generator", "xmlnsdecl",
+    "themedata", "colorschememapping", "latentstyles", "datastore", "filetbl",
+    "revtbl", "object", "objdata", "fldinst", "bkmkstart", "bkmkend", "xe", "tc",
+}
+
+RTF_SPECIAL_CHARACTERS = {
+    "par": "\n", "sect": "\n", "page": "\n", "line": "\n", "row": "\n",
+    "tab": "\t", "cell": "\t",
+    "emdash": "\u2014", "endash": "\u2013", "bullet": "\u2022",
+    "lquote": "\u2018", "rquote": "\u2019", "ldblquote": "\u201c", "rdblquote": "\u201d",
+    "emspace": " ", "enspace": " ", "qmspace": " ",
+}
+
+
+def extract_rtf_text(source):
+    """
+    Extracts text from RTF files with a single pass over the control words.
+    Skips font, style and picture tables and other non-text destinations, and
+    decodes \\'hh escapes with the document's ANSI code page and \\uN escapes
+    as Unicode.
+    """
+    data = read_source(source).decode("latin-1")
+
+    codepage = "cp1252"
+    groups = []
+    ignorable = False
+    unicode_skip = 1  # Fallback characters that follow each \\uN escape
+    skip = 0
+    out = []
+    for match in RTF_TOKEN.finditer(data):
+        word, argument, hex_code, symbol, brace, char = match.groups()
+        if brace:
+            skip = 0
+            if brace == "{":
+                groups.append((unicode_skip, ignorable))
+            elif groups:
+                unicode_skip, ignorable = groups.pop()
+        elif symbol:
+            skip = 0
+            if symbol == "*":
+                ignorable = True
+            elif ignorable:
+                pass
+            elif symbol == "~":
+                out.append("\u00a0")
+            elif symbol in "{}\\":
+                out.append(symbol)
+            elif symbol in "\r\n":
+                out.append("\n")
+        elif word:
+            skip = 0
+            if word in RTF_DESTINATIONS:
+                ignorable = True
+            elif word == "ansicpg" and argument:
+                codepage = f"cp{argument}"
+            elif ignorable:
+                pass
+            elif word in RTF_SPECIAL_CHARACTERS:
+                out.append(RTF_SPECIAL_CHARACTERS[word])
+            elif word == "uc" and argument:
+                unicode_skip = int(argument)
+            elif word == "u" and argument:
+                code = int(argument)
+                out.append(chr(code + 0x10000 if code < 0 else code))
+                skip = unicode_skip
+        elif hex_code:
+            if skip:
+                skip -= 1
+            elif not ignorable:
+                try:
+                    out.append(bytes([int(hex_code, 16)]).decode(codepage, errors="replace"))
+                except LookupError:
+                    out.append(bytes([int(hex_code, 16)]).decode("cp1252", errors="replace"))
+        elif char:
+            if skip:
+                skip -= 1
+            elif not ignorable:
+                out.append(char)
+    return "".join(out).strip()
+
+
+ODT_TEXT_NAMESPACE = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+ODT_TABLE_NAMESPACE = "urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+
+
+def _odt_inline_text(elem):
+    """The text of an ODT paragraph, leaving out paragraphs nested in it (text boxes)."""
+    parts = [elem.text or ""]
+    for child in elem:
+        namespace, _, tag = child.tag[1:].partition("}")
+        if namespace != ODT_TEXT_NAMESPACE or tag in ("p", "h"):
+            pass
+        elif tag == "tab":
+            parts.append("\t")
+        elif tag == "line-break":
+            parts.append("\n")
+        elif tag == "s":
+            parts.append(" " * int(child.get(f"{{{ODT_TEXT_NAMESPACE}}}c", 1)))
+        else:
+            parts.append(_odt_inline_text(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+
+def extract_odt_text(source):
+    """
+    Extracts text from OpenDocument text files by streaming content.xml.
+    Paragraphs and headings become lines, and each table row a line of
+    tab-separated cells, in document order.
+    """
+    with zipfile.ZipFile(open_source(source)) as archive:
+        if "content.xml" not in archive.namelist():
+            raise ValueError("Not an ODT file: content.xml is missing")
+
+        sinks = [[]]
+        rows = []
+        elements = []
+        paragraphs = 0  # Open paragraphs, whose children are kept until they end
+        with archive.open("content.xml") as stream:
+            for event, elem in ET.iterparse(stream, events=("start", "end")):
+                namespace, _, tag = elem.tag[1:].partition("}")
+                paragraph = namespace == ODT_TEXT_NAMESPACE and tag in ("p", "h")
+                cell = namespace == ODT_TABLE_NAMESPACE and tag in ("table-cell", "covered-table-cell")
+                row = namespace == ODT_TABLE_NAMESPACE and tag == "table-row"
+                if event == "start":
+                    elements.append(elem)
+                    paragraphs += paragraph
+                    if row:
+                        rows.append([])
+                    elif cell:
+                        sinks.append([])
+                    continue
+
+                elements.pop()
+                if paragraph:
+                    paragraphs -= 1
+                    text = _odt_inline_text(elem)
+                    if text or len(sinks) == 1:
+                        sinks[-1].append(text)
+                elif cell:
+                    rows[-1].append(" ".join(sinks.pop()))
+                elif row:
+                    line = "\t".join(rows.pop()).strip()
+                    if line:
+                        sinks[-1].append(line)
+                if elements and not paragraphs:
+                    del elements[-1][:]
+    return "\n".join(sinks[0])
+
+
+class _HTMLTextParser(HTMLParser):
+    SKIPPED_TAGS = {"script", "style", "head", "template", "noscript"}
+    BLOCK_TAGS = {
+        "p", "div", "section", "article", "header", "footer", "aside", "main", "nav",
+        "h1", "h2", "h3", "h4", "h5", "h6", "li", "ul", "ol", "dl", "dt", "dd",
+        "table", "tr", "blockquote", "pre", "address", "hr", "br", "title",
+    }
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.lines = [[]]
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED_TAGS:
+            self.skipping += 1
+        elif tag in self.BLOCK_TAGS:
+            self.lines.append([])
+        elif tag in ("td", "th"):
+            self.lines[-1].append("\t")
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in self.BLOCK_TAGS:
+            self.lines.append([])
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED_TAGS:
+            self.skipping = max(0, self.skipping - 1)
+        elif tag in self.BLOCK_TAGS:
+            self.lines.append([])
+
+    def handle_data(self, data):
+        if not self.skipping:
+            self.lines[-1].append(data)
+
+    def text(self):
+        lines = []
+        for parts in self.lines:
+            line = "\t".join(" ".join(cell.split()) for cell in "".join(parts).split("\t")).strip()
+            if line:
+                lines.append(line)
+        return "\n".join(lines)
+
+
+def extract_html_text(source):
+    """Extracts the visible text of HTML files, one line per block element."""
+    html = decode_text(read_source(source))
+    parser = _HTMLTextParser()
+    parser.feed(html)
+    parser.close()
+    return parser.text()
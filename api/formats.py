@@ -0,0 +1,126 @@
+"""
+Registry of the resume formats the API accepts.
+
+A format is identified from the first bytes of the upload with libmagic, not
+from the file name, so unsupported and mislabeled files are rejected before
+anything is written to storage. Each format registers the function that
+extracts its text:
+
+    @resume_format("pdf", extensions=[".pdf"], mime_types=["application/pdf"])
+    def extract_text_from_pdf(file_path):
+        ...
+"""
+import os
+import zipfile
+import magic
+
+# How much of an upload is read to identify its format
+SNIFF_BYTES = 8192
+
+# Container types libmagic reports when it cannot see far enough into a ZIP
+# to tell DOCX and ODT apart; the extension decides between the candidates
+GENERIC_MIME_TYPES = {"application/zip"}
+
+
+class UnsupportedFileError(ValueError):
+    """Raised for uploads whose content is not a supported resume format."""
+
+
+class ResumeFormat:
+    def __init__(self, name, extensions, mime_types, extract):
+        self.name = name
+        self.extensions = set(extensions)
+        self.mime_types = set(mime_types)
+        self.extract = extract
+
+
+FORMATS = {}
+
+
+def resume_format(name, extensions, mime_types):
+    """Registers the decorated function as the text extractor for a format."""
+    def register(extract):
+        FORMATS[name] = ResumeFormat(name, extensions, mime_types, extract)
+        return extract
+    return register
+
+
+def supported_extensions():
+    return sorted(extension for resume_format in FORMATS.values() for extension in resume_format.extensions)
+
+
+def detect_format(head, file_name):
+    """
+    Returns the registered format of a file from its first bytes and its name.
+
+    Raises UnsupportedFileError when the content is not a registered format,
+    or when the extension claims a different format than the content.
+    """
+    mime_type = magic.from_buffer(head, mime=True)
+    extension = os.path.splitext(file_name)[1].lower()
+    candidates = [resume_format for resume_format in FORMATS.values() if mime_type in resume_format.mime_types]
+    if not candidates:
+        raise UnsupportedFileError(
+            f"Unsupported file type ({mime_type}). Supported extensions: {', '.join(supported_extensions())}"
+        )
+
+    for resume_format in candidates:
+        if extension in resume_format.extensions:
+            return resume_format.name
+    if mime_type in GENERIC_MIME_TYPES:
+        raise UnsupportedFileError(f"Unsupported file type ({mime_type} with extension '{extension}')")
+    raise UnsupportedFileError(
+        f"File extension '{extension}' does not match its content ({candidates[0].name.upper()})"
+    )
+
+
+def detect_uploaded_file_format(file):
+    """detect_format for an uploaded file; reads only its first SNIFF_BYTES bytes."""
+    file.seek(0)
+    head = file.read(SNIFF_BYTES)
+    file.seek(0)
+    return detect_format(head, file.name)
+
+
+def detect_file_format(file_path):
+    """detect_format for a file on disk."""
+    with open(file_path, "rb") as f:
+        return detect_format(f.read(SNIFF_BYTES), file_path)
+
+
+class ResumeSource:
+    """The resumes in a directory, searched recursively, or in a zip archive."""
+
+    def __init__(self, path):
+        self.path = path
+        self.archive = zipfile.ZipFile(path) if zipfile.is_zipfile(path) else None
+
+    def names(self):
+        """Names of the files with a supported extension, in a stable order; relative paths for a directory."""
+        if self.archive is not None:
+            names = [info.filename for info in self.archive.infolist() if not info.is_dir()]
+        else:
+            names = [
+                os.path.relpath(os.path.join(root, file_name), self.path)
+                for root, _, file_names in os.walk(self.path)
+                for file_name in file_names
+            ]
+        extensions = tuple(supported_extensions())
+        return sorted(name for name in names if name.lower().endswith(extensions))
+
+    def read(self, name):
+        if self.archive is not None:
+            return self.archive.read(name)
+        with open(os.path.join(self.path, name), "rb") as f:
+            return f.read()
+
+    def close(self):
+        if self.archive is not None:
+            self.archive.close()
+
+
+def get_format(name):
+    try:
+        return FORMATS[name]
+    except KeyError:
+        raise UnsupportedFileError(f"Unsupported file format: {name}")
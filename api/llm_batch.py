@@ -0,0 +1,382 @@
+"""
+Offline batch processing of LLM requests, for backfills that can wait hours
+in exchange for batch pricing.
+
+The pipeline has three steps, driven by `python manage.py llm_batch`:
+
+1. prepare: write one request per line to a JSONL file in the OpenAI Batch
+   API input format:
+
+       {"custom_id": "parse_resume:<sha256>", "method": "POST",
+        "url": "/v1/chat/completions", "body": {...chat completion kwargs...}}
+
+   The body is built exactly as call_llm builds it. Resume batches are
+   written with a manifest (`<file>.manifest.json`) that maps each resume's
+   SHA-256 to its file, since the result file only carries the custom_id.
+
+2. submit, status, fetch: hand the file to the backend selected by
+   LLM_BATCH_BACKEND, poll it, and download the result file, whose lines are
+
+       {"id": "...", "custom_id": "...",
+        "response": {"status_code": 200, "body": {...chat completion...}},
+        "error": null}
+
+3. ingest: turn the results into CandidateProfile and JobMatch rows.
+   Ingesting is idempotent: resumes whose hash is already stored and matches
+   whose candidate or job changed since the request was written are skipped,
+   so a result file can be ingested again after a crash.
+"""
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from . import llm_client
+from .cache import resume_parse_cache
+from .formats import SNIFF_BYTES, ResumeSource, detect_format
+from .llm_client import LLMError, _build_request, get_backend
+from .llm_stub import completion_for
+from .models import CandidateProfile, JobPosting, match_fingerprint
+from .serializers import CandidateProfilePromptSerializer, JobPostingPromptSerializer
+from .services import (
+    RESUME_PROMPT, RESUME_SCHEMA_VERSION, MATCH_PROMPT, build_match, bulk_create_candidates, candidate_fields,
+    extract_text_from_resume, parse_cache_key, parsed_resume, save_matches, validate_parsed_resume
+)
+from .vector_index import similar
+from .precompute import unscored
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Rows inserted per query while ingesting
+INGEST_CHUNK_SIZE = 500
+
+
+def request_line(custom_id, system_prompt, function_name, arguments):
+    """One batch input line, with the same request body call_llm would send."""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": BATCH_ENDPOINT,
+        "body": _build_request(settings.OPENAI_MODEL, system_prompt, function_name, arguments),
+    }
+
+
+def read_lines(path):
+    """The JSON objects in a JSONL file, skipping blank lines."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def manifest_path(requests_path):
+    return f"{requests_path}.manifest.json"
+
+
+def prepare_resume_batch(source, out_path):
+    """
+    Writes a parse_resume request for each resume in a directory or zip
+    archive whose contents are not stored yet. Text is extracted here, in the
+    sandboxed extraction pool. Returns (written, skipped, failures), where
+    failures maps file names to errors.
+    """
+    resumes = ResumeSource(source)
+    files = {}
+    skipped = 0
+    failures = {}
+    try:
+        with open(out_path, "w", encoding="utf-8") as out:
+            for name in resumes.names():
+                try:
+                    data = resumes.read(name)
+                    if len(data) > settings.RESUME_MAX_UPLOAD_BYTES:
+                        raise ValueError(f"File is too large ({len(data)} bytes)")
+                    content_hash = hashlib.sha256(data).hexdigest()
+                    if content_hash in files or CandidateProfile.objects.filter(resume_hash=content_hash).exists():
+                        skipped += 1
+                        continue
+                    text = extract_text_from_resume(
+                        ContentFile(data, name=os.path.basename(name)), detect_format(data[:SNIFF_BYTES], name)
+                    )
+                    if not text.strip():
+                        raise ValueError("No text could be extracted from the resume")
+                except Exception as e:
+                    failures[name] = str(e)
+                    continue
+                line = request_line(f"parse_resume:{content_hash}", RESUME_PROMPT, "parse_resume", {"resume_text": text})
+                out.write(json.dumps(line) + "\n")
+                files[content_hash] = name
+    finally:
+        resumes.close()
+
+    with open(manifest_path(out_path), "w", encoding="utf-8") as f:
+        json.dump({
+            "source": os.path.abspath(source),
+            "requests": os.path.abspath(out_path),
+            "files": files,
+            "schema_version": RESUME_SCHEMA_VERSION
+        }, f)
+    return len(files), skipped, failures
+
+
+def prepare_match_batch(out_path, candidate_ids=None, limit=None):
+    """
+    Writes a match_candidate_to_job request for each candidate (all of them
+    when candidate_ids is None) and each of its `limit` most similar job
+    postings that has no stored match for their current content. Returns the
+    number of requests written.
+    """
+    limit = limit or settings.MATCH_PRECOMPUTE_LIMIT
+    candidates = CandidateProfile.objects.order_by("id")
+    if candidate_ids is not None:
+        candidates = candidates.filter(id__in=candidate_ids)
+
+    written = 0
+    with open(out_path, "w", encoding="utf-8") as out:
+        for candidate in candidates.iterator(chunk_size=1000):
+            job_ids = [job_id for job_id, _ in similar("jobs", candidate, limit)]
+            jobs = unscored(candidate, list(JobPosting.objects.filter(id__in=job_ids).order_by("id")))
+            if not jobs:
+                continue
+            candidate_data = CandidateProfilePromptSerializer(candidate).data
+            for job in jobs:
+                custom_id = f"match_candidate_to_job:{candidate.id}:{job.id}:{match_fingerprint(candidate, job)}"
+                arguments = {"candidate_data": candidate_data, "job_data": JobPostingPromptSerializer(job).data}
+                out.write(json.dumps(request_line(custom_id, MATCH_PROMPT, "match_candidate_to_job", arguments)) + "\n")
+                written += 1
+    return written
+
+
+class OpenAIBatchBackend:
+    """The OpenAI Batch API: results within 24 hours at batch pricing."""
+
+    def submit(self, path):
+        with open(path, "rb") as f:
+            input_file = llm_client.client.files.create(file=f, purpose="batch")
+        batch = llm_client.client.batches.create(
+            input_file_id=input_file.id, endpoint=BATCH_ENDPOINT, completion_window="24h"
+        )
+        return batch.id
+
+    def status(self, batch_id):
+        batch = llm_client.client.batches.retrieve(batch_id)
+        return {
+            "id": batch.id,
+            "status": batch.status,
+            "request_counts": batch.request_counts.model_dump() if batch.request_counts else None,
+        }
+
+    def fetch(self, batch_id, out_path):
+        batch = llm_client.client.batches.retrieve(batch_id)
+        if batch.status != "completed":
+            raise LLMError(f"Batch {batch_id} is {batch.status}, not completed")
+        # Requests that failed are listed in a separate error file, in the same line format
+        with open(out_path, "wb") as out:
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if file_id:
+                    out.write(llm_client.client.files.content(file_id).read())
+
+
+class LocalBatchBackend:
+    """
+    A stand-in that runs a batch at submit time through the configured LLM
+    backend (get_backend(), so the stub server or replay recordings work) and
+    keeps its files under LLM_BATCH_DIR.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, batch_id, name):
+        return os.path.join(self.directory, batch_id, name)
+
+    def submit(self, path):
+        batch_id = f"batch_local_{uuid.uuid4().hex}"
+        os.makedirs(os.path.join(self.directory, batch_id))
+        shutil.copyfile(path, self._path(batch_id, "input.jsonl"))
+        counts = {"total": 0, "completed": 0, "failed": 0}
+        with open(self._path(batch_id, "output.jsonl"), "w", encoding="utf-8") as out:
+            for line in read_lines(self._path(batch_id, "input.jsonl")):
+                body = line["body"]
+                function_name = body["tool_choice"]["function"]["name"]
+                result = {"id": f"batch_req_{uuid.uuid4().hex}", "custom_id": line["custom_id"], "response": None, "error": None}
+                try:
+                    arguments = get_backend().complete(body, function_name)
+                    result["response"] = {"status_code": 200, "body": completion_for(body, arguments)}
+                    counts["completed"] += 1
+                except Exception as e:
+                    result["error"] = {"code": type(e).__name__, "message": str(e)}
+                    counts["failed"] += 1
+                counts["total"] += 1
+                out.write(json.dumps(result) + "\n")
+        with open(self._path(batch_id, "batch.json"), "w", encoding="utf-8") as f:
+            json.dump({"id": batch_id, "status": "completed", "request_counts": counts,
+                       "completed_at": timezone.now().isoformat()}, f)
+        return batch_id
+
+    def status(self, batch_id):
+        try:
+            with open(self._path(batch_id, "batch.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise LLMError(f"Unknown batch: {batch_id}")
+
+    def fetch(self, batch_id, out_path):
+        self.status(batch_id)
+        shutil.copyfile(self._path(batch_id, "output.jsonl"), out_path)
+
+
+def get_batch_backend():
+    """The batch backend selected by settings.LLM_BATCH_BACKEND."""
+    if settings.LLM_BATCH_BACKEND == "openai":
+        return OpenAIBatchBackend()
+    if settings.LLM_BATCH_BACKEND == "local":
+        return LocalBatchBackend(settings.LLM_BATCH_DIR)
+    raise ValueError(f"Unknown LLM batch backend: {settings.LLM_BATCH_BACKEND}")
+
+
+def result_response(result):
+    """The raw function call arguments of a successful result line; raises LLMError for a failed one."""
+    response = result.get("response")
+    if result.get("error") or not response or response.get("status_code") != 200:
+        error = result.get("error") or (response or {}).get("body", {}).get("error")
+        raise LLMError(f"Request failed: {error}")
+    tool_call = response["body"]["choices"][0]["message"]["tool_calls"][0]
+    return tool_call["function"]["arguments"]
+
+
+def result_arguments(result):
+    """The decoded function call arguments of a successful result line."""
+    return json.loads(result_response(result))
+
+
+class ResumeTexts:
+    """The resume texts in a request file, read back by hash without holding the whole file in memory."""
+
+    def __init__(self, requests_path):
+        self.file = open(requests_path, "rb")
+        self.offsets = {}
+        while True:
+            offset = self.file.tell()
+            line = self.file.readline()
+            if not line:
+                break
+            if line.strip():
+                self.offsets[json.loads(line)["custom_id"].split(":", 1)[1]] = offset
+
+    def get(self, content_hash):
+        if content_hash not in self.offsets:
+            return ""
+        self.file.seek(self.offsets[content_hash])
+        line = json.loads(self.file.readline())
+        return json.loads(line["body"]["messages"][1]["content"])["resume_text"]
+
+    def close(self):
+        self.file.close()
+
+
+def ingest_resume_results(results, manifest):
+    """Creates a candidate profile per parsed resume that is not stored yet. Returns counts."""
+    counts = {"created": 0, "skipped": 0, "failed": 0}
+    parsed = {}
+    for result in results:
+        content_hash = result["custom_id"].split(":", 1)[1]
+        try:
+            response = result_response(result)
+            validate_parsed_resume(json.loads(response))
+            parsed[content_hash] = response
+        except Exception:
+            counts["failed"] += 1
+
+    stored = set(
+        CandidateProfile.objects.filter(resume_hash__in=list(parsed)).values_list("resume_hash", flat=True)
+    )
+    counts["skipped"] = len(stored)
+    pending = [content_hash for content_hash in parsed if content_hash not in stored]
+
+    schema_version = manifest.get("schema_version", 0)
+    resumes = ResumeSource(manifest["source"])
+    texts = ResumeTexts(manifest["requests"])
+    try:
+        for start in range(0, len(pending), INGEST_CHUNK_SIZE):
+            candidates = []
+            for content_hash in pending[start:start + INGEST_CHUNK_SIZE]:
+                # Requests written before RESUME_SCHEMA_VERSION was bumped are stored under the old version
+                parsed_data = parsed_resume(texts.get(content_hash), parsed[content_hash], schema_version)
+                name = manifest["files"][content_hash]
+                stored_name = default_storage.save(f"resumes/{os.path.basename(name)}", ContentFile(resumes.read(name)))
+                candidates.append(CandidateProfile(
+                    **candidate_fields(parsed_data),
+                    resume_file=stored_name,
+                    resume_hash=content_hash
+                ))
+                if schema_version == RESUME_SCHEMA_VERSION:
+                    # An upload of the same file later is answered from the cache
+                    resume_parse_cache.set(parse_cache_key(content_hash), parsed_data)
+            try:
+                bulk_create_candidates(candidates)
+            except Exception:
+                for candidate in candidates:
+                    default_storage.delete(candidate.resume_file.name)
+                raise
+            counts["created"] += len(candidates)
+    finally:
+        texts.close()
+        resumes.close()
+    return counts
+
+
+def ingest_match_results(results):
+    """Stores the matches whose candidate and job are unchanged since the request was written. Returns counts."""
+    counts = {"created": 0, "skipped": 0, "failed": 0}
+    rows = []
+    for result in results:
+        _, candidate_id, job_id, fingerprint = result["custom_id"].split(":")
+        try:
+            rows.append((int(candidate_id), int(job_id), fingerprint, result_arguments(result)))
+        except Exception:
+            counts["failed"] += 1
+
+    for start in range(0, len(rows), INGEST_CHUNK_SIZE):
+        chunk = rows[start:start + INGEST_CHUNK_SIZE]
+        candidates = CandidateProfile.objects.in_bulk({row[0] for row in chunk})
+        jobs = JobPosting.objects.in_bulk({row[1] for row in chunk})
+        matches = []
+        for candidate_id, job_id, fingerprint, match_data in chunk:
+            candidate, job = candidates.get(candidate_id), jobs.get(job_id)
+            if candidate is None or job is None or match_fingerprint(candidate, job) != fingerprint:
+                # Deleted or edited since the request was written; the score would be stale
+                counts["skipped"] += 1
+                continue
+            try:
+                matches.append(build_match(candidate, job, match_data))
+            except Exception:
+                counts["failed"] += 1
+        save_matches(matches)
+        counts["created"] += len(matches)
+    return counts
+
+
+def ingest_results(results_path, manifest=None):
+    """
+    Stores a batch result file. Returns {"parse_resume": counts,
+    "match_candidate_to_job": counts} for the kinds of request it contained.
+    """
+    by_function = {}
+    for result in read_lines(results_path):
+        by_function.setdefault(result["custom_id"].split(":", 1)[0], []).append(result)
+
+    summary = {}
+    if "parse_resume" in by_function:
+        if manifest is None:
+            raise ValueError("Resume results need the manifest written with their request file")
+        summary["parse_resume"] = ingest_resume_results(by_function.pop("parse_resume"), manifest)
+    if "match_candidate_to_job" in by_function:
+        summary["match_candidate_to_job"] = ingest_match_results(by_function.pop("match_candidate_to_job"))
+    if by_function:
+        raise ValueError(f"Unknown request kinds in {results_path}: {', '.join(sorted(by_function))}")
+    return summary
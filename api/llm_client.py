@@ -1,11 +1,545 @@
 import os
 import json
-from openai import OpenAI
+import time
+import random
+import asyncio
+import hashlib
+import weakref
+import threading
+from email.utils import parsedate_to_datetime
+from django.conf import settings
+from openai import OpenAI, AsyncOpenAI, APIConnectionError, APIStatusError
+from .cache import CountingCache
+from .llm_recordings import RecordingWriter, load_recordings, request_key
+
+# Connection options shared by the sync and async clients. Retries are handled
+# here (see _send) rather than by the SDK, so its own retries are turned off.
+client_options = {"api_key": os.environ.get("OPENAI_API_KEY"), "max_retries": 0}
 
 # Initialize the OpenAI client
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+client = OpenAI(**client_options)
+
+# AsyncOpenAI clients hold connections bound to an event loop, so keep one per loop
+_async_clients = weakref.WeakKeyDictionary()
+
+# Responses are cached in the 'llm' cache from settings.CACHES
+llm_cache = CountingCache("llm", "llm")
+
+# Function schemas the model is forced to call, keyed by function name
+FUNCTION_SCHEMAS = {
+    "parse_resume": {
+        "name": "parse_resume",
+        "description": "Extract structured information from resume text",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Full name of the candidate"},
+                "email": {"type": "string", "description": "Email address of the candidate"},
+                "phone": {"type": "string", "description": "Phone number of the candidate"},
+                "skills": {"type": "array", "items": {"type": "string"}, "description": "List of candidate skills"},
+                "education": {
+                    "type": "array", 
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "degree": {"type": "string"},
+                            "institution": {"type": "string"},
+                            "year": {"type": "string"}
+                        }
+                    },
+                    "description": "Educational background"
+                },
+                "work_experience": {
+                    "type": "array", 
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "title": {"type": "string"},
+                            "company": {"type": "string"},
+                            "duration": {"type": "string"},
+                            "description": {"type": "string"}
+                        }
+                    },
+                    "description": "Work experience history"
+                }
+            },
+            "required": ["name", "email", "skills", "education", "work_experience"]
+        }
+    },
+    "parse_job_posting": {
+        "name": "parse_job_posting",
+        "description": "Extract structured information from job posting text",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "title": {"type": "string"},
+                "company": {"type": "string"},
+                "location": {"type": "string"},
+                "required_skills": {"type": "array", "items": {"type": "string"}},
+                "preferred_skills": {"type": "array", "items": {"type": "string"}},
+                "description": {"type": "string"},
+                "responsibilities": {"type": "array", "items": {"type": "string"}},
+                "qualifications": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": ["title", "required_skills", "description"]
+        }
+    },
+    "match_candidate_to_job": {
+        "name": "match_candidate_to_job",
+        "description": "Evaluate how well a candidate matches a job posting",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "match_score": {"type": "number", "description": "Score from 0-100 indicating match quality"},
+                "missing_skills": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "List of skills the candidate is missing for this job"
+                },
+                "summary": {
+                    "type": "string",
+                    "description": "A detailed summary of how well the candidate matches the job"
+                }
+            },
+            "required": ["match_score", "missing_skills", "summary"]
+        }
+    },
+    "match_candidate_to_jobs": {
+        "name": "match_candidate_to_jobs",
+        "description": "Evaluate how well one candidate matches each of several job postings",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "matches": {
+                    "type": "array",
+                    "description": "One entry per job posting in the input",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "job_id": {"type": "integer", "description": "The job_id of the job posting"},
+                            "match_score": {"type": "number", "description": "Score from 0-100 indicating match quality"},
+                            "missing_skills": {
+                                "type": "array",
+                                "items": {"type": "string"},
+                                "description": "List of skills the candidate is missing for this job"
+                            },
+                            "summary": {
+                                "type": "string",
+                                "description": "One or two sentences on how well the candidate matches the job"
+                            }
+                        },
+                        "required": ["job_id", "match_score", "missing_skills", "summary"]
+                    }
+                }
+            },
+            "required": ["matches"]
+        }
+    },
+
+    "generate_cover_letter": {
+        "name": "generate_cover_letter",
+        "description": "Generate a tailored cover letter based on candidate profile and job posting",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "cover_letter": {"type": "string", "description": "Complete cover letter text"}
+            },
+            "required": ["cover_letter"]
+        }
+    }
+}
+
+def make_cache_key(model, system_prompt, function_name, arguments):
+    """Builds a stable cache key from everything that determines an LLM response."""
+    payload = json.dumps(
+        {
+            "model": model,
+            "function_name": function_name,
+            "schema": FUNCTION_SCHEMAS[function_name],
+            "system_prompt": system_prompt,
+            "arguments": arguments,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class LLMError(Exception):
+    """Raised when an LLM call fails."""
+
+class LLMUnavailableError(LLMError):
+    """Raised when the LLM API is degraded: retries ran out or the circuit is open."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+# Status codes worth retrying: timeouts, conflicts, rate limits and server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+def is_retryable(error):
+    """Whether a failed call may succeed if retried."""
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES
+    # Connection errors include timeouts
+    return isinstance(error, APIConnectionError)
+
+def retry_after_seconds(error):
+    """Returns the delay the API asked for in Retry-After headers, if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, error=None):
+    """
+    Exponential backoff with full jitter for the given retry attempt (0-based).
+    A Retry-After from the API takes precedence, capped at LLM_BACKOFF_MAX.
+    """
+    retry_after = retry_after_seconds(error) if error is not None else None
+    if retry_after is not None:
+        return min(retry_after, settings.LLM_BACKOFF_MAX)
+    return random.uniform(0, min(settings.LLM_BACKOFF_MAX, settings.LLM_BACKOFF_BASE * 2 ** attempt))
+
+class TokenBucket:
+    """
+    A token bucket refilled continuously at rate_per_minute, shared by every
+    thread and event loop in the process.
+
+    reserve() takes tokens immediately, letting the balance go negative, and
+    returns how long the caller must wait before using them. Callers sleep
+    outside the lock, so waiting works the same for threads and coroutines and
+    requests are served in the order they reserved.
+    """
+
+    def __init__(self, rate_per_minute):
+        self.rate_per_minute = rate_per_minute
+        self.capacity = rate_per_minute
+        self.tokens = rate_per_minute
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        rate_per_second = self.rate_per_minute / 60
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * rate_per_second)
+        self.updated_at = now
+
+    def reserve(self, amount):
+        if not self.rate_per_minute:
+            return 0.0
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / (self.rate_per_minute / 60)
+
+    def refund(self, amount):
+        """Returns over-reserved tokens, e.g. once actual usage is known."""
+        if not self.rate_per_minute:
+            return
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+class RateLimiter:
+    """Client-side requests-per-minute and tokens-per-minute limits."""
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self, estimated_tokens):
+        """Reserves capacity for one call and returns the seconds to wait before sending it."""
+        with self.lock:
+            pause = max(0.0, self.paused_until - time.monotonic())
+        return max(pause, self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+
+    def settle(self, estimated_tokens, usage):
+        """Refunds the difference between the estimate and the tokens actually used."""
+        if usage is not None and usage.total_tokens < estimated_tokens:
+            self.tokens.refund(estimated_tokens - usage.total_tokens)
+
+    def pause(self, seconds):
+        """Holds back every caller, e.g. after the API answered 429 with a Retry-After."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+class CircuitBreaker:
+    """
+    Fails fast while the LLM API is degraded.
+
+    After failure_threshold consecutive transient failures the circuit opens
+    and calls are rejected for reset_timeout seconds. Then a single trial call
+    is let through (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def before_call(self):
+        """Raises LLMUnavailableError while the circuit is open; returns True if this call is the trial."""
+        with self.lock:
+            if self.opened_at is None:
+                return False
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0 or self.trial_in_flight:
+                raise LLMUnavailableError(
+                    "LLM API is unavailable (circuit open), try again later",
+                    retry_after=max(remaining, 1.0)
+                )
+            self.trial_in_flight = True
+            return True
+
+    def release_trial(self):
+        """Lets the next call be the trial when this one ended without an outcome, e.g. was cancelled."""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+# Shared by all threads (and event loops) of this process, so the limits
+# should be set to this process's share of the account's limits
+rate_limiter = RateLimiter(settings.LLM_REQUESTS_PER_MINUTE, settings.LLM_TOKENS_PER_MINUTE)
+circuit_breaker = CircuitBreaker(settings.LLM_CIRCUIT_FAILURE_THRESHOLD, settings.LLM_CIRCUIT_RESET_TIMEOUT)
+
+def estimate_text_tokens(value):
+    """Rough prompt token count of a JSON-serializable value, at ~4 characters per token."""
+    return len(json.dumps(value, default=str)) // 4
+
+def estimate_tokens(request):
+    """Rough token estimate for rate limiting: the prompt plus the expected completion."""
+    return estimate_text_tokens(request["messages"]) + estimate_text_tokens(request["tools"]) + settings.LLM_COMPLETION_TOKENS_ESTIMATE
+
+def _timeout_for(function_name):
+    return settings.LLM_TIMEOUTS.get(function_name, settings.LLM_TIMEOUT)
 
-def call_llm(system_prompt, function_name, arguments):
+def _on_failure(error, attempt):
+    """Records a failed attempt and returns the delay before retrying, or raises if it should not be retried."""
+    if not is_retryable(error):
+        # The API answered, so it is healthy; the request itself was bad
+        circuit_breaker.record_success()
+        raise LLMError(f"Error calling LLM API: {str(error)}") from error
+
+    circuit_breaker.record_failure()
+    if attempt >= settings.LLM_MAX_RETRIES:
+        raise LLMUnavailableError(
+            f"Error calling LLM API after {attempt + 1} attempts: {str(error)}",
+            retry_after=retry_after_seconds(error)
+        ) from error
+
+    delay = backoff_delay(attempt, error)
+    if getattr(error, "status_code", None) == 429:
+        rate_limiter.pause(delay)
+    return delay
+
+def _send(request, function_name):
+    """Sends a chat completion with rate limiting, a timeout, retries and the circuit breaker."""
+    estimated_tokens = estimate_tokens(request)
+    attempt = 0
+    while True:
+        trial = circuit_breaker.before_call()
+        try:
+            time.sleep(rate_limiter.reserve(estimated_tokens))
+            response = client.chat.completions.create(**request, timeout=_timeout_for(function_name))
+        except Exception as e:
+            time.sleep(_on_failure(e, attempt))
+            attempt += 1
+            continue
+        except BaseException:
+            # Interrupted, so nothing was learned about the API
+            if trial:
+                circuit_breaker.release_trial()
+            raise
+        circuit_breaker.record_success()
+        rate_limiter.settle(estimated_tokens, response.usage)
+        return response
+
+async def _asend(request, function_name):
+    """Async variant of _send."""
+    estimated_tokens = estimate_tokens(request)
+    attempt = 0
+    while True:
+        trial = circuit_breaker.before_call()
+        try:
+            await asyncio.sleep(rate_limiter.reserve(estimated_tokens))
+            response = await get_async_client().chat.completions.create(
+                **request, timeout=_timeout_for(function_name)
+            )
+        except Exception as e:
+            await asyncio.sleep(_on_failure(e, attempt))
+            attempt += 1
+            continue
+        except BaseException:
+            # Cancelled, e.g. the client disconnected, so nothing was learned about the API
+            if trial:
+                circuit_breaker.release_trial()
+            raise
+        circuit_breaker.record_success()
+        rate_limiter.settle(estimated_tokens, response.usage)
+        return response
+
+def get_async_client():
+    """Returns the AsyncOpenAI client for the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _async_clients:
+        _async_clients[loop] = AsyncOpenAI(**client_options)
+    return _async_clients[loop]
+
+def configure_clients(**options):
+    """Recreates the OpenAI clients with new options, e.g. the base_url of a stub server."""
+    global client
+    client_options.update(options)
+    client = OpenAI(**client_options)
+    _async_clients.clear()
+
+def _build_request(model, system_prompt, function_name, arguments):
+    """Builds the chat completion kwargs that force a call to function_name."""
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": json.dumps(arguments)}
+        ],
+        "tools": [{
+            "type": "function",
+            "function": FUNCTION_SCHEMAS[function_name]
+        }],
+        "tool_choice": {"type": "function", "function": {"name": function_name}}
+    }
+
+def _extract_arguments(response, function_name):
+    """Returns the arguments of the forced function call in a chat completion."""
+    tool_call = response.choices[0].message.tool_calls[0]
+    if tool_call.function.name != function_name:
+        raise ValueError(f"Unexpected function call: {tool_call.function.name}")
+    return tool_call.function.arguments
+
+class OpenAIBackend:
+    """Sends requests to the OpenAI API through the rate limiter, retries and circuit breaker."""
+
+    def complete(self, request, function_name):
+        response = _send(request, function_name)
+        try:
+            return _extract_arguments(response, function_name)
+        except Exception as e:
+            raise LLMError(f"Error calling LLM API: {str(e)}") from e
+
+    async def acomplete(self, request, function_name):
+        response = await _asend(request, function_name)
+        try:
+            return _extract_arguments(response, function_name)
+        except Exception as e:
+            raise LLMError(f"Error calling LLM API: {str(e)}") from e
+
+class RecordingBackend:
+    """Wraps another backend and appends every request/response pair to a JSONL file."""
+
+    def __init__(self, inner, path):
+        self.inner = inner
+        self.writer = RecordingWriter(path)
+
+    def complete(self, request, function_name):
+        started = time.monotonic()
+        response = self.inner.complete(request, function_name)
+        self.writer.append(request, function_name, response, time.monotonic() - started)
+        return response
+
+    async def acomplete(self, request, function_name):
+        started = time.monotonic()
+        response = await self.inner.acomplete(request, function_name)
+        self.writer.append(request, function_name, response, time.monotonic() - started)
+        return response
+
+class ReplayBackend:
+    """Answers requests from a recordings file without touching the network."""
+
+    def __init__(self, path):
+        self.path = path
+        self.recordings = load_recordings(path)
+
+    def complete(self, request, function_name):
+        key = request_key(request)
+        record = self.recordings.get(key)
+        if record is None:
+            raise LLMError(f"No recorded response for {function_name} request {key} in {self.path}")
+        return record["response"]
+
+    async def acomplete(self, request, function_name):
+        return self.complete(request, function_name)
+
+def make_backend(name, recordings_path):
+    """Builds the LLM backend selected by settings.LLM_BACKEND."""
+    if name == "openai":
+        return OpenAIBackend()
+    if name == "record":
+        return RecordingBackend(OpenAIBackend(), recordings_path)
+    if name == "replay":
+        return ReplayBackend(recordings_path)
+    raise ValueError(f"Unknown LLM backend: {name}")
+
+_backend = None
+
+def get_backend():
+    """Returns the LLM backend, building it from settings on first use."""
+    global _backend
+    if _backend is None:
+        _backend = make_backend(settings.LLM_BACKEND, settings.LLM_RECORDINGS_PATH)
+    return _backend
+
+def set_backend(backend):
+    """Replaces the LLM backend, e.g. for load tests."""
+    global _backend
+    _backend = backend
+
+def _cache_key_and_ttl(system_prompt, function_name, arguments):
+    """Returns the cache key and TTL for a call, or (None, None) when it is not cached."""
+    # Ensure the function exists in our schema
+    if function_name not in FUNCTION_SCHEMAS:
+        raise ValueError(f"Unknown function: {function_name}")
+
+    ttl = settings.LLM_CACHE_TTL.get(function_name)
+    if not ttl:
+        return None, None
+    return make_cache_key(settings.OPENAI_MODEL, system_prompt, function_name, arguments), ttl
+
+def call_llm(system_prompt, function_name, arguments, bypass_cache=False):
     """
     Call the OpenAI API with a function calling pattern using the v1.0.0+ client
     
@@ -13,128 +547,41 @@ def call_llm(system_prompt, function_name, arguments):
         system_prompt: Instructions for how to process the input
         function_name: The name of the function to call
         arguments: Dictionary of arguments to pass to the function
+        bypass_cache: Skip the cache lookup but still store the fresh response,
+            e.g. to regenerate a cover letter
     
     Returns:
         The function call result as a string
     """
-    # Define the function schema based on the function name
-    function_schemas = {
-        "parse_resume": {
-            "name": "parse_resume",
-            "description": "Extract structured information from resume text",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Full name of the candidate"},
-                    "email": {"type": "string", "description": "Email address of the candidate"},
-                    "phone": {"type": "string", "description": "Phone number of the candidate"},
-                    "skills": {"type": "array", "items": {"type": "string"}, "description": "List of candidate skills"},
-                    "education": {
-                        "type": "array", 
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "degree": {"type": "string"},
-                                "institution": {"type": "string"},
-                                "year": {"type": "string"}
-                            }
-                        },
-                        "description": "Educational background"
-                    },
-                    "work_experience": {
-                        "type": "array", 
-                        "items": {
-                            "type": "object",
-                            "properties": {
-                                "title": {"type": "string"},
-                                "company": {"type": "string"},
-                                "duration": {"type": "string"},
-                                "description": {"type": "string"}
-                            }
-                        },
-                        "description": "Work experience history"
-                    }
-                },
-                "required": ["name", "email", "skills", "education", "work_experience"]
-            }
-        },
-        "parse_job_posting": {
-            "name": "parse_job_posting",
-            "description": "Extract structured information from job posting text",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "title": {"type": "string"},
-                    "company": {"type": "string"},
-                    "location": {"type": "string"},
-                    "required_skills": {"type": "array", "items": {"type": "string"}},
-                    "preferred_skills": {"type": "array", "items": {"type": "string"}},
-                    "description": {"type": "string"},
-                    "responsibilities": {"type": "array", "items": {"type": "string"}},
-                    "qualifications": {"type": "array", "items": {"type": "string"}}
-                },
-                "required": ["title", "required_skills", "description"]
-            }
-        },
-        "match_candidate_to_job": {
-            "name": "match_candidate_to_job",
-            "description": "Evaluate how well a candidate matches a job posting",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "match_score": {"type": "number", "description": "Score from 0-100 indicating match quality"},
-                    "missing_skills": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "List of skills the candidate is missing for this job"
-                    },
-                    "summary": {
-                        "type": "string",
-                        "description": "A detailed summary of how well the candidate matches the job"
-                    }
-                },
-                "required": ["match_score", "missing_skills", "summary"]
-            }
-        },
+    cache_key, ttl = _cache_key_and_ttl(system_prompt, function_name, arguments)
 
-        "generate_cover_letter": {
-            "name": "generate_cover_letter",
-            "description": "Generate a tailored cover letter based on candidate profile and job posting",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "cover_letter": {"type": "string", "description": "Complete cover letter text"}
-                },
-                "required": ["cover_letter"]
-            }
-        }
-    }
+    if cache_key and not bypass_cache:
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
     
-    # Ensure the function exists in our schema
-    if function_name not in function_schemas:
-        raise ValueError(f"Unknown function: {function_name}")
-    
-    try:
-        # Call the OpenAI API with function calling - NEW API FORMAT
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # or your preferred model
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": json.dumps(arguments)}
-            ],
-            tools=[{
-                "type": "function",
-                "function": function_schemas[function_name]
-            }],
-            tool_choice={"type": "function", "function": {"name": function_name}}
-        )
-        
-        # Extract the function call result - NEW API FORMAT
-        tool_call = response.choices[0].message.tool_calls[0]
-        if tool_call.function.name == function_name:
-            return tool_call.function.arguments
-        else:
-            raise ValueError(f"Unexpected function call: {tool_call.function.name}")
-            
-    except Exception as e:
-        raise Exception(f"Error calling LLM API: {str(e)}")
\ No newline at end of file
+    request = _build_request(settings.OPENAI_MODEL, system_prompt, function_name, arguments)
+    result = get_backend().complete(request, function_name)
+
+    if cache_key:
+        llm_cache.set(cache_key, result, ttl)
+    return result
+
+async def acall_llm(system_prompt, function_name, arguments, bypass_cache=False):
+    """
+    Async variant of call_llm built on AsyncOpenAI, so an event loop can keep
+    many LLM calls in flight without holding a worker thread for each one.
+    """
+    cache_key, ttl = _cache_key_and_ttl(system_prompt, function_name, arguments)
+
+    if cache_key and not bypass_cache:
+        cached = await llm_cache.aget(cache_key)
+        if cached is not None:
+            return cached
+
+    request = _build_request(settings.OPENAI_MODEL, system_prompt, function_name, arguments)
+    result = await get_backend().acomplete(request, function_name)
+
+    if cache_key:
+        await llm_cache.aset(cache_key, result, ttl)
+    return result
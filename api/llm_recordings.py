@@ -0,0 +1,108 @@
+"""
+Recorded LLM request/response pairs, stored one JSON object per line:
+
+    {"request_id": "<sha256 of the request>", "function_name": "...",
+     "request": {...chat completion kwargs...}, "response": "<function arguments>",
+     "latency": 1.234}
+
+Shared by the record/replay backends in llm_client and by the stub server in
+llm_stub, so this module does not import Django.
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+
+
+def request_key(request):
+    """
+    Identifies a chat completion request by its messages and forced function
+    call. The model is left out so recordings replay under any model setting.
+    """
+    payload = json.dumps(
+        {
+            "messages": request["messages"],
+            "tools": request["tools"],
+            "tool_choice": request["tool_choice"],
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_recordings(path):
+    """Loads a recordings file into a dict keyed by request_id; later lines win."""
+    recordings = {}
+    if not os.path.exists(path):
+        return recordings
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                record = json.loads(line)
+                recordings[record["request_id"]] = record
+    return recordings
+
+
+class RecordingWriter:
+    """Appends records to a JSONL file, one write per line so lines never interleave."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def append(self, request, function_name, response, latency):
+        record = {
+            "request_id": request_key(request),
+            "function_name": function_name,
+            "request": request,
+            "response": response,
+            "latency": round(latency, 4),
+        }
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+
+def parse_latency(spec):
+    """
+    Parses a latency distribution spec into a function of the matched record
+    (or None) that returns a delay in seconds:
+
+        0.5 or constant:0.5      always 0.5s
+        uniform:0.2,1.5          uniform between 0.2s and 1.5s
+        normal:0.8,0.2           normal with mean 0.8s and standard deviation 0.2s
+        lognormal:-0.5,0.6       lognormal with mu -0.5 and sigma 0.6 (of the log)
+        recorded                 the latency stored with the record, else 0
+        recorded:0.5             the stored latency, else 0.5s
+    """
+    name, _, params = str(spec).partition(":")
+    try:
+        values = [float(value) for value in params.split(",") if value]
+        if not params and name not in ("constant", "uniform", "normal", "lognormal", "recorded"):
+            # A bare number is a constant latency
+            values, name = [float(name)], "constant"
+    except ValueError:
+        raise ValueError(f"Invalid latency spec: {spec}")
+
+    if name == "constant" and len(values) == 1:
+        return lambda record: values[0]
+    if name == "uniform" and len(values) == 2:
+        return lambda record: random.uniform(*values)
+    if name == "normal" and len(values) == 2:
+        return lambda record: max(0.0, random.gauss(*values))
+    if name == "lognormal" and len(values) == 2:
+        return lambda record: random.lognormvariate(*values)
+    if name == "recorded" and len(values) <= 1:
+        fallback = values[0] if values else 0.0
+        return lambda record: record.get("latency", fallback) if record else fallback
+    raise ValueError(f"Invalid latency spec: {spec}")
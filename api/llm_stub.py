@@ -0,0 +1,118 @@
+"""
+A minimal OpenAI-compatible chat completions server for benchmarks and
+offline load tests. It answers forced function calls from a recordings file
+(see llm_recordings) when one is loaded, and otherwise with placeholder
+arguments that satisfy the function's schema, after a delay drawn from a
+configurable latency distribution.
+
+This module deliberately avoids importing Django so it can run in a
+separate process.
+"""
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from .llm_recordings import load_recordings, parse_latency, request_key
+
+
+def placeholder_for(schema):
+    """Builds a value that satisfies a JSON schema with placeholder data."""
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        properties = schema.get("properties", {})
+        required = schema.get("required", list(properties))
+        return {name: placeholder_for(properties[name]) for name in required if name in properties}
+    if schema_type == "array":
+        return []
+    if schema_type in ("number", "integer"):
+        return 50
+    if schema_type == "boolean":
+        return False
+    return "stub"
+
+
+def completion_for(request_body, arguments):
+    """Wraps function call arguments in a chat completion response body."""
+    function_name = request_body["tool_choice"]["function"]["name"]
+    return {
+        "id": "chatcmpl-stub",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": request_body.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "finish_reason": "tool_calls",
+            "message": {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": "call_stub",
+                    "type": "function",
+                    "function": {"name": function_name, "arguments": arguments},
+                }],
+            },
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request_body = json.loads(self.rfile.read(length) or b"{}")
+
+        if not self.path.endswith("/chat/completions") or "tool_choice" not in request_body:
+            self.send_json(404, {"error": {"message": f"Unsupported request: {self.path}"}})
+            return
+
+        record = self.server.recordings.get(request_key(request_body))
+        if record is None and self.server.strict:
+            self.send_json(404, {"error": {"message": "No recorded response for this request"}})
+            return
+
+        time.sleep(self.server.latency(record))
+
+        if record is not None:
+            arguments = record["response"]
+        else:
+            function_name = request_body["tool_choice"]["function"]["name"]
+            schema = next(
+                tool["function"]["parameters"]
+                for tool in request_body["tools"]
+                if tool["function"]["name"] == function_name
+            )
+            arguments = json.dumps(placeholder_for(schema))
+        self.send_json(200, completion_for(request_body, arguments))
+
+    def send_json(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # Keep benchmark output readable
+        pass
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Accept bursts of hundreds of concurrent connections
+    request_queue_size = 1024
+
+    def __init__(self, address, latency=0.5, recordings_path=None, strict=False, handler_class=StubLLMHandler):
+        super().__init__(address, handler_class)
+        # A latency spec (see llm_recordings.parse_latency) or a plain number of seconds
+        self.latency = parse_latency(latency)
+        self.recordings = load_recordings(recordings_path) if recordings_path else {}
+        # Answer 404 instead of placeholder data for requests that were never recorded
+        self.strict = strict
+
+
+def serve(host="127.0.0.1", port=8001, latency=0.5, recordings_path=None, strict=False):
+    """Runs the stub server until interrupted."""
+    with StubLLMServer((host, port), latency=latency, recordings_path=recordings_path, strict=strict) as server:
+        server.serve_forever()
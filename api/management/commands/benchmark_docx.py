@@ -0,0 +1,100 @@
+import multiprocessing
+import os
+import statistics
+import tempfile
+import threading
+import time
+import docx
+from django.core.management.base import BaseCommand, CommandError
+from api.extractors import extract_docx_text
+from api.sandbox import _rss_bytes
+
+
+def python_docx_text(file_path):
+    """The previous extraction path: a full python-docx document, body paragraphs only."""
+    doc = docx.Document(file_path)
+    return "\n".join([para.text for para in doc.paragraphs])
+
+
+EXTRACTORS = {
+    'python-docx': python_docx_text,
+    'streaming': extract_docx_text,
+}
+
+
+def measure(name, file_path, repeat, results):
+    """Runs one extractor in a fresh process, reporting timings and peak RSS growth."""
+    extractor = EXTRACTORS[name]
+    pid = os.getpid()
+    baseline = _rss_bytes(pid)
+    peak = [baseline]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(0.002):
+            peak[0] = max(peak[0], _rss_bytes(pid))
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        text = extractor(file_path)
+        timings.append(time.perf_counter() - started)
+    done.set()
+    sampler.join()
+    results.put((timings, peak[0] - baseline, len(text)))
+
+
+class Command(BaseCommand):
+    help = 'Compare time and peak memory of the streaming DOCX extractor against python-docx'
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='*', help='DOCX files to extract; a synthetic resume is generated if omitted')
+        parser.add_argument('--repeat', type=int, default=5, help='Extractions per file and extractor')
+        parser.add_argument('--sections', type=int, default=500,
+                            help='Size of the generated document, in repeated resume sections')
+
+    def handle(self, *args, **options):
+        files = options['files']
+        generated = None
+        if not files:
+            generated = self.generate(options['sections'])
+            files = [generated]
+        try:
+            context = multiprocessing.get_context('spawn')
+            for file_path in files:
+                if not os.path.exists(file_path):
+                    raise CommandError(f'File not found: {file_path}')
+                self.stdout.write(self.style.SUCCESS(f'{file_path} ({os.path.getsize(file_path) / 1024:.0f} KB):'))
+                for name in EXTRACTORS:
+                    results = context.Queue()
+                    process = context.Process(target=measure, args=(name, file_path, options['repeat'], results))
+                    process.start()
+                    timings, peak_bytes, chars = results.get()
+                    process.join()
+                    self.stdout.write(
+                        f'  {name:<12} median {statistics.median(timings) * 1000:8.1f} ms, '
+                        f'peak RSS +{peak_bytes / (1024 * 1024):6.1f} MB, {chars} chars'
+                    )
+        finally:
+            if generated:
+                os.remove(generated)
+
+    def generate(self, sections):
+        """Writes a large resume-like DOCX with headers, tables and paragraphs."""
+        doc = docx.Document()
+        doc.sections[0].header.paragraphs[0].text = 'Jane Doe | jane.doe@example.com | +1 555 0100'
+        for i in range(sections):
+            doc.add_heading(f'Position {i}', level=2)
+            doc.add_paragraph('Senior Software Engineer, Example Corp, 2019 - 2023')
+            doc.add_paragraph('Built and operated Django services handling resume parsing at scale.')
+            table = doc.add_table(rows=2, cols=2)
+            table.cell(0, 0).text = 'Skills'
+            table.cell(0, 1).text = 'Python, Django, PostgreSQL, Docker'
+            table.cell(1, 0).text = 'Tools'
+            table.cell(1, 1).text = 'Git, Linux, Kubernetes'
+        fd, path = tempfile.mkstemp(suffix='.docx')
+        os.close(fd)
+        doc.save(path)
+        return path
@@ -0,0 +1,91 @@
+import asyncio
+import multiprocessing
+import socket
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from api import llm_client, llm_stub
+from api.services import MATCH_PROMPT
+
+
+class Command(BaseCommand):
+    help = 'Compare concurrent throughput of call_llm and acall_llm against a stub LLM server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='LLM calls per run')
+        parser.add_argument('--concurrency', type=int, default=200, help='Max in-flight calls on the async path')
+        parser.add_argument('--sync-workers', type=int, default=8,
+                            help='Threads on the sync path, i.e. the number of blocking WSGI workers')
+        parser.add_argument('--latency', default='0.5',
+                            help='Stub server latency: seconds or a distribution such as lognormal:-0.7,0.5')
+        parser.add_argument('--port', type=int, default=8001, help='Port for the stub server')
+
+    def handle(self, *args, **options):
+        port = options['port']
+        server = multiprocessing.get_context('spawn').Process(
+            target=llm_stub.serve,
+            kwargs={'port': port, 'latency': options['latency']},
+            daemon=True,
+        )
+        server.start()
+        try:
+            self.wait_for_port(port)
+            llm_client.configure_clients(base_url=f'http://127.0.0.1:{port}/v1', api_key='stub', max_retries=0)
+
+            sync_result = self.run_sync(self.make_calls(options['requests']), options['sync_workers'])
+            self.report('sync call_llm', options['sync_workers'], *sync_result)
+            async_result = asyncio.run(self.run_async(self.make_calls(options['requests']), options['concurrency']))
+            self.report('async acall_llm', options['concurrency'], *async_result)
+        finally:
+            server.terminate()
+            server.join()
+
+    def wait_for_port(self, port, timeout=10):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+                return
+            except OSError:
+                time.sleep(0.1)
+        raise CommandError(f'Stub LLM server did not start on port {port}')
+
+    def make_calls(self, count):
+        # A per-run nonce in the arguments keeps the response cache out of the measurement
+        nonce = time.time_ns()
+        return [
+            (MATCH_PROMPT, 'match_candidate_to_job', {'candidate_data': {'id': i, 'run': nonce}, 'job_data': {'id': i}})
+            for i in range(count)
+        ]
+
+    def run_sync(self, calls, workers):
+        def timed(call):
+            started = time.perf_counter()
+            llm_client.call_llm(*call)
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            latencies = list(executor.map(timed, calls))
+        return time.perf_counter() - started, latencies
+
+    async def run_async(self, calls, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed(call):
+            async with semaphore:
+                started = time.perf_counter()
+                await llm_client.acall_llm(*call)
+                return time.perf_counter() - started
+
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*(timed(call) for call in calls))
+        return time.perf_counter() - started, latencies
+
+    def report(self, label, concurrency, elapsed, latencies):
+        latencies = sorted(latencies)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+        self.stdout.write(self.style.SUCCESS(f'{label} (concurrency {concurrency}):'))
+        self.stdout.write(f'  {len(latencies)} calls in {elapsed:.2f}s = {len(latencies) / elapsed:.1f} calls/s')
+        self.stdout.write(f'  latency p50 {statistics.median(latencies):.3f}s, p95 {p95:.3f}s')
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from api.models import CandidateProfile, JobPosting, content_fingerprint
+from api.skill_links import link_candidate_skills, link_job_skills
+from api.skills import canonicalize_skills
+
+
+class Command(BaseCommand):
+    help = 'Rewrite stored candidate and job skills with their canonical names from the skill taxonomy'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows updated per query')
+        parser.add_argument('--dry-run', action='store_true', help='Report changes without saving them')
+
+    def handle(self, *args, **options):
+        self.canonicalize(CandidateProfile, 'skills', options)
+        self.canonicalize(JobPosting, 'required_skills', options)
+
+    def canonicalize(self, model, field, options):
+        changed = []
+        total = 0
+        # The fingerprint fields are loaded too, so content_fingerprint can be recomputed
+        for row in model.objects.only('id', *model.fingerprint_fields).iterator(chunk_size=options['batch_size']):
+            total += 1
+            skills = canonicalize_skills(getattr(row, field))
+            if skills != getattr(row, field):
+                setattr(row, field, skills)
+                row.content_fingerprint = content_fingerprint(row, model.fingerprint_fields)
+                changed.append(row)
+            if len(changed) >= options['batch_size']:
+                self.save(model, field, changed, options)
+                changed = []
+        self.save(model, field, changed, options)
+        self.stdout.write(self.style.SUCCESS(f'{model.__name__}: checked {total} rows'))
+
+    def save(self, model, field, rows, options):
+        if not rows:
+            return
+        if options['dry_run']:
+            for row in rows:
+                self.stdout.write(f'  {model.__name__} {row.id}: {getattr(row, field)}')
+        else:
+            # bulk_update sends no signals; the skill index picks the changes up on its next rebuild
+            fields = [field, 'content_fingerprint']
+            # bulk_update skips auto_now as well
+            for auto_now in [f.name for f in model._meta.concrete_fields if getattr(f, 'auto_now', False)]:
+                for row in rows:
+                    setattr(row, auto_now, timezone.now())
+                fields.append(auto_now)
+            with transaction.atomic():
+                model.objects.bulk_update(rows, fields)
+                link_skills = link_candidate_skills if model is CandidateProfile else link_job_skills
+                link_skills(rows)
+            self.stdout.write(f'  updated {len(rows)} {model.__name__} rows')
@@ -0,0 +1,199 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from api.formats import SNIFF_BYTES, ResumeSource, detect_format
+from api.llm_client import LLMUnavailableError
+from api.models import CandidateProfile
+from api.services import aparse_resume, bulk_create_candidates, candidate_fields
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}h{minutes:02d}m' if hours else f'{minutes}m{seconds:02d}s'
+
+
+class Command(BaseCommand):
+    help = (
+        'Create candidate profiles from a directory or zip archive of resumes. Text extraction runs in '
+        'the sandboxed extraction pool (EXTRACTION_WORKERS processes) and LLM parsing with a concurrency '
+        'limit. Progress is checkpointed, so running the command again resumes where it stopped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help='Directory or zip archive of resumes')
+        parser.add_argument('--concurrency', type=int, default=8, help='Resumes parsed at once')
+        parser.add_argument('--batch-size', type=int, default=100, help='Candidate profiles inserted per query')
+        parser.add_argument('--checkpoint', help='Progress file; defaults to one per source under .cache/ingest')
+        parser.add_argument('--retry-failed', action='store_true', help='Parse again the files that failed last time')
+        parser.add_argument('--progress-every', type=float, default=5.0, help='Seconds between progress lines')
+
+    def handle(self, *args, **options):
+        source = os.path.abspath(options['source'])
+        if not os.path.exists(source):
+            raise CommandError(f'Not found: {source}')
+        checkpoint_path = options['checkpoint'] or os.path.join(
+            settings.BASE_DIR, '.cache', 'ingest',
+            f'{os.path.basename(source)}-{hashlib.sha1(source.encode()).hexdigest()[:8]}.jsonl'
+        )
+
+        done = self.read_checkpoint(checkpoint_path, options['retry_failed'])
+        resumes = ResumeSource(source)
+        try:
+            entries = [name for name in resumes.names() if name not in done]
+            self.stdout.write(
+                f'{len(entries)} resumes to ingest ({len(done)} already done), checkpointing to {checkpoint_path}'
+            )
+            if not entries:
+                return
+
+            os.makedirs(os.path.dirname(checkpoint_path), exist_ok=True)
+            with open(checkpoint_path, 'a') as checkpoint:
+                self.checkpoint = checkpoint
+                # Failures are recorded from the event loop and saved batches from a worker thread
+                self.checkpoint_lock = threading.Lock()
+                asyncio.run(self.ingest(resumes, entries, options))
+        finally:
+            resumes.close()
+
+        self.report(final=True)
+        if self.unavailable:
+            raise CommandError(f'Stopped, the LLM API is unavailable: {self.unavailable}. Run again to resume.')
+
+    def read_checkpoint(self, path, retry_failed):
+        """Names already processed by earlier runs; failed ones are left out with retry_failed."""
+        done = set()
+        if not os.path.exists(path):
+            return done
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash
+                    continue
+                if record['status'] != 'failed' or not retry_failed:
+                    done.add(record['name'])
+        return done
+
+    def record(self, records):
+        with self.checkpoint_lock:
+            self.checkpoint.write(''.join(json.dumps(record) + '\n' for record in records))
+            self.checkpoint.flush()
+            os.fsync(self.checkpoint.fileno())
+
+    async def ingest(self, resumes, entries, options):
+        self.total = len(entries)
+        self.processed = self.created = self.failed = self.duplicates = 0
+        self.started = self.last_report = time.monotonic()
+        self.progress_every = options['progress_every']
+        self.unavailable = None
+        batch = []
+        flush_lock = asyncio.Lock()
+        pending = iter(entries)
+
+        async def flush():
+            nonlocal batch
+            async with flush_lock:
+                rows, batch = batch, []
+                if rows:
+                    await sync_to_async(self.save_batch)(rows)
+
+        async def work():
+            # Each worker takes the next file until there are none left or the LLM API is down
+            for name in pending:
+                if self.unavailable:
+                    return
+                try:
+                    row = await self.parse(name, resumes.read)
+                except LLMUnavailableError as e:
+                    # Not the file's fault: it stays out of the checkpoint so the next run parses it
+                    self.unavailable = str(e)
+                    return
+                self.processed += 1
+                if row is not None:
+                    batch.append(row)
+                    if len(batch) >= options['batch_size']:
+                        await flush()
+                self.report()
+
+        try:
+            await asyncio.gather(*(work() for _ in range(max(1, options['concurrency']))))
+        finally:
+            await flush()
+
+    async def parse(self, name, read):
+        """Parses and stores one resume; returns its name and unsaved profile, or None if it failed."""
+        try:
+            data = await sync_to_async(read, thread_sensitive=False)(name)
+            if len(data) > settings.RESUME_MAX_UPLOAD_BYTES:
+                raise ValueError(f'File is too large ({len(data)} bytes, limit is {settings.RESUME_MAX_UPLOAD_BYTES})')
+            content_hash = hashlib.sha256(data).hexdigest()
+            existing = await CandidateProfile.objects.filter(resume_hash=content_hash).values_list('id', flat=True).afirst()
+            if existing is not None:
+                self.duplicates += 1
+                self.record([{'name': name, 'status': 'duplicate', 'candidate_id': existing}])
+                return None
+            file_format = detect_format(data[:SNIFF_BYTES], name)
+            parsed_data = await aparse_resume(
+                ContentFile(data, name=os.path.basename(name)),
+                content_hash=content_hash,
+                file_format=file_format
+            )
+            stored_name = await sync_to_async(default_storage.save)(
+                f'resumes/{os.path.basename(name)}', ContentFile(data)
+            )
+        except LLMUnavailableError:
+            raise
+        except Exception as e:
+            self.failed += 1
+            self.record([{'name': name, 'status': 'failed', 'error': str(e)}])
+            return None
+
+        candidate = CandidateProfile(
+            **candidate_fields(parsed_data),
+            resume_file=stored_name,
+            resume_hash=content_hash
+        )
+        return name, candidate
+
+    def save_batch(self, rows):
+        """Inserts a batch of profiles, indexes them and checkpoints their files."""
+        candidates = [candidate for _, candidate in rows]
+        try:
+            bulk_create_candidates(candidates)
+        except Exception:
+            for candidate in candidates:
+                default_storage.delete(candidate.resume_file.name)
+            raise
+        self.created += len(candidates)
+        self.record([
+            {'name': name, 'status': 'created', 'candidate_id': candidate.pk}
+            for name, candidate in rows
+        ])
+
+    def report(self, final=False):
+        now = time.monotonic()
+        if not final and now - self.last_report < self.progress_every:
+            return
+        self.last_report = now
+        elapsed = now - self.started
+        rate = self.processed / elapsed if elapsed else 0.0
+        eta = format_duration((self.total - self.processed) / rate) if rate else '?'
+        line = (
+            f'{self.processed}/{self.total} files, {self.created} created, {self.duplicates} already stored, '
+            f'{self.failed} failed, '
+            f'{rate:.1f} files/s, elapsed {format_duration(elapsed)}'
+        )
+        if final:
+            self.stdout.write(self.style.SUCCESS(line))
+        else:
+            self.stdout.write(f'{line}, ETA {eta}')
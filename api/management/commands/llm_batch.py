@@ -0,0 +1,76 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from api.llm_client import LLMError
+from api.llm_batch import (
+    get_batch_backend, ingest_results, manifest_path, prepare_match_batch, prepare_resume_batch
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Parse resumes and score matches offline through batch LLM requests: prepare a JSONL request '
+        'file, submit it to LLM_BATCH_BACKEND, fetch the result file when the batch completes and ingest it'
+    )
+
+    def add_arguments(self, parser):
+        actions = parser.add_subparsers(dest='action', required=True)
+
+        prepare_resumes = actions.add_parser('prepare-resumes', help='Write parse_resume requests for new resumes')
+        prepare_resumes.add_argument('source', help='Directory or zip archive of resumes')
+        prepare_resumes.add_argument('output', help='Request file to write; its manifest is written beside it')
+
+        prepare_matches = actions.add_parser('prepare-matches', help='Write match_candidate_to_job requests for unscored pairs')
+        prepare_matches.add_argument('output', help='Request file to write')
+        prepare_matches.add_argument('--candidate', type=int, action='append',
+                                     help='Candidate ID to score (repeatable); defaults to all candidates')
+        prepare_matches.add_argument('--limit', type=int, help='Most similar job postings scored per candidate')
+
+        submit = actions.add_parser('submit', help='Submit a request file and print the batch ID')
+        submit.add_argument('input', help='Request file')
+
+        status = actions.add_parser('status', help='Show the status of a batch')
+        status.add_argument('batch_id')
+
+        fetch = actions.add_parser('fetch', help='Download the result file of a completed batch')
+        fetch.add_argument('batch_id')
+        fetch.add_argument('output', help='Result file to write')
+
+        ingest = actions.add_parser('ingest', help='Store the candidates and matches in a result file')
+        ingest.add_argument('results', help='Result file')
+        ingest.add_argument('--manifest', help='Manifest written with the resume request file')
+
+    def handle(self, *args, **options):
+        action = options['action']
+        try:
+            if action == 'prepare-resumes':
+                written, skipped, failures = prepare_resume_batch(options['source'], options['output'])
+                for name, error in failures.items():
+                    self.stderr.write(f'{name}: {error}')
+                self.stdout.write(self.style.SUCCESS(
+                    f'Wrote {written} requests to {options["output"]} ({skipped} duplicates or already stored, '
+                    f'{len(failures)} failed), manifest {manifest_path(options["output"])}'
+                ))
+            elif action == 'prepare-matches':
+                written = prepare_match_batch(options['output'], options['candidate'], options['limit'])
+                self.stdout.write(self.style.SUCCESS(f'Wrote {written} requests to {options["output"]}'))
+            elif action == 'submit':
+                batch_id = get_batch_backend().submit(options['input'])
+                self.stdout.write(self.style.SUCCESS(f'Submitted batch {batch_id}'))
+            elif action == 'status':
+                self.stdout.write(json.dumps(get_batch_backend().status(options['batch_id']), indent=2))
+            elif action == 'fetch':
+                get_batch_backend().fetch(options['batch_id'], options['output'])
+                self.stdout.write(self.style.SUCCESS(f'Wrote results to {options["output"]}'))
+            elif action == 'ingest':
+                manifest = None
+                if options['manifest']:
+                    with open(options['manifest'], 'r') as f:
+                        manifest = json.load(f)
+                summary = ingest_results(options['results'], manifest)
+                for function_name, counts in summary.items():
+                    self.stdout.write(self.style.SUCCESS(
+                        f'{function_name}: {counts["created"]} stored, {counts["skipped"]} skipped, '
+                        f'{counts["failed"]} failed'
+                    ))
+        except (OSError, ValueError, LLMError) as e:
+            raise CommandError(str(e))
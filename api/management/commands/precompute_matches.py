@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.models import CandidateProfile, JobPosting, JobMatch
+from api.precompute import MatchPrecomputer
+
+
+class Command(BaseCommand):
+    help = 'Score candidates and job postings against their most similar rows and store the matches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--candidate', type=int, action='append', default=[],
+                            help='Candidate ID to precompute (repeatable)')
+        parser.add_argument('--job', type=int, action='append', default=[],
+                            help='Job posting ID to precompute (repeatable)')
+        parser.add_argument('--limit', type=int, default=settings.MATCH_PRECOMPUTE_LIMIT,
+                            help='Most similar rows scored for each candidate or job posting')
+        parser.add_argument('--workers', type=int, default=settings.MATCH_PRECOMPUTE_WORKERS,
+                            help='Tasks running at once')
+
+    def handle(self, *args, **options):
+        candidate_ids = options['candidate']
+        job_ids = options['job']
+        if not candidate_ids and not job_ids:
+            # Catch up on rows that have never been matched, e.g. queued when a web process stopped
+            candidate_ids = list(CandidateProfile.objects.filter(jobmatch__isnull=True).values_list('id', flat=True))
+            job_ids = list(JobPosting.objects.filter(jobmatch__isnull=True).values_list('id', flat=True))
+
+        self.stdout.write(f'Precomputing matches for {len(candidate_ids)} candidates and {len(job_ids)} job postings')
+        before = JobMatch.objects.count()
+        precomputer = MatchPrecomputer(options['workers'], options['limit'])
+        for candidate_id in candidate_ids:
+            precomputer.enqueue_candidate(candidate_id)
+        for job_id in job_ids:
+            precomputer.enqueue_job(job_id)
+        precomputer.join()
+        self.stdout.write(self.style.SUCCESS(f'Stored {JobMatch.objects.count() - before} new matches'))
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from api.resume_tasks import run_worker
+
+
+class Command(BaseCommand):
+    help = 'Parse resumes uploaded in asynchronous mode; run as many workers as needed'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once no task is available')
+        parser.add_argument('--poll-interval', type=float, default=settings.RESUME_TASK_POLL_INTERVAL,
+                            help='Seconds to wait between checks when the queue is empty')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('Processing resume tasks'))
+        try:
+            run_worker(options['poll_interval'], once=options['once'])
+        except KeyboardInterrupt:
+            # A task cut short here is retried once its lease expires
+            pass
+        self.stdout.write(self.style.SUCCESS('Stopped processing resume tasks'))
@@ -0,0 +1,19 @@
+import time
+from django.core.management.base import BaseCommand
+from api.vector_index import KINDS, rebuild_vector_store
+
+
+class Command(BaseCommand):
+    help = 'Recompute the job and candidate vectors used by similar_jobs and similar_candidates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=sorted(KINDS), help='Only rebuild one kind of row')
+
+    def handle(self, *args, **options):
+        kinds = [options['kind']] if options['kind'] else sorted(KINDS)
+        for kind in kinds:
+            started = time.perf_counter()
+            count = rebuild_vector_store(kind)
+            self.stdout.write(self.style.SUCCESS(
+                f'Indexed {count} {kind} in {time.perf_counter() - started:.2f}s'
+            ))
@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from api.llm_client import LLMUnavailableError
+from api.models import CandidateProfile
+from api.services import RESUME_SCHEMA_VERSION, candidate_fields, parse_resume_text
+
+# Fields rewritten from a new parse; the resume file, its hash and text stay as stored
+REPARSED_FIELDS = [
+    'name', 'email', 'phone', 'skills', 'education', 'work_experience', 'parse_response', 'parse_schema_version'
+]
+
+
+class Command(BaseCommand):
+    help = (
+        f'Parse stored resume text again for candidate profiles parsed under a schema version older than '
+        f'{RESUME_SCHEMA_VERSION}. Only the text kept with each profile is used; resume files are not read '
+        f'or extracted again. Rows are updated as they are parsed, so running the command again resumes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=8, help='Resumes parsed at once')
+        parser.add_argument('--batch-size', type=int, default=100, help='Candidate profiles loaded per query')
+        parser.add_argument('--limit', type=int, help='Stop after this many profiles')
+        parser.add_argument('--bypass-cache', action='store_true',
+                            help='Call the LLM even when a response for the same text and prompt is cached')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the profiles that would be parsed')
+
+    def handle(self, *args, **options):
+        outdated = CandidateProfile.objects.filter(parse_schema_version__lt=RESUME_SCHEMA_VERSION)
+        pending = outdated.exclude(resume_text='')
+        without_text = outdated.filter(resume_text='').count()
+        total = pending.count()
+        if options['limit'] is not None:
+            total = min(total, options['limit'])
+        self.stdout.write(f'{total} profiles to parse again under schema version {RESUME_SCHEMA_VERSION}')
+        if without_text:
+            self.stdout.write(self.style.WARNING(
+                f'{without_text} outdated profiles have no stored text and are skipped; upload their resumes again'
+            ))
+        if options['dry_run'] or not total:
+            return
+
+        updated = failed = 0
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=max(1, options['concurrency'])) as executor:
+            while updated + failed < total:
+                batch = list(
+                    pending.filter(id__gt=last_id).order_by('id')[:min(options['batch_size'], total - updated - failed)]
+                )
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                results = executor.map(lambda candidate: self.parse(candidate, options['bypass_cache']), batch)
+                for candidate, result in zip(batch, results):
+                    if isinstance(result, LLMUnavailableError):
+                        self.stdout.write(f'{updated} profiles parsed again, {failed} failed')
+                        raise CommandError(f'Stopped, the LLM API is unavailable: {result}. Run again to resume.')
+                    if isinstance(result, Exception):
+                        failed += 1
+                        self.stderr.write(f'Candidate {candidate.id}: {result}')
+                        continue
+                    for field, value in candidate_fields(result).items():
+                        if field in REPARSED_FIELDS:
+                            setattr(candidate, field, value)
+                    # save() refreshes the fingerprint, skill links and search indexes
+                    candidate.save(update_fields=REPARSED_FIELDS)
+                    updated += 1
+                self.stdout.write(f'{updated + failed}/{total} profiles, {updated} updated, {failed} failed')
+
+        self.stdout.write(self.style.SUCCESS(f'Parsed {updated} profiles again, {failed} failed'))
+
+    def parse(self, candidate, bypass_cache):
+        """Parsed data for a profile's stored text, or the exception parsing it raised."""
+        try:
+            return parse_resume_text(candidate.resume_text, bypass_cache=bypass_cache)
+        except Exception as e:
+            return e
+        finally:
+            # The 'llm' cache can be database-backed; don't leave a connection open per worker thread
+            close_old_connections()
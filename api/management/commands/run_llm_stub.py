@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+from api.llm_recordings import parse_latency
+from api.llm_stub import StubLLMServer
+
+
+class Command(BaseCommand):
+    help = 'Serve recorded LLM responses from an OpenAI-compatible stub server for offline load tests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8001)
+        parser.add_argument('--recordings', help='JSONL file written by LLM_BACKEND=record')
+        parser.add_argument('--latency', default='recorded:0.5',
+                            help='Latency per call: seconds, constant:S, uniform:MIN,MAX, normal:MEAN,STD, '
+                                 'lognormal:MU,SIGMA or recorded[:FALLBACK]')
+        parser.add_argument('--strict', action='store_true',
+                            help='Answer 404 for requests without a recording instead of placeholder data')
+
+    def handle(self, *args, **options):
+        try:
+            parse_latency(options['latency'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        server = StubLLMServer(
+            (options['host'], options['port']),
+            latency=options['latency'],
+            recordings_path=options['recordings'],
+            strict=options['strict'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Stub LLM server on http://{options['host']}:{options['port']}/v1 "
+            f"with {len(server.recordings)} recordings, latency {options['latency']}"
+        ))
+        self.stdout.write(f"Point the API at it with OPENAI_BASE_URL=http://{options['host']}:{options['port']}/v1")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
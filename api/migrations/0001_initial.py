@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CandidateProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('email', models.EmailField(max_length=254)),
+                ('phone', models.CharField(blank=True, max_length=20, null=True)),
+                ('skills', models.JSONField(default=list)),
+                ('education', models.JSONField(default=list)),
+                ('work_experience', models.JSONField(default=list)),
+                ('resume_file', models.FileField(upload_to='resumes/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('company', models.CharField(max_length=255)),
+                ('required_skills', models.JSONField()),
+                ('description', models.TextField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='JobMatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('match_score', models.IntegerField()),
+                ('missing_skills', models.JSONField()),
+                ('summary', models.TextField()),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.candidateprofile')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.jobposting')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CoverLetter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('candidate', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.candidateprofile')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='api.jobposting')),
+            ],
+        ),
+    ]
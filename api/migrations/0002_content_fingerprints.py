@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:49
+
+import hashlib
+import json
+from django.db import migrations, models
+
+# Frozen copies of api.models' fingerprint fields and hashing, as they were when this migration was written
+CANDIDATE_FINGERPRINT_FIELDS = ["name", "email", "phone", "skills", "education", "work_experience"]
+JOB_FINGERPRINT_FIELDS = ["title", "company", "required_skills", "description"]
+
+
+def content_fingerprint(instance, fields):
+    values = {field: getattr(instance, field) for field in fields}
+    payload = json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def fingerprint_rows(apps, schema_editor):
+    """Fingerprints the candidates and job postings saved before the field existed."""
+    for model_name, fields in [("CandidateProfile", CANDIDATE_FINGERPRINT_FIELDS), ("JobPosting", JOB_FINGERPRINT_FIELDS)]:
+        model = apps.get_model("api", model_name)
+        rows = []
+        for row in model.objects.only("id", *fields).iterator(chunk_size=1000):
+            row.content_fingerprint = content_fingerprint(row, fields)
+            rows.append(row)
+            if len(rows) >= 1000:
+                model.objects.bulk_update(rows, ["content_fingerprint"])
+                rows = []
+        model.objects.bulk_update(rows, ["content_fingerprint"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidateprofile',
+            name='content_fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='jobmatch',
+            name='fingerprint',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='content_fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddConstraint(
+            model_name='jobmatch',
+            constraint=models.UniqueConstraint(fields=('candidate', 'job', 'fingerprint'), name='unique_match_per_fingerprint'),
+        ),
+        migrations.RunPython(fingerprint_rows, migrations.RunPython.noop),
+    ]
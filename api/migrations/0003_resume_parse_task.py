@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:53
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_content_fingerprints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeParseTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=16)),
+                ('stage', models.CharField(blank=True, choices=[('extracting', 'Extracting text'), ('parsing', 'Parsing'), ('saving', 'Saving')], max_length=16)),
+                ('resume_file', models.FileField(blank=True, upload_to='resumes/')),
+                ('file_format', models.CharField(max_length=16)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('candidate', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='api.candidateprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'available_at'], name='api_resumep_status_5285bf_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:01
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Built with CREATE INDEX CONCURRENTLY so large tables stay writable meanwhile
+    atomic = False
+
+    dependencies = [
+        ('api', '0004_candidate_resume_hash'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='candidateprofile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['skills'], name='api_candida_skills_0acdb9_gin'),
+        ),
+        AddIndexConcurrently(
+            model_name='candidateprofile',
+            index=models.Index(fields=['email'], name='api_candida_email_9ba33f_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='candidateprofile',
+            index=models.Index(fields=['created_at'], name='api_candida_created_2b4595_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='jobposting',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['required_skills'], name='api_jobpost_require_adf528_gin'),
+        ),
+    ]
@@ -0,0 +1,99 @@
+import json
+import os
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+# The taxonomy shipped with the app. Stored skill lists are already
+# canonicalized on write, so a lookup of whole names and synonyms gives the
+# same keys as api.skills.SkillTaxonomy.canonical without its free-text scan.
+# Rows saved before canonicalization are relinked by `canonicalize_skills`.
+TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "skills.json")
+
+
+def normalize_text(text):
+    return " ".join(str(text).lower().replace("-", " ").replace("_", " ").split())
+
+
+def clean_skill(skill):
+    return " ".join(str(skill).split()).strip(" .,;:-/|")
+
+
+def load_taxonomy():
+    """Canonical names by ID, and IDs by normalized name or synonym."""
+    names = {}
+    lookup = {}
+    if not os.path.exists(TAXONOMY_PATH):
+        return names, lookup
+    with open(TAXONOMY_PATH, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    for skill in data["skills"]:
+        names[skill["id"]] = skill["name"]
+        for synonym in [skill["name"]] + skill.get("synonyms", []) + skill.get("exact_synonyms", []):
+            lookup[normalize_text(synonym)] = skill["id"]
+    return names, lookup
+
+
+def canonical(skills, names, lookup):
+    """The row's skills keyed by canonical ID, or by normalized text when unknown."""
+    result = {}
+    # Lists of strings as a rule, but a comma-separated string is accepted as well
+    for skill in skills.split(",") if isinstance(skills, str) else skills or []:
+        if isinstance(skill, dict):
+            skill = skill.get("name", "")
+        skill_id = lookup.get(normalize_text(skill))
+        if skill_id:
+            result.setdefault(skill_id, names[skill_id])
+        elif clean_skill(skill):
+            result.setdefault(normalize_text(clean_skill(skill)), clean_skill(skill))
+    # Longer strings do not fit the Skill columns and are not skills
+    return {key: name for key, name in result.items() if len(key) <= 255 and len(name) <= 255}
+
+
+def link_batch(Skill, through, field, rows, names, lookup):
+    """Replaces the links of each (row_id, skills) pair in rows."""
+    skills_by_row = [(row_id, canonical(skills, names, lookup)) for row_id, skills in rows]
+    names_by_key = {}
+    for _, skills in skills_by_row:
+        names_by_key.update(skills)
+    if names_by_key:
+        Skill.objects.bulk_create(
+            [Skill(key=key, name=name) for key, name in names_by_key.items()], ignore_conflicts=True
+        )
+    ids = dict(Skill.objects.filter(key__in=list(names_by_key)).values_list("key", "id"))
+    through.objects.filter(**{f"{field}__in": [row_id for row_id, _ in rows]}).delete()
+    through.objects.bulk_create([
+        through(**{field: row_id, "skill_id": ids[key]})
+        for row_id, skills in skills_by_row
+        for key in skills
+    ])
+
+
+def link_rows(apps, schema_editor):
+    """Links the candidates and job postings saved before the skill tables existed, a batch at a time."""
+    Skill = apps.get_model("api", "Skill")
+    names, lookup = load_taxonomy()
+    for model_name, through_name, field, skills_field in [
+        ("CandidateProfile", "CandidateSkill", "candidate_id", "skills"),
+        ("JobPosting", "JobSkill", "job_id", "required_skills"),
+    ]:
+        model = apps.get_model("api", model_name)
+        through = apps.get_model("api", through_name)
+        rows = []
+        for row in model.objects.values_list("id", skills_field).iterator(chunk_size=BATCH_SIZE):
+            rows.append(row)
+            if len(rows) >= BATCH_SIZE:
+                link_batch(Skill, through, field, rows, names, lookup)
+                rows = []
+        link_batch(Skill, through, field, rows, names, lookup)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_skill_links'),
+    ]
+
+    operations = [
+        migrations.RunPython(link_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:07
+
+import api.models
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_jobposting_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidateprofile',
+            name='resume_text',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('title', config=models.Value('english'), weight='A'), '||', api.models.JSONBSearchVector('required_skills', 'A'), django.contrib.postgres.search.SearchConfig(models.Value('english'))), '||', django.contrib.postgres.search.SearchVector('company', config=models.Value('english'), weight='B'), django.contrib.postgres.search.SearchConfig(models.Value('english'))), '||', django.contrib.postgres.search.SearchVector('description', config=models.Value('english'), weight='C'), django.contrib.postgres.search.SearchConfig(models.Value('english'))), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddField(
+            model_name='candidateprofile',
+            name='search_vector',
+            field=models.GeneratedField(db_persist=True, expression=django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.CombinedSearchVector(django.contrib.postgres.search.SearchVector('name', config=models.Value('english'), weight='A'), '||', api.models.JSONBSearchVector('skills', 'A'), django.contrib.postgres.search.SearchConfig(models.Value('english'))), '||', api.models.JSONBSearchVector('work_experience', 'B'), django.contrib.postgres.search.SearchConfig(models.Value('english'))), '||', api.models.JSONBSearchVector('education', 'C'), django.contrib.postgres.search.SearchConfig(models.Value('english'))), '||', django.contrib.postgres.search.SearchVector('resume_text', config=models.Value('english'), weight='D'), django.contrib.postgres.search.SearchConfig(models.Value('english'))), output_field=django.contrib.postgres.search.SearchVectorField()),
+        ),
+        migrations.AddIndex(
+            model_name='candidateprofile',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='api_candida_search__a4399b_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='api_jobpost_search__7de4cf_gin'),
+        ),
+    ]
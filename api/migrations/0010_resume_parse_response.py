@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:11
+
+from django.db import migrations, models
+
+# Stored resume text and LLM responses are compressed by TOAST with pglz by
+# default; lz4 compresses and decompresses faster where the server has it.
+USE_LZ4 = """
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM pg_settings WHERE name = 'default_toast_compression' AND 'lz4' = ANY(enumvals)
+    ) THEN
+        ALTER TABLE api_candidateprofile
+            ALTER COLUMN resume_text SET COMPRESSION lz4,
+            ALTER COLUMN parse_response SET COMPRESSION lz4;
+    END IF;
+END
+$$;
+"""
+
+USE_DEFAULT_COMPRESSION = """
+ALTER TABLE api_candidateprofile
+    ALTER COLUMN resume_text SET COMPRESSION DEFAULT,
+    ALTER COLUMN parse_response SET COMPRESSION DEFAULT;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_text_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='candidateprofile',
+            name='parse_response',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='candidateprofile',
+            name='parse_schema_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunSQL(USE_LZ4, USE_DEFAULT_COMPRESSION),
+    ]
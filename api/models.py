@@ -1,6 +1,55 @@
+import hashlib
+import json
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorCombinable, SearchVectorField
 from django.db import models
+from django.db.models import Func, Value
+from django.db.models.functions import Now
+from django.utils import timezone
 
-class CandidateProfile(models.Model):
+# The fields that determine a match result; a change to any of them changes the fingerprint
+CANDIDATE_FINGERPRINT_FIELDS = ["name", "email", "phone", "skills", "education", "work_experience"]
+JOB_FINGERPRINT_FIELDS = ["title", "company", "required_skills", "description"]
+
+def content_fingerprint(instance, fields):
+    """SHA-256 of the given fields of a row."""
+    values = {field: getattr(instance, field) for field in fields}
+    payload = json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def match_fingerprint(candidate, job):
+    """Fingerprint of a candidate and job pair, from both rows' content fingerprints."""
+    return hashlib.sha256(f"{candidate.content_fingerprint}:{job.content_fingerprint}".encode("utf-8")).hexdigest()
+
+# Text search configuration of the search_vector columns and their queries
+TEXT_SEARCH_CONFIG = "english"
+
+class JSONBSearchVector(SearchVectorCombinable, Func):
+    """A weighted tsvector of every string value in a jsonb column, such as work_experience."""
+    output_field = SearchVectorField()
+    template = "setweight(jsonb_to_tsvector('%(config)s'::regconfig, %(expressions)s, '[\"string\"]'), '%(weight)s')"
+
+    def __init__(self, expression, weight):
+        super().__init__(expression, config=TEXT_SEARCH_CONFIG, weight=weight)
+
+def text_vector(field, weight):
+    return SearchVector(field, weight=weight, config=Value(TEXT_SEARCH_CONFIG))
+
+class FingerprintedModel(models.Model):
+    """A model whose content_fingerprint is recomputed from fingerprint_fields on every save."""
+    fingerprint_fields = []
+    content_fingerprint = models.CharField(max_length=64, blank=True, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.content_fingerprint = content_fingerprint(self, self.fingerprint_fields)
+        if kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "content_fingerprint"}
+        super().save(*args, **kwargs)
+
+class CandidateProfile(FingerprintedModel):
     name = models.CharField(max_length=255)
     email = models.EmailField()
     phone = models.CharField(max_length=20, blank=True, null=True)
@@ -8,26 +57,110 @@ class CandidateProfile(models.Model):
     education = models.JSONField(default=list)
     work_experience = models.JSONField(default=list)
     resume_file = models.FileField(upload_to="resumes/")
+    # SHA-256 of the resume file, so bulk imports can skip resumes already stored
+    resume_hash = models.CharField(max_length=64, blank=True, db_index=True)
+    # Text extracted from the resume file, as sent to the LLM. Postgres stores
+    # long values compressed (TOAST), so re-parsing never needs the file again
+    resume_text = models.TextField(blank=True)
+    # Raw parse_resume function call arguments returned for resume_text
+    parse_response = models.TextField(blank=True)
+    # services.RESUME_SCHEMA_VERSION the row was parsed under; 0 when unknown
+    parse_schema_version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Computed by Postgres on every write, including bulk queries
+    search_vector = models.GeneratedField(
+        expression=(
+            text_vector("name", "A") + JSONBSearchVector("skills", "A")
+            + JSONBSearchVector("work_experience", "B") + JSONBSearchVector("education", "C")
+            + text_vector("resume_text", "D")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    fingerprint_fields = CANDIDATE_FINGERPRINT_FIELDS
+
+    class Meta:
+        indexes = [
+            # Serves skill containment (@>) and overlap (?|) searches
+            GinIndex(fields=["skills"]),
+            GinIndex(fields=["search_vector"]),
+            models.Index(fields=["email"]),
+            models.Index(fields=["created_at"]),
+        ]
     
     def __str__(self):
         return self.name
 
-class JobPosting(models.Model):
+class JobPosting(FingerprintedModel):
     title = models.CharField(max_length=255)
     company = models.CharField(max_length=255)
     required_skills = models.JSONField()
     description = models.TextField()
+    # Part of the job list ETags. The database default covers raw
+    # saves, such as loaddata, which skip auto_now
+    updated_at = models.DateTimeField(auto_now=True, db_default=Now())
+    # Computed by Postgres on every write, including bulk queries
+    search_vector = models.GeneratedField(
+        expression=(
+            text_vector("title", "A") + JSONBSearchVector("required_skills", "A")
+            + text_vector("company", "B") + text_vector("description", "C")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    fingerprint_fields = JOB_FINGERPRINT_FIELDS
+
+    class Meta:
+        indexes = [GinIndex(fields=["required_skills"]), GinIndex(fields=["search_vector"])]
 
     def __str__(self):
         return self.title
 
+class Skill(models.Model):
+    """A canonical skill (see api.skills), linked to the candidates and job postings that list it."""
+    # The taxonomy's comparison key: the skill's ID, or the normalized text of an unknown skill
+    key = models.CharField(max_length=255, unique=True)
+    name = models.CharField(max_length=255)
+    candidates = models.ManyToManyField(CandidateProfile, through="CandidateSkill", related_name="skill_links")
+    jobs = models.ManyToManyField(JobPosting, through="JobSkill", related_name="skill_links")
+
+    def __str__(self):
+        return self.name
+
+class CandidateSkill(models.Model):
+    # Both columns are covered by the composite indexes below
+    candidate = models.ForeignKey(CandidateProfile, on_delete=models.CASCADE, db_index=False)
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, db_index=False)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["candidate", "skill"], name="unique_candidate_skill")]
+        # Counts and lookups by skill read the candidate IDs from the index alone
+        indexes = [models.Index(fields=["skill", "candidate"])]
+
+class JobSkill(models.Model):
+    # Both columns are covered by the composite indexes below
+    job = models.ForeignKey(JobPosting, on_delete=models.CASCADE, db_index=False)
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, db_index=False)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["job", "skill"], name="unique_job_skill")]
+        indexes = [models.Index(fields=["skill", "job"])]
+
 class JobMatch(models.Model):
     candidate = models.ForeignKey(CandidateProfile, on_delete=models.CASCADE)
     job = models.ForeignKey(JobPosting, on_delete=models.CASCADE)
     match_score = models.IntegerField()
     missing_skills = models.JSONField()
     summary = models.TextField()
+    # match_fingerprint of the candidate and job when they were scored; null for older matches
+    fingerprint = models.CharField(max_length=64, null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["candidate", "job", "fingerprint"], name="unique_match_per_fingerprint"),
+        ]
 
     def __str__(self):
         return f"{self.candidate.name} - {self.job.title} ({self.match_score}%)"
@@ -41,3 +174,32 @@ class CoverLetter(models.Model):
 
     def __str__(self):
         return f"Cover Letter: {self.candidate.name} - {self.job.title}"
+
+class ResumeParseTask(models.Model):
+    """A stored resume upload waiting to be parsed into a CandidateProfile by a worker."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [(QUEUED, "Queued"), (RUNNING, "Running"), (DONE, "Done"), (FAILED, "Failed")]
+    STAGE_CHOICES = [("extracting", "Extracting text"), ("parsing", "Parsing"), ("saving", "Saving")]
+
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED)
+    stage = models.CharField(max_length=16, choices=STAGE_CHOICES, blank=True)
+    resume_file = models.FileField(upload_to="resumes/", blank=True)
+    file_format = models.CharField(max_length=16)
+    content_hash = models.CharField(max_length=64)
+    attempts = models.PositiveIntegerField(default=0)
+    # When a queued task may next be claimed; for a running task, when its
+    # worker's lease expires and another worker may take it over
+    available_at = models.DateTimeField(default=timezone.now)
+    error = models.TextField(blank=True)
+    candidate = models.ForeignKey(CandidateProfile, null=True, blank=True, on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "available_at"])]
+
+    def __str__(self):
+        return f"Resume task {self.id} ({self.status})"
@@ -0,0 +1,167 @@
+"""
+Background precomputation of job matches.
+
+After a resume is uploaded or a job posting is created, the views queue the
+new row here. Worker threads in the same process pick the most similar rows
+of the other kind from the local vector index (api.vector_index), score the
+pairs with the LLM and store them as JobMatch rows with their fingerprints,
+so the match endpoint can answer them without calling the LLM.
+
+A new candidate's jobs are scored first, in batches of several jobs per LLM
+call, since a recruiter is usually looking at that candidate. A new posting
+is expanded into one task per candidate, best ranked first. At most
+MATCH_PRECOMPUTE_WORKERS tasks run at once.
+
+The queue lives in memory, so work still queued when the process exits is
+lost; `python manage.py precompute_matches` scores the rows that were missed,
+and does all of the work when MATCH_PRECOMPUTE is off in the web process.
+"""
+import itertools
+import logging
+import queue
+import threading
+from django.conf import settings
+from django.db import close_old_connections
+from .models import CandidateProfile, JobPosting, JobMatch, match_fingerprint
+from .serializers import CandidateProfilePromptSerializer, JobPostingPromptSerializer
+from .services import build_match, save_matches, match_candidate_to_job, match_candidate_to_jobs
+from .vector_index import similar
+
+logger = logging.getLogger(__name__)
+
+# Lower runs first; pairs from a new posting are further ordered by rank
+PRIORITY_CANDIDATE = 0
+PRIORITY_JOB = 1
+PRIORITY_PAIR = 2
+
+
+def unscored(candidate, jobs):
+    """The jobs that have no stored match with the candidate for their current content."""
+    fingerprints = {job.id: match_fingerprint(candidate, job) for job in jobs}
+    stored = set(
+        JobMatch.objects.filter(candidate=candidate, fingerprint__in=fingerprints.values())
+        .values_list("job_id", "fingerprint")
+    )
+    return [job for job in jobs if (job.id, fingerprints[job.id]) not in stored]
+
+
+def precompute_candidate(candidate_id, limit):
+    """Scores a candidate against its `limit` most similar job postings. Returns the number of matches saved."""
+    candidate = CandidateProfile.objects.get(id=candidate_id)
+    job_ids = [job_id for job_id, _ in similar("jobs", candidate, limit)]
+    jobs = unscored(candidate, list(JobPosting.objects.filter(id__in=job_ids)))
+    if not jobs:
+        return 0
+
+    results = match_candidate_to_jobs(
+        CandidateProfilePromptSerializer(candidate).data,
+        [JobPostingPromptSerializer(job).data for job in jobs]
+    )
+    matches = []
+    for job, match_data in zip(jobs, results):
+        try:
+            matches.append(build_match(candidate, job, match_data))
+        except Exception as e:
+            logger.warning("Skipping malformed match for candidate %s and job %s: %s", candidate.id, job.id, e)
+    save_matches(matches)
+    return len(matches)
+
+
+def candidates_to_score(job_id, limit):
+    """IDs of the job posting's `limit` most similar candidates that have no stored match with it, best first."""
+    job = JobPosting.objects.get(id=job_id)
+    candidate_ids = [candidate_id for candidate_id, _ in similar("candidates", job, limit)]
+    candidates = CandidateProfile.objects.in_bulk(candidate_ids)
+    return [
+        candidate_id for candidate_id in candidate_ids
+        if candidate_id in candidates and unscored(candidates[candidate_id], [job])
+    ]
+
+
+def precompute_pair(candidate_id, job_id):
+    """Scores one candidate and job posting. Returns the number of matches saved."""
+    candidate = CandidateProfile.objects.get(id=candidate_id)
+    job = JobPosting.objects.get(id=job_id)
+    if not unscored(candidate, [job]):
+        return 0
+    match_data = match_candidate_to_job(CandidateProfilePromptSerializer(candidate).data, JobPostingPromptSerializer(job).data)
+    save_matches([build_match(candidate, job, match_data)])
+    return 1
+
+
+class MatchPrecomputer:
+    """A priority queue of precompute tasks served by a fixed number of worker threads."""
+
+    def __init__(self, workers, limit):
+        self.workers = workers
+        self.limit = limit
+        self.queue = queue.PriorityQueue()
+        self.counter = itertools.count()
+        self.queued = set()
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            while len(self.threads) < self.workers:
+                thread = threading.Thread(target=self._work, name="match-precompute", daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def put(self, priority, task, *args):
+        """Queues task(*args) unless the same task is already waiting."""
+        key = (task.__name__, args)
+        with self.lock:
+            if key in self.queued:
+                return
+            self.queued.add(key)
+        # The counter keeps tasks of equal priority in arrival order
+        self.queue.put((priority, next(self.counter), key, task, args))
+        self.start()
+
+    def enqueue_candidate(self, candidate_id):
+        self.put((PRIORITY_CANDIDATE, 0), precompute_candidate, candidate_id, self.limit)
+
+    def enqueue_job(self, job_id):
+        self.put((PRIORITY_JOB, 0), self.expand_job, job_id)
+
+    def expand_job(self, job_id):
+        """Queues one task per candidate worth scoring against a new job posting."""
+        for rank, candidate_id in enumerate(candidates_to_score(job_id, self.limit)):
+            self.put((PRIORITY_PAIR, rank), precompute_pair, candidate_id, job_id)
+
+    def join(self):
+        """Blocks until every queued task, including those queued by running tasks, has finished."""
+        self.queue.join()
+
+    def _work(self):
+        while True:
+            _, _, key, task, args = self.queue.get()
+            with self.lock:
+                self.queued.discard(key)
+            close_old_connections()
+            try:
+                task(*args)
+            except (CandidateProfile.DoesNotExist, JobPosting.DoesNotExist):
+                # Deleted while queued
+                pass
+            except Exception:
+                logger.exception("Match precompute task %s%s failed", task.__name__, args)
+            finally:
+                close_old_connections()
+                self.queue.task_done()
+
+
+match_precomputer = MatchPrecomputer(settings.MATCH_PRECOMPUTE_WORKERS, settings.MATCH_PRECOMPUTE_LIMIT)
+
+
+def enqueue_candidate(candidate_id):
+    """Queues precomputing a new candidate's matches, if MATCH_PRECOMPUTE is on."""
+    if settings.MATCH_PRECOMPUTE:
+        match_precomputer.enqueue_candidate(candidate_id)
+
+
+def enqueue_job(job_id):
+    """Queues precomputing a new job posting's matches, if MATCH_PRECOMPUTE is on."""
+    if settings.MATCH_PRECOMPUTE:
+        match_precomputer.enqueue_job(job_id)
@@ -0,0 +1,148 @@
+"""
+Postgres-backed queue of resume parse tasks.
+
+In asynchronous mode upload_resume stores the file, creates a
+ResumeParseTask and answers 202 straight away. Workers started with
+`python manage.py process_resume_tasks` claim tasks with
+SELECT ... FOR UPDATE SKIP LOCKED, so any number of them can run beside the
+web processes without claiming the same task.
+
+Claiming a task leases it for RESUME_TASK_VISIBILITY_TIMEOUT seconds, and
+the lease is renewed at each stage. A task whose worker died becomes
+available again once its lease expires. Failures are retried with
+exponential backoff up to RESUME_TASK_MAX_ATTEMPTS attempts. Files that
+exceed the sandbox limits are not retried, since they would fail the
+same way again.
+"""
+import logging
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from .models import CandidateProfile, ResumeParseTask
+from .sandbox import SandboxLimitExceeded
+from .services import candidate_fields, parse_resume
+from . import precompute
+
+logger = logging.getLogger(__name__)
+
+
+def lease_expiry():
+    return timezone.now() + timedelta(seconds=settings.RESUME_TASK_VISIBILITY_TIMEOUT)
+
+
+def claim_task():
+    """Leases the next available task to this worker, or returns None when there is none."""
+    with transaction.atomic():
+        task = (
+            ResumeParseTask.objects.select_for_update(skip_locked=True)
+            .filter(status__in=[ResumeParseTask.QUEUED, ResumeParseTask.RUNNING], available_at__lte=timezone.now())
+            .order_by("available_at", "id")
+            .first()
+        )
+        if task is None:
+            return None
+        task.status = ResumeParseTask.RUNNING
+        task.stage = ""
+        task.attempts += 1
+        task.available_at = lease_expiry()
+        task.save(update_fields=["status", "stage", "attempts", "available_at", "updated_at"])
+    return task
+
+
+def owned(task):
+    """The task's row, still leased by this worker's attempt; other workers' attempts bump attempts."""
+    return ResumeParseTask.objects.filter(id=task.id, attempts=task.attempts, status=ResumeParseTask.RUNNING)
+
+
+def set_stage(task, stage):
+    """Records the stage a task has reached and renews its lease."""
+    task.stage = stage
+    owned(task).update(stage=stage, available_at=lease_expiry(), updated_at=timezone.now())
+
+
+def resume_source(task):
+    """A local path for the stored file when the storage has one, else the stored file itself."""
+    try:
+        return task.resume_file.path
+    except NotImplementedError:
+        return task.resume_file
+
+
+def retry_delay(task, error):
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after:
+        return retry_after
+    return settings.RESUME_TASK_RETRY_DELAY * 2 ** (task.attempts - 1)
+
+
+def process_task(task):
+    """Parses a claimed task's resume into a CandidateProfile, or schedules a retry or fails the task."""
+    if task.attempts > settings.RESUME_TASK_MAX_ATTEMPTS:
+        # Every attempt so far timed out without reporting back
+        fail_task(task, "Timed out")
+        return
+
+    try:
+        parsed_data = parse_resume(
+            resume_source(task),
+            content_hash=task.content_hash,
+            file_format=task.file_format,
+            on_stage=lambda stage: set_stage(task, stage)
+        )
+    except SandboxLimitExceeded as e:
+        fail_task(task, f"Could not process resume: {str(e)}")
+        return
+    except Exception as e:
+        if task.attempts >= settings.RESUME_TASK_MAX_ATTEMPTS:
+            fail_task(task, str(e))
+            return
+        delay = retry_delay(task, e)
+        logger.warning("Resume task %s attempt %s failed, retrying in %ss: %s", task.id, task.attempts, delay, e)
+        owned(task).update(
+            status=ResumeParseTask.QUEUED,
+            error=str(e),
+            available_at=timezone.now() + timedelta(seconds=delay),
+            updated_at=timezone.now()
+        )
+        return
+
+    set_stage(task, "saving")
+    with transaction.atomic():
+        # Only the worker that still holds the lease may create the candidate
+        if not owned(task).select_for_update().exists():
+            return
+        candidate = CandidateProfile.objects.create(
+            **candidate_fields(parsed_data),
+            resume_file=task.resume_file.name,
+            resume_hash=task.content_hash
+        )
+        owned(task).update(status=ResumeParseTask.DONE, error="", candidate=candidate, updated_at=timezone.now())
+    precompute.enqueue_candidate(candidate.id)
+
+
+def fail_task(task, error):
+    """Marks a task failed and deletes its stored file, as a failed synchronous upload stores nothing."""
+    if not owned(task).update(status=ResumeParseTask.FAILED, error=error, updated_at=timezone.now()):
+        return
+    if task.resume_file:
+        task.resume_file.delete(save=False)
+        ResumeParseTask.objects.filter(id=task.id).update(resume_file="")
+
+
+def run_worker(poll_interval, once=False):
+    """Processes tasks until interrupted, or until the queue is empty when once is set."""
+    while True:
+        close_old_connections()
+        task = claim_task()
+        if task is None:
+            if once:
+                return
+            time.sleep(poll_interval)
+            continue
+        try:
+            process_task(task)
+        except Exception:
+            # The lease expires and another attempt picks the task up
+            logger.exception("Resume task %s failed unexpectedly", task.id)
@@ -0,0 +1,190 @@
+"""
+A pool of isolated worker subprocesses for running untrusted document parsing.
+
+Each job runs in a worker process with a wall-clock timeout and an RSS
+ceiling. A worker that overruns either limit is killed and replaced, and
+workers are recycled after a fixed number of jobs so leaks in the parsing
+libraries cannot accumulate. Like api.extractors, this module must not
+import Django, since the workers are spawned without settings.
+"""
+import multiprocessing
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SandboxError(Exception):
+    """Raised when a job fails inside a sandbox worker."""
+
+
+class SandboxLimitExceeded(SandboxError):
+    """Raised when a job is killed for exceeding the sandbox's limits."""
+
+
+class SandboxTimeout(SandboxLimitExceeded):
+    pass
+
+
+class SandboxMemoryExceeded(SandboxLimitExceeded):
+    pass
+
+
+# How often a waiting job checks the worker's memory use, in seconds
+MONITOR_INTERVAL = 0.05
+
+
+def _worker_main(conn):
+    """Runs jobs sent over conn until it receives None or the pipe closes."""
+    # The parent decides when workers stop; don't die on the terminal's Ctrl-C
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        func, args = job
+        try:
+            conn.send((True, func(*args)))
+        except Exception as e:
+            conn.send((False, str(e)))
+
+
+def _rss_bytes(pid):
+    """Resident set size of a process, or 0 where /proc is not available."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+class SandboxWorker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def run(self, func, args, timeout, max_rss_bytes):
+        self.conn.send((func, args))
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.kill()
+                raise SandboxTimeout(f"Processing took longer than {timeout:g} seconds")
+            if self.conn.poll(min(remaining, MONITOR_INTERVAL)):
+                try:
+                    ok, payload = self.conn.recv()
+                except (EOFError, OSError):
+                    self.process.join()
+                    raise SandboxError(f"Worker process died (exit code {self.process.exitcode})")
+                self.jobs += 1
+                if not ok:
+                    raise SandboxError(payload)
+                return payload
+            if max_rss_bytes and _rss_bytes(self.process.pid) > max_rss_bytes:
+                self.kill()
+                raise SandboxMemoryExceeded(f"Processing used more than {max_rss_bytes // (1024 * 1024)} MB of memory")
+            if not self.process.is_alive():
+                raise SandboxError(f"Worker process died (exit code {self.process.exitcode})")
+
+    @property
+    def alive(self):
+        return self.process.is_alive()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.kill()
+        self.conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+
+
+class SandboxPool:
+    """
+    Runs picklable, module-level functions in up to `size` worker processes.
+
+    run() blocks until a worker is free and returns the function's result;
+    submit() does the same from a thread and returns a Future, so several
+    jobs can run in parallel.
+    """
+
+    def __init__(self, size, timeout, max_rss_bytes=None, max_jobs_per_worker=None, start_method="spawn"):
+        self.size = size
+        self.timeout = timeout
+        self.max_rss_bytes = max_rss_bytes
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.context = multiprocessing.get_context(start_method)
+        self._idle = queue.LifoQueue()
+        self._started = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="sandbox")
+
+    def _acquire(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                start_new = self._started < self.size
+                if start_new:
+                    self._started += 1
+            if start_new:
+                try:
+                    return SandboxWorker(self.context)
+                except Exception:
+                    with self._lock:
+                        self._started -= 1
+                    raise
+            # Wake up periodically in case a worker was discarded without a replacement
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                continue
+
+    def _release(self, worker):
+        worn_out = self.max_jobs_per_worker and worker.jobs >= self.max_jobs_per_worker
+        if worker.alive and not worn_out:
+            self._idle.put(worker)
+            return
+        # Killed, crashed or recycled: replace it so waiting jobs are not starved
+        worker.stop()
+        try:
+            self._idle.put(SandboxWorker(self.context))
+        except Exception:
+            with self._lock:
+                self._started -= 1
+
+    def run(self, func, *args, timeout=None):
+        worker = self._acquire()
+        try:
+            return worker.run(func, args, timeout or self.timeout, self.max_rss_bytes)
+        finally:
+            self._release(worker)
+
+    def submit(self, func, *args, timeout=None):
+        return self._executor.submit(self.run, func, *args, timeout=timeout)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            worker.stop()
@@ -1,21 +1,64 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import CandidateProfile, JobPosting, JobMatch,CoverLetter
+from .models import CandidateProfile, JobPosting, JobMatch,CoverLetter, ResumeParseTask, Skill
+from .formats import detect_uploaded_file_format, UnsupportedFileError
 from api.services import parse_job_posting
 
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """A ModelSerializer that takes a `fields` argument listing the only fields to output."""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
 class CandidateProfileSerializer(serializers.ModelSerializer):
     class Meta:
         model = CandidateProfile
-        fields = "__all__"
+        # The resume text, the raw parse response and the search vector are long
+        exclude = ["resume_text", "parse_response", "search_vector"]
+
+class CandidateProfilePromptSerializer(serializers.ModelSerializer):
+    """The candidate profile as sent to the LLM, which is also part of the response cache key."""
+
+    class Meta:
+        model = CandidateProfile
+        # Bookkeeping fields say nothing about the candidate and would only split the cache
+        exclude = [
+            "resume_text", "parse_response", "search_vector", "content_fingerprint", "resume_hash", "parse_schema_version"
+        ]
 
 class ResumeUploadSerializer(serializers.Serializer):
     resume_file = serializers.FileField(required=True)
 
-class JobPostingSerializer(serializers.ModelSerializer):
+    def validate(self, attrs):
+        """Identifies the resume's format from its first bytes, before anything is saved."""
+        resume_file = attrs["resume_file"]
+        if resume_file.size > settings.RESUME_MAX_UPLOAD_BYTES:
+            raise serializers.ValidationError(
+                {"resume_file": f"File is too large ({resume_file.size} bytes, limit is {settings.RESUME_MAX_UPLOAD_BYTES})"}
+            )
+        try:
+            attrs["file_format"] = detect_uploaded_file_format(resume_file)
+        except UnsupportedFileError as e:
+            raise serializers.ValidationError({"resume_file": str(e)})
+        return attrs
+
+class ResumeParseTaskSerializer(serializers.ModelSerializer):
+    candidate_id = serializers.PrimaryKeyRelatedField(source='candidate', read_only=True)
+
+    class Meta:
+        model = ResumeParseTask
+        fields = ["id", "status", "stage", "attempts", "error", "candidate_id", "created_at", "updated_at"]
+
+class JobPostingSerializer(DynamicFieldsModelSerializer):
     job_text = serializers.CharField(write_only=True)  # Add job_text as a write-only field
 
     class Meta:
         model = JobPosting
-        fields = "__all__"  # Use all fields of the JobPosting model including job_text
+        exclude = ["search_vector"]  # Use all other fields of the JobPosting model including job_text
 
     def create(self, validated_data):
         """Override create method to handle unstructured job text parsing."""
@@ -37,6 +80,14 @@ class JobPostingSerializer(serializers.ModelSerializer):
             # If no job_text is provided, proceed with the standard create method
             return super().create(validated_data)
 
+class JobPostingPromptSerializer(serializers.ModelSerializer):
+    """The job posting as sent to the LLM, which is also part of the response cache key."""
+
+    class Meta:
+        model = JobPosting
+        # Bookkeeping fields change on every save without changing the posting
+        exclude = ["search_vector", "updated_at", "content_fingerprint"]
+
 
 class JobMatchSerializer(serializers.ModelSerializer):
     candidate = CandidateProfileSerializer()
@@ -46,6 +97,15 @@ class JobMatchSerializer(serializers.ModelSerializer):
         model = JobMatch
         fields = "__all__"
 
+class SkillSerializer(serializers.ModelSerializer):
+    # Annotated by SkillViewSet.list
+    job_count = serializers.IntegerField(read_only=True)
+    candidate_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Skill
+        fields = ["id", "name", "job_count", "candidate_count"]
+
 class CoverLetterSerializer(serializers.ModelSerializer):
     candidate_id = serializers.PrimaryKeyRelatedField(queryset=CandidateProfile.objects.all(), source='candidate')
     job_id = serializers.PrimaryKeyRelatedField(queryset=JobPosting.objects.all(), source='job')
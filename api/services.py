@@ -1,99 +1,550 @@
+import asyncio
 import json
-import pdfplumber
-import docx
 import os
-from .models import CandidateProfile, JobPosting, JobMatch
-from .llm_client import call_llm
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from .models import CandidateProfile, JobMatch, content_fingerprint, match_fingerprint
+from .llm_client import (
+    call_llm, acall_llm, estimate_text_tokens, FUNCTION_SCHEMAS, LLMError, LLMUnavailableError
+)
+from .cache import resume_text_cache, resume_parse_cache
+from .extractors import (
+    check_pdf, extract_pdf_pages, extract_docx_text, extract_odt_text, extract_rtf_text,
+    extract_html_text, extract_plain_text
+)
+from .formats import resume_format, detect_file_format, detect_uploaded_file_format, get_format
+from .sandbox import SandboxPool, SandboxLimitExceeded
+from .skills import canonicalize_skills, find_skills
+from .skill_index import skill_index
+from .skill_links import link_candidate_skills
+from .vector_index import index_row
 
-def extract_text_from_pdf(file_path):
-    """Extracts text from PDF files using pdfplumber."""
+RESUME_PROMPT = (
+    "Extract the following information from the resume text: name, email, phone, skills, experience, education. "
+    "Format the response as a JSON object with these fields."
+)
+# Bump when RESUME_PROMPT, the parse_resume schema or the handling of its
+# response changes; `python manage.py reparse_resumes` re-parses older rows
+RESUME_SCHEMA_VERSION = 1
+JOB_POSTING_PROMPT = "Extract structured job details from the posting."
+MATCH_PROMPT = "Evaluate job match for the candidate."
+MULTI_MATCH_PROMPT = "Evaluate job match for the candidate against each job posting. Return one entry per job_id."
+COVER_LETTER_PROMPT = "Generate a personalized cover letter."
+
+# Sandboxed worker processes that run all document parsing, started on first use
+_extraction_pool = None
+
+def get_extraction_pool():
+    global _extraction_pool
+    if _extraction_pool is None:
+        _extraction_pool = SandboxPool(
+            size=settings.EXTRACTION_WORKERS,
+            timeout=settings.EXTRACTION_TIMEOUT,
+            max_rss_bytes=settings.EXTRACTION_MAX_RSS_MB * 1024 * 1024,
+            max_jobs_per_worker=settings.EXTRACTION_MAX_JOBS_PER_WORKER
+        )
+    return _extraction_pool
+
+@resume_format("pdf", extensions=[".pdf"], mime_types=["application/pdf"])
+def extract_text_from_pdf(source):
+    """
+    Extracts text from PDF files using pdfplumber.
+
+    A pdfium pre-check rejects oversized and image-only PDFs first. Only the
+    first PDF_MAX_PAGES pages are read, in chunks of PDF_PAGES_PER_TASK pages
+    spread over the extraction pool, and extraction stops once RESUME_MAX_CHARS
+    characters have been collected.
+    """
+    pool = get_extraction_pool()
     try:
-        with pdfplumber.open(file_path) as pdf:
-            text = []
-            for page in pdf.pages:
-                text.append(page.extract_text() or "")
-            return "\n".join(text)
+        page_count = pool.run(
+            check_pdf,
+            source,
+            settings.RESUME_MAX_UPLOAD_BYTES,
+            settings.PDF_REJECT_PAGES,
+            settings.PDF_PRECHECK_SAMPLE_PAGES
+        )
+        pages = min(page_count, settings.PDF_MAX_PAGES)
+        max_chars = settings.RESUME_MAX_CHARS
+        chunk = settings.PDF_PAGES_PER_TASK
+        ranges = [(start, min(start + chunk, pages)) for start in range(0, pages, chunk)]
+
+        if len(ranges) <= 1 or settings.EXTRACTION_WORKERS <= 1:
+            texts = pool.run(extract_pdf_pages, source, 0, pages, max_chars)
+        else:
+            futures = [pool.submit(extract_pdf_pages, source, start, stop, max_chars) for start, stop in ranges]
+            texts = []
+            try:
+                # Collect chunks in page order until the character cap is reached
+                for future in futures:
+                    texts.extend(future.result())
+                    if sum(len(text) for text in texts) >= max_chars:
+                        break
+            finally:
+                for future in futures:
+                    future.cancel()
+
+        return "\n".join(texts)[:max_chars]
+    except SandboxLimitExceeded:
+        raise
     except Exception as e:
         raise Exception(f"Error extracting text from PDF: {str(e)}")
 
-def extract_text_from_doc(file_path):
-    """Extracts text from DOC/DOCX files."""
+def run_extractor(extractor, source, label):
+    """Runs a text extractor from api.extractors on a path or bytes in the extraction pool."""
     try:
-        doc = docx.Document(file_path)
-        return "\n".join([para.text for para in doc.paragraphs])
+        return get_extraction_pool().run(extractor, source)
+    except SandboxLimitExceeded:
+        raise
     except Exception as e:
-        raise Exception(f"Error extracting text from DOC/DOCX: {str(e)}")
-
-def extract_text_from_resume(file_path):
-    """Extracts text from resume files (PDF or DOC/DOCX)."""
-    file_extension = os.path.splitext(file_path)[1].lower()
-    
-    if file_extension == '.pdf':
-        return extract_text_from_pdf(file_path)
-    elif file_extension in ['.doc', '.docx']:
-        return extract_text_from_doc(file_path)
-    else:
-        raise ValueError("Unsupported file format")
-
-def parse_resume(file_path):
-    """Calls LLM to extract structured data from resume text."""
+        raise Exception(f"Error extracting text from {label}: {str(e)}")
+
+@resume_format(
+    "docx",
+    extensions=[".docx"],
+    mime_types=["application/vnd.openxmlformats-officedocument.wordprocessingml.document", "application/zip"]
+)
+def extract_text_from_doc(source):
+    """Extracts text from DOCX files, including tables, text boxes, headers and footers."""
+    return run_extractor(extract_docx_text, source, "DOCX")
+
+@resume_format("odt", extensions=[".odt"], mime_types=["application/vnd.oasis.opendocument.text", "application/zip"])
+def extract_text_from_odt(source):
+    """Extracts text from OpenDocument text files."""
+    return run_extractor(extract_odt_text, source, "ODT")
+
+@resume_format("rtf", extensions=[".rtf"], mime_types=["text/rtf", "application/rtf"])
+def extract_text_from_rtf(source):
+    """Extracts text from RTF files."""
+    return run_extractor(extract_rtf_text, source, "RTF")
+
+@resume_format("html", extensions=[".html", ".htm"], mime_types=["text/html", "application/xhtml+xml", "text/plain"])
+def extract_text_from_html(source):
+    """Extracts the visible text from HTML files."""
+    return run_extractor(extract_html_text, source, "HTML")
+
+@resume_format("txt", extensions=[".txt"], mime_types=["text/plain"])
+def extract_text_from_txt(source):
+    """Extracts text from plain text files."""
+    return run_extractor(extract_plain_text, source, "TXT")
+
+def extraction_source(resume):
+    """
+    What to hand the extraction workers for a resume: the path of a file on
+    local disk, including uploads Django spooled to a temporary file, or else
+    the file's contents, read from memory or from any storage backend.
+    """
+    if isinstance(resume, (str, os.PathLike)):
+        return os.fspath(resume)
+    if hasattr(resume, "temporary_file_path"):
+        return resume.temporary_file_path()
+    resume.seek(0)
+    data = resume.read()
+    resume.seek(0)
+    return data
+
+def extract_text_from_resume(resume, file_format=None):
+    """
+    Extracts text from a resume, given as a path or a file object, with the
+    extractor registered for its format. The format is sniffed from the
+    file's contents when not given.
+    """
+    if file_format is None:
+        if isinstance(resume, (str, os.PathLike)):
+            file_format = detect_file_format(resume)
+        else:
+            file_format = detect_uploaded_file_format(resume)
+    text = get_format(file_format).extract(extraction_source(resume))
+    return text[:settings.RESUME_MAX_CHARS]
+
+def validate_parsed_resume(parsed_data):
+    """Checks that the LLM output has the fields a candidate profile needs."""
+    required_fields = ['name', 'email']
+    missing_fields = [field for field in required_fields if field not in parsed_data]
+    if missing_fields:
+        raise ValueError(f"Missing required fields in parsed data: {', '.join(missing_fields)}")
+    return parsed_data
+
+def normalize_skills(skills, text):
+    """
+    Canonical names for the skills the LLM returned. When it returned none,
+    the known skills mentioned in the source text are used instead.
+    """
+    return canonicalize_skills(skills) or find_skills(text)
+
+def parse_cache_key(content_hash):
+    """Key of a file's parsed data in resume_parse_cache; parses under an older schema version are not reused."""
+    return f"{content_hash}:v{RESUME_SCHEMA_VERSION}"
+
+def parsed_resume(text, response, schema_version=RESUME_SCHEMA_VERSION):
+    """
+    The parsed fields of a parse_resume response for text, along with the
+    text itself as resume_text, the raw response as llm_response and the
+    schema version it was parsed under.
+    """
+    parsed_data = validate_parsed_resume(json.loads(response))
+    parsed_data["skills"] = normalize_skills(parsed_data.get("skills"), text)
+    parsed_data["resume_text"] = text
+    parsed_data["llm_response"] = response
+    parsed_data["schema_version"] = schema_version
+    return parsed_data
+
+def parse_resume_text(text, bypass_cache=False):
+    """Calls LLM to extract structured data from already extracted resume text."""
+    response = call_llm(RESUME_PROMPT, "parse_resume", {"resume_text": text}, bypass_cache=bypass_cache)
+    return parsed_resume(text, response)
+
+def candidate_fields(parsed_data):
+    """CandidateProfile field values for the data returned by parse_resume."""
+    return {
+        "name": parsed_data.get("name", ""),
+        "email": parsed_data.get("email", ""),
+        "phone": parsed_data.get("phone", ""),
+        "skills": parsed_data.get("skills", []),
+        "education": parsed_data.get("education", []),
+        "work_experience": parsed_data.get("work_experience", []),
+        "resume_text": parsed_data.get("resume_text", ""),
+        "parse_response": parsed_data.get("llm_response", ""),
+        "parse_schema_version": parsed_data.get("schema_version", 0),
+    }
+
+def parse_resume(resume, content_hash=None, file_format=None, on_stage=None):
+    """
+    Calls LLM to extract structured data from resume text.
+
+    resume is a path or a file object, such as an upload straight from
+    request.FILES; nothing is written to storage here.
+
+    file_format is the resume's registered format name (see api.formats);
+    it is detected from the file when not given.
+
+    When content_hash (the SHA-256 of the file) is given, the extracted text and
+    the parsed data are cached under it so a repeat upload of the same file
+    skips both text extraction and the LLM call.
+
+    on_stage, if given, is called with "extracting" and then "parsing" as
+    each step starts.
+
+    The parsed fields are returned as by parse_resume_text.
+    """
     try:
+        if content_hash:
+            cached = resume_parse_cache.get(parse_cache_key(content_hash))
+            if cached is not None:
+                return cached
+
         # Extract text from the resume
-        text = extract_text_from_resume(file_path)
+        text = resume_text_cache.get(content_hash) if content_hash else None
+        if text is None:
+            if on_stage:
+                on_stage("extracting")
+            text = extract_text_from_resume(resume, file_format)
+            if content_hash:
+                resume_text_cache.set(content_hash, text)
         
         if not text.strip():
             raise ValueError("No text could be extracted from the resume")
         
         # Call LLM to extract structured data
-        response = call_llm(
-            "Extract the following information from the resume text: name, email, phone, skills, experience, education. "
-            "Format the response as a JSON object with these fields.",
-            "parse_resume",
-            {"resume_text": text}
-        )
-        
-        parsed_data = json.loads(response)
-        
-        # Validate required fields
-        required_fields = ['name', 'email']
-        missing_fields = [field for field in required_fields if field not in parsed_data]
-        if missing_fields:
-            raise ValueError(f"Missing required fields in parsed data: {', '.join(missing_fields)}")
+        if on_stage:
+            on_stage("parsing")
+        parsed_data = parse_resume_text(text)
+
+        if content_hash:
+            resume_parse_cache.set(parse_cache_key(content_hash), parsed_data)
             
         return parsed_data
         
+    except (LLMUnavailableError, SandboxLimitExceeded):
+        # Let callers tell an upstream outage or a resource-hungry file apart from a bad resume
+        raise
     except Exception as e:
         raise Exception(f"Error parsing resume: {str(e)}")
 
+def bulk_create_candidates(candidates):
+    """
+    Inserts unsaved candidate profiles in one query. bulk_create skips save()
+    and signals, so their fingerprints, skill links and index entries are set here.
+    """
+    for candidate in candidates:
+        candidate.content_fingerprint = content_fingerprint(candidate, candidate.fingerprint_fields)
+    with transaction.atomic():
+        CandidateProfile.objects.bulk_create(candidates)
+        link_candidate_skills(candidates)
+    for candidate in candidates:
+        skill_index.set_candidate(candidate.pk, candidate.skills)
+        index_row("candidates", candidate)
+    return candidates
+
 def parse_job_posting(job_text):
-    """Calls LLM to extract structured job data."""
+    """Calls LLM to extract structured job data, with canonical required skills."""
     response = call_llm(
-        "Extract structured job details from the posting.",
+        JOB_POSTING_PROMPT,
         "parse_job_posting",
         {"job_text": job_text}
     )
-    return json.loads(response)
+    parsed_data = json.loads(response)
+    parsed_data["required_skills"] = normalize_skills(parsed_data.get("required_skills"), job_text)
+    return parsed_data
 
-def match_candidate_to_job(candidate, job):
-    """Calls LLM to match a candidate with a job."""
+def match_candidate_to_job(candidate, job, force=False):
+    """Calls LLM to match a candidate with a job; force skips any cached result."""
     response = call_llm(
-        "Evaluate job match for the candidate.",
+        MATCH_PROMPT,
         "match_candidate_to_job",
         {
             "candidate_data": candidate,
             "job_data": job
-        }
+        },
+        bypass_cache=force
     )
     return json.loads(response)
 
-def generate_cover_letter(candidate, job):
-    """Calls LLM to generate a cover letter."""
+def compact_job(job):
+    """The parts of a serialized job posting that matter for scoring, with a shortened description."""
+    return {
+        "job_id": job["id"],
+        "title": job.get("title"),
+        "company": job.get("company"),
+        "required_skills": job.get("required_skills"),
+        "description": (job.get("description") or "")[:settings.MULTI_MATCH_DESCRIPTION_CHARS],
+    }
+
+def job_batches(candidate, jobs):
+    """
+    Splits serialized jobs into batches for one match_candidate_to_jobs call
+    each. A batch grows until its estimated prompt and completion tokens reach
+    MULTI_MATCH_TOKEN_BUDGET or it holds MULTI_MATCH_MAX_JOBS jobs. Yields
+    lists of indexes into jobs.
+    """
+    base_tokens = estimate_text_tokens([MULTI_MATCH_PROMPT, candidate, FUNCTION_SCHEMAS["match_candidate_to_jobs"]])
+    batch = []
+    tokens = base_tokens
+    for index, job in enumerate(jobs):
+        job_tokens = estimate_text_tokens(compact_job(job)) + settings.MULTI_MATCH_COMPLETION_TOKENS_PER_JOB
+        if batch and (tokens + job_tokens > settings.MULTI_MATCH_TOKEN_BUDGET or len(batch) >= settings.MULTI_MATCH_MAX_JOBS):
+            yield batch
+            batch = []
+            tokens = base_tokens
+        batch.append(index)
+        tokens += job_tokens
+    if batch:
+        yield batch
+
+def parse_multi_match(response, job_ids):
+    """
+    Maps job ID to match data for each well-formed entry of a
+    match_candidate_to_jobs response. Jobs with no usable entry are left out.
+    """
+    try:
+        matches = json.loads(response)["matches"]
+    except (TypeError, ValueError, KeyError):
+        return {}
+    results = {}
+    for entry in matches if isinstance(matches, list) else []:
+        try:
+            job_id = int(entry["job_id"])
+            match_score = round(float(entry["match_score"]))
+            missing_skills = entry["missing_skills"]
+            summary = entry["summary"]
+        except (TypeError, ValueError, KeyError):
+            continue
+        if job_id in job_ids and 0 <= match_score <= 100 and isinstance(missing_skills, list) and isinstance(summary, str):
+            results.setdefault(job_id, {"match_score": match_score, "missing_skills": missing_skills, "summary": summary})
+    return results
+
+def match_candidate_to_jobs(candidate, jobs, force=False):
+    """
+    Matches one serialized candidate with many serialized jobs, sending the
+    candidate once per batch of compact job summaries (see job_batches)
+    instead of once per job. Returns the match data of each job, in order.
+    Jobs whose result is missing or malformed are matched on their own with
+    match_candidate_to_job.
+    """
+    results = [None] * len(jobs)
+    for batch in job_batches(candidate, jobs):
+        try:
+            response = call_llm(
+                MULTI_MATCH_PROMPT,
+                "match_candidate_to_jobs",
+                {"candidate_data": candidate, "jobs": [compact_job(jobs[index]) for index in batch]},
+                bypass_cache=force
+            )
+        except LLMUnavailableError:
+            raise
+        except LLMError:
+            response = None
+        parsed = parse_multi_match(response, {jobs[index]["id"] for index in batch})
+        for index in batch:
+            results[index] = parsed.get(jobs[index]["id"]) or match_candidate_to_job(candidate, jobs[index], force)
+    return results
+
+def build_match(candidate, job, match_data):
+    """An unsaved JobMatch for a candidate and job from LLM match data; raises on malformed data."""
+    return JobMatch(
+        candidate=candidate,
+        job=job,
+        fingerprint=match_fingerprint(candidate, job),
+        match_score=int(match_data["match_score"]),
+        missing_skills=match_data.get("missing_skills", []),
+        summary=match_data.get("summary", ""),
+    )
+
+def save_matches(matches):
+    """Inserts matches, replacing the stored result of a pair scored again with unchanged rows."""
+    JobMatch.objects.bulk_create(
+        matches,
+        update_conflicts=True,
+        unique_fields=["candidate", "job", "fingerprint"],
+        update_fields=["match_score", "missing_skills", "summary"],
+    )
+
+def generate_cover_letter(candidate, job, regenerate=False):
+    """Calls LLM to generate a cover letter; regenerate skips any cached letter."""
     response = call_llm(
-        "Generate a personalized cover letter.",
+        COVER_LETTER_PROMPT,
         "generate_cover_letter",
         {
             "candidate_data": candidate,
             "job_data": job
-        }
+        },
+        bypass_cache=regenerate
+    )
+    return json.loads(response)["cover_letter"]
+
+# Async variants used by the async views. Blocking work (text extraction) runs
+# in a worker thread and LLM calls go through acall_llm.
+
+async def aparse_resume(resume, content_hash=None, file_format=None):
+    """Async variant of parse_resume."""
+    try:
+        if content_hash:
+            cached = await resume_parse_cache.aget(parse_cache_key(content_hash))
+            if cached is not None:
+                return cached
+
+        text = await resume_text_cache.aget(content_hash) if content_hash else None
+        if text is None:
+            text = await sync_to_async(extract_text_from_resume, thread_sensitive=False)(resume, file_format)
+            if content_hash:
+                await resume_text_cache.aset(content_hash, text)
+
+        if not text.strip():
+            raise ValueError("No text could be extracted from the resume")
+
+        response = await acall_llm(RESUME_PROMPT, "parse_resume", {"resume_text": text})
+        parsed_data = parsed_resume(text, response)
+
+        if content_hash:
+            await resume_parse_cache.aset(parse_cache_key(content_hash), parsed_data)
+
+        return parsed_data
+
+    except (LLMUnavailableError, SandboxLimitExceeded):
+        # Let callers tell an upstream outage or a resource-hungry file apart from a bad resume
+        raise
+    except Exception as e:
+        raise Exception(f"Error parsing resume: {str(e)}")
+
+async def aparse_job_posting(job_text):
+    """Async variant of parse_job_posting."""
+    response = await acall_llm(JOB_POSTING_PROMPT, "parse_job_posting", {"job_text": job_text})
+    parsed_data = json.loads(response)
+    parsed_data["required_skills"] = normalize_skills(parsed_data.get("required_skills"), job_text)
+    return parsed_data
+
+async def amatch_candidate_to_job(candidate, job, force=False):
+    """Async variant of match_candidate_to_job."""
+    response = await acall_llm(
+        MATCH_PROMPT,
+        "match_candidate_to_job",
+        {"candidate_data": candidate, "job_data": job},
+        bypass_cache=force
+    )
+    return json.loads(response)
+
+async def amatch_many(pairs, concurrency, force=False, semaphore=None):
+    """
+    Scores (candidate_data, job_data) pairs with at most `concurrency` LLM
+    calls in flight. Yields (index, match_data, error) for each pair in the
+    order the calls finish; exactly one of match_data and error is set.
+
+    A caller that makes other LLM calls under the same limit passes its own
+    semaphore, which is then used instead of a new one.
+    """
+    semaphore = semaphore or asyncio.Semaphore(max(1, concurrency))
+
+    async def score(index, candidate, job):
+        async with semaphore:
+            try:
+                return index, await amatch_candidate_to_job(candidate, job, force), None
+            except Exception as e:
+                return index, None, e
+
+    tasks = [asyncio.ensure_future(score(index, candidate, job)) for index, (candidate, job) in enumerate(pairs)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # The client went away or the caller stopped early: drop the calls not yet made
+        for task in tasks:
+            task.cancel()
+
+async def amatch_candidate_to_jobs(candidate, jobs, concurrency, force=False):
+    """
+    Async variant of match_candidate_to_jobs that runs up to `concurrency`
+    batches at once. Yields (index, match_data, error) like amatch_many, for
+    a whole batch at a time as each one finishes.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def score_batch(batch):
+        async with semaphore:
+            try:
+                response = await acall_llm(
+                    MULTI_MATCH_PROMPT,
+                    "match_candidate_to_jobs",
+                    {"candidate_data": candidate, "jobs": [compact_job(jobs[index]) for index in batch]},
+                    bypass_cache=force
+                )
+            except LLMUnavailableError as e:
+                return [(index, None, e) for index in batch]
+            except LLMError:
+                response = None
+        parsed = parse_multi_match(response, {jobs[index]["id"] for index in batch})
+        outcomes = [(index, parsed[jobs[index]["id"]], None) for index in batch if jobs[index]["id"] in parsed]
+        fallback = [index for index in batch if jobs[index]["id"] not in parsed]
+        fallback_pairs = [(candidate, jobs[index]) for index in fallback]
+        # The fallback calls count against the same limit as the batches
+        async for position, match_data, error in amatch_many(fallback_pairs, concurrency, force, semaphore):
+            outcomes.append((fallback[position], match_data, error))
+        return outcomes
+
+    tasks = [asyncio.ensure_future(score_batch(batch)) for batch in job_batches(candidate, jobs)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            for outcome in await finished:
+                yield outcome
+    finally:
+        for task in tasks:
+            task.cancel()
+
+async def asave_matches(matches):
+    """Async variant of save_matches."""
+    await JobMatch.objects.abulk_create(
+        matches,
+        update_conflicts=True,
+        unique_fields=["candidate", "job", "fingerprint"],
+        update_fields=["match_score", "missing_skills", "summary"],
+    )
+
+async def agenerate_cover_letter(candidate, job, regenerate=False):
+    """Async variant of generate_cover_letter."""
+    response = await acall_llm(
+        COVER_LETTER_PROMPT,
+        "generate_cover_letter",
+        {"candidate_data": candidate, "job_data": job},
+        bypass_cache=regenerate
     )
     return json.loads(response)["cover_letter"]
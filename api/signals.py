@@ -0,0 +1,56 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import CandidateProfile, JobPosting, content_fingerprint
+from .skill_index import skill_index
+from .skill_links import link_candidate_skills, link_job_skills
+from .vector_index import index_row, unindex_row
+
+
+# The indexes are only touched once the change is committed, so rolled back
+# writes never show up in rankings. Vector appends write to disk and are
+# robust: a failure is logged instead of failing the request. Skill links
+# are rows, written in the same transaction as the change.
+
+
+def skills_saved(field, update_fields):
+    return update_fields is None or field in update_fields
+
+
+def store_fingerprint(instance):
+    """Fingerprints a row saved raw, e.g. by loaddata, which skips FingerprintedModel.save()."""
+    instance.content_fingerprint = content_fingerprint(instance, instance.fingerprint_fields)
+    type(instance).objects.filter(pk=instance.pk).update(content_fingerprint=instance.content_fingerprint)
+
+@receiver(post_save, sender=JobPosting)
+def index_job(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw:
+        store_fingerprint(instance)
+    if skills_saved("required_skills", update_fields):
+        link_job_skills([instance])
+    transaction.on_commit(lambda: skill_index.set_job(instance.pk, instance.required_skills))
+    transaction.on_commit(lambda: index_row("jobs", instance), robust=True)
+
+
+@receiver(post_delete, sender=JobPosting)
+def unindex_job(sender, instance, **kwargs):
+    job_id = instance.pk
+    transaction.on_commit(lambda: skill_index.remove_job(job_id))
+    transaction.on_commit(lambda: unindex_row("jobs", job_id), robust=True)
+
+
+@receiver(post_save, sender=CandidateProfile)
+def index_candidate(sender, instance, update_fields=None, raw=False, **kwargs):
+    if raw:
+        store_fingerprint(instance)
+    if skills_saved("skills", update_fields):
+        link_candidate_skills([instance])
+    transaction.on_commit(lambda: skill_index.set_candidate(instance.pk, instance.skills))
+    transaction.on_commit(lambda: index_row("candidates", instance), robust=True)
+
+
+@receiver(post_delete, sender=CandidateProfile)
+def unindex_candidate(sender, instance, **kwargs):
+    candidate_id = instance.pk
+    transaction.on_commit(lambda: skill_index.remove_candidate(candidate_id))
+    transaction.on_commit(lambda: unindex_row("candidates", candidate_id), robust=True)
@@ -0,0 +1,147 @@
+"""
+In-process inverted index from canonical skill (see api.skills) to the
+jobs that require it and the candidates that list it, for ranking jobs by
+skill overlap without calling the LLM.
+
+The index is built from the database on first use and kept current by the
+signal handlers in api.signals. Changes made by other processes, or by bulk
+queries that send no signals, are picked up by a full rebuild once the index
+is older than SKILL_INDEX_TTL seconds.
+"""
+import heapq
+import threading
+import time
+from collections import Counter, namedtuple
+from django.conf import settings
+from .models import CandidateProfile, JobPosting
+from .skills import get_skill_taxonomy
+
+# score is the share of the job's required skills the candidate has, 0-100
+SkillMatch = namedtuple("SkillMatch", ["id", "score", "matched_skills", "missing_skills"])
+
+
+def skill_set(skills):
+    """
+    The skill keys of a JobPosting.required_skills or CandidateProfile.skills
+    value: canonical taxonomy IDs, or the normalized text of unknown skills.
+    The LLM usually returns a list of strings, but objects with a "name" and
+    comma-separated strings are accepted too.
+    """
+    if not skills:
+        return frozenset()
+    if isinstance(skills, str):
+        skills = skills.split(",")
+    taxonomy = get_skill_taxonomy()
+    names = (skill.get("name", "") if isinstance(skill, dict) else skill for skill in skills)
+    return frozenset(key for key in map(taxonomy.key, names) if key)
+
+
+class SkillIndex:
+    def __init__(self):
+        self.job_skills = {}
+        self.skill_jobs = {}
+        self.candidate_skills = {}
+        self.skill_candidates = {}
+        self.built_at = None
+        self.lock = threading.RLock()
+
+    def is_stale(self, ttl):
+        return self.built_at is None or (ttl and time.monotonic() - self.built_at > ttl)
+
+    def rebuild(self):
+        """Reloads every job's and candidate's skills from the database."""
+        jobs = JobPosting.objects.values_list("id", "required_skills")
+        candidates = CandidateProfile.objects.values_list("id", "skills")
+        job_skills = {job_id: skill_set(skills) for job_id, skills in jobs.iterator()}
+        candidate_skills = {candidate_id: skill_set(skills) for candidate_id, skills in candidates.iterator()}
+        with self.lock:
+            self.job_skills = job_skills
+            self.skill_jobs = self._invert(job_skills)
+            self.candidate_skills = candidate_skills
+            self.skill_candidates = self._invert(candidate_skills)
+            self.built_at = time.monotonic()
+
+    def _invert(self, skills_by_id):
+        inverted = {}
+        for row_id, skills in skills_by_id.items():
+            for skill in skills:
+                inverted.setdefault(skill, set()).add(row_id)
+        return inverted
+
+    def _set(self, skills_by_id, inverted, row_id, skills):
+        with self.lock:
+            for skill in skills_by_id.pop(row_id, ()):
+                ids = inverted.get(skill)
+                if ids is not None:
+                    ids.discard(row_id)
+                    if not ids:
+                        del inverted[skill]
+            if skills is not None:
+                skills_by_id[row_id] = skills
+                for skill in skills:
+                    inverted.setdefault(skill, set()).add(row_id)
+
+    def set_job(self, job_id, required_skills):
+        self._set(self.job_skills, self.skill_jobs, job_id, skill_set(required_skills))
+
+    def remove_job(self, job_id):
+        self._set(self.job_skills, self.skill_jobs, job_id, None)
+
+    def set_candidate(self, candidate_id, skills):
+        self._set(self.candidate_skills, self.skill_candidates, candidate_id, skill_set(skills))
+
+    def remove_candidate(self, candidate_id):
+        self._set(self.candidate_skills, self.skill_candidates, candidate_id, None)
+
+    def rank_jobs(self, skills, limit=None):
+        """
+        Ranks the jobs that share at least one skill with `skills` by the share
+        of their required skills covered, then by the number of skills matched.
+        """
+        candidate = skill_set(skills)
+        with self.lock:
+            overlap = Counter()
+            for skill in candidate:
+                overlap.update(self.skill_jobs.get(skill, ()))
+            scored = [
+                (count / len(self.job_skills[job_id]), count, -job_id)
+                for job_id, count in overlap.items()
+            ]
+            top = heapq.nlargest(limit, scored) if limit else sorted(scored, reverse=True)
+            return [self._match(-neg_id, candidate, self.job_skills[-neg_id], coverage) for coverage, _, neg_id in top]
+
+    def rank_candidates(self, required_skills, limit=None):
+        """Ranks the candidates that have at least one of `required_skills` by how many they have."""
+        job = skill_set(required_skills)
+        if not job:
+            return []
+        with self.lock:
+            overlap = Counter()
+            for skill in job:
+                overlap.update(self.skill_candidates.get(skill, ()))
+            scored = [(count, -candidate_id) for candidate_id, count in overlap.items()]
+            top = heapq.nlargest(limit, scored) if limit else sorted(scored, reverse=True)
+            return [
+                self._match(-neg_id, self.candidate_skills[-neg_id], job, count / len(job))
+                for count, neg_id in top
+            ]
+
+    def _match(self, row_id, candidate, job, coverage):
+        taxonomy = get_skill_taxonomy()
+        return SkillMatch(
+            id=row_id,
+            score=round(coverage * 100),
+            matched_skills=sorted(map(taxonomy.display_name, candidate & job)),
+            missing_skills=sorted(map(taxonomy.display_name, job - candidate)),
+        )
+
+
+skill_index = SkillIndex()
+
+
+def get_skill_index():
+    """The process-wide skill index, rebuilt when missing or older than SKILL_INDEX_TTL."""
+    with skill_index.lock:
+        if skill_index.is_stale(settings.SKILL_INDEX_TTL):
+            skill_index.rebuild()
+    return skill_index
@@ -0,0 +1,67 @@
+"""
+Skill rows and their links to candidates (CandidateSkill) and job postings
+(JobSkill), a normalized copy of the CandidateProfile.skills and
+JobPosting.required_skills JSON lists for aggregate queries with joins.
+
+The links are written in the same transaction as the row: by the post_save
+handlers in api.signals for save(), and by explicit calls after bulk
+queries, which send no signals.
+"""
+from django.db import transaction
+from .models import Skill, CandidateSkill, JobSkill
+from .skills import get_skill_taxonomy
+
+
+def skill_ids(skill_model, names_by_key):
+    """IDs of the Skill rows for the given keys, creating the missing ones."""
+    if not names_by_key:
+        return {}
+    skill_model.objects.bulk_create(
+        [skill_model(key=key, name=name) for key, name in names_by_key.items()],
+        ignore_conflicts=True
+    )
+    return dict(skill_model.objects.filter(key__in=list(names_by_key)).values_list("key", "id"))
+
+
+def linkable(skill_model, names_by_key):
+    """
+    The skills that fit the Skill columns. Unknown skills are keyed by their
+    own text, which comes from the LLM or a client and can be of any length;
+    longer ones are not skills and are left unlinked.
+    """
+    max_key = skill_model._meta.get_field("key").max_length
+    max_name = skill_model._meta.get_field("name").max_length
+    return {key: name for key, name in names_by_key.items() if len(key) <= max_key and len(name) <= max_name}
+
+
+def link_skills(skill_model, through, field, rows):
+    """
+    Replaces the links of each (row_id, skills) pair in rows, where field is
+    the through model's column for the row ("candidate_id" or "job_id").
+    """
+    taxonomy = get_skill_taxonomy()
+    canonical = [
+        # Lists of strings as a rule, but a comma-separated string is accepted as well
+        (row_id, linkable(skill_model, taxonomy.canonical(skills.split(",") if isinstance(skills, str) else skills)))
+        for row_id, skills in rows
+    ]
+    names_by_key = {}
+    for _, skills in canonical:
+        names_by_key.update(skills)
+
+    with transaction.atomic():
+        ids = skill_ids(skill_model, names_by_key)
+        through.objects.filter(**{f"{field}__in": [row_id for row_id, _ in rows]}).delete()
+        through.objects.bulk_create([
+            through(**{field: row_id, "skill_id": ids[key]})
+            for row_id, skills in canonical
+            for key in skills
+        ])
+
+
+def link_candidate_skills(candidates):
+    link_skills(Skill, CandidateSkill, "candidate_id", [(candidate.pk, candidate.skills) for candidate in candidates])
+
+
+def link_job_skills(jobs):
+    link_skills(Skill, JobSkill, "job_id", [(job.pk, job.required_skills) for job in jobs])
@@ -0,0 +1,187 @@
+"""
+Canonical skill taxonomy and a single-pass multi-pattern skill matcher.
+
+The taxonomy (SKILL_TAXONOMY_PATH, api/data/skills.json by default) lists
+each skill once with an ID, a display name and its synonyms:
+
+    {"id": "rest_api", "name": "REST APIs",
+     "synonyms": ["rest api", "restful services", ...],
+     "exact_synonyms": ["rest", "restful"]}
+
+A skill string from the LLM is canonical when it equals the name or any
+synonym. "synonyms" are also found inside free text, such as a compound
+skill like "Python/Django" or a whole resume, by an Aho-Corasick automaton
+that scans the text once for every pattern. "exact_synonyms" are too
+ambiguous in prose ("go", "excel", "rest") and only match whole strings.
+"""
+import json
+import threading
+from collections import deque
+from django.conf import settings
+
+
+def normalize_text(text):
+    """Lowercases text, treats hyphens and underscores as spaces, and collapses whitespace."""
+    return " ".join(str(text).lower().replace("-", " ").replace("_", " ").split())
+
+
+def clean_skill(skill):
+    """Tidies a skill string that is not in the taxonomy."""
+    return " ".join(str(skill).split()).strip(" .,;:-/|")
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over normalized patterns. find() returns the
+    leftmost-longest, non-overlapping matches that start and end on word
+    boundaries, so "java" does not match inside "javascript".
+    """
+
+    def __init__(self, patterns):
+        # Trie transitions, failure links and, per state, the (length, value) of patterns ending there
+        self.transitions = [{}]
+        self.failures = [0]
+        self.outputs = [[]]
+        for pattern, value in patterns.items():
+            self._add(normalize_text(pattern), value)
+        self._link()
+
+    def _add(self, pattern, value):
+        if not pattern:
+            return
+        state = 0
+        for char in pattern:
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions.append({})
+                self.failures.append(0)
+                self.outputs.append([])
+                self.transitions[state][char] = next_state
+            state = next_state
+        self.outputs[state].append((len(pattern), value))
+
+    def _link(self):
+        queue = deque(self.transitions[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                failure = self.failures[state]
+                while failure and char not in self.transitions[failure]:
+                    failure = self.failures[failure]
+                self.failures[next_state] = self.transitions[failure].get(char, 0)
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.failures[next_state]]
+
+    def find(self, text):
+        """Returns (start, end, value) for each match in already normalized text."""
+        matches = []
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in self.transitions[state]:
+                state = self.failures[state]
+            state = self.transitions[state].get(char, 0)
+            for length, value in self.outputs[state]:
+                start = end - length
+                if self._on_boundary(text, start, end):
+                    matches.append((start, end, value))
+
+        # Keep the longest match at each position and drop matches inside it
+        selected = []
+        last_end = 0
+        for start, end, value in sorted(matches, key=lambda match: (match[0], match[0] - match[1])):
+            if start >= last_end:
+                selected.append((start, end, value))
+                last_end = end
+        return selected
+
+    def _on_boundary(self, text, start, end):
+        # Only alphanumeric pattern edges need a word boundary, so ".net" still matches in "vb.net"
+        if text[start].isalnum() and start > 0 and text[start - 1].isalnum():
+            return False
+        if text[end - 1].isalnum() and end < len(text) and text[end].isalnum():
+            return False
+        return True
+
+
+class SkillTaxonomy:
+    def __init__(self, data):
+        self.names = {}
+        self.lookup = {}
+        text_patterns = {}
+        for skill in data["skills"]:
+            skill_id = skill["id"]
+            self.names[skill_id] = skill["name"]
+            for synonym in [skill["name"]] + skill.get("synonyms", []) + skill.get("exact_synonyms", []):
+                self.lookup[normalize_text(synonym)] = skill_id
+            for synonym in skill.get("synonyms", []):
+                text_patterns[synonym] = skill_id
+        self.matcher = SkillMatcher(text_patterns)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def skill_id(self, skill):
+        """The canonical ID of a whole skill string, or None if it is not in the taxonomy."""
+        return self.lookup.get(normalize_text(skill))
+
+    def find(self, text):
+        """Canonical IDs of the skills mentioned in free text, in order of first mention."""
+        return list(dict.fromkeys(value for _, _, value in self.matcher.find(normalize_text(text))))
+
+    def key(self, skill):
+        """A comparison key for a skill: its canonical ID, else its normalized text."""
+        return self.skill_id(skill) or normalize_text(clean_skill(skill))
+
+    def display_name(self, key):
+        return self.names.get(key, key)
+
+    def canonicalize(self, skills):
+        """
+        Maps a list of skills to canonical display names, without duplicates.
+        A string that is not a known skill is scanned for known skills
+        ("Python/Django"), and kept as written if it contains none.
+        """
+        return list(self.canonical(skills).values())
+
+    def canonical(self, skills):
+        """The skills canonicalize() would return, keyed by their comparison key (see key())."""
+        canonical = {}
+        for skill in skills or []:
+            if isinstance(skill, dict):
+                skill = skill.get("name", "")
+            skill_id = self.skill_id(skill)
+            found = [skill_id] if skill_id else self.find(skill)
+            if found:
+                for skill_id in found:
+                    canonical.setdefault(skill_id, self.names[skill_id])
+            elif clean_skill(skill):
+                canonical.setdefault(normalize_text(clean_skill(skill)), clean_skill(skill))
+        return canonical
+
+
+_taxonomy = None
+_taxonomy_lock = threading.Lock()
+
+
+def get_skill_taxonomy():
+    """The taxonomy from SKILL_TAXONOMY_PATH, loaded on first use."""
+    global _taxonomy
+    if _taxonomy is None:
+        with _taxonomy_lock:
+            if _taxonomy is None:
+                _taxonomy = SkillTaxonomy.load(settings.SKILL_TAXONOMY_PATH)
+    return _taxonomy
+
+
+def canonicalize_skills(skills):
+    """Canonical display names for a list of skills; see SkillTaxonomy.canonicalize."""
+    return get_skill_taxonomy().canonicalize(skills)
+
+
+def find_skills(text):
+    """Display names of the known skills mentioned in free text such as a resume."""
+    taxonomy = get_skill_taxonomy()
+    return [taxonomy.display_name(skill_id) for skill_id in taxonomy.find(text)]
@@ -1,3 +1,830 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+import zipfile
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+import numpy as np
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from api.cache import CountingCache
+from api.llm_client import (
+    FUNCTION_SCHEMAS, CircuitBreaker, LLMUnavailableError, TokenBucket, backoff_delay, call_llm, estimate_text_tokens,
+    make_cache_key, retry_after_seconds
+)
+from api.extractors import extract_docx_text, extract_html_text, extract_odt_text, extract_rtf_text
+from api.formats import UnsupportedFileError, detect_format
+from api.models import CandidateProfile, JobMatch, JobPosting, ResumeParseTask, Skill
+from api.resume_tasks import claim_task, process_task
+from api.serializers import CandidateProfilePromptSerializer, JobPostingPromptSerializer
+from api.sandbox import SandboxError, SandboxMemoryExceeded, SandboxPool, SandboxTimeout
+from api.services import MULTI_MATCH_PROMPT, compact_job, job_batches, parse_multi_match
+from api.skill_index import SkillIndex, get_skill_index
+from api.skills import SkillMatcher, SkillTaxonomy
+from api.vector_index import VectorStore
 
-# Create your tests here.
+WORD = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+MARKUP_COMPATIBILITY = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+ODT_NAMESPACES = (
+    'xmlns:office="urn:oasis:names:tc:opendocument:xmlns:office:1.0" '
+    'xmlns:text="urn:oasis:names:tc:opendocument:xmlns:text:1.0" '
+    'xmlns:table="urn:oasis:names:tc:opendocument:xmlns:table:1.0"'
+)
+
+
+def hold_memory(megabytes, seconds):
+    """Sandbox job that keeps a block of memory resident for a while."""
+    block = bytearray(megabytes * 1024 * 1024)
+    block[::4096] = b"x" * len(block[::4096])
+    time.sleep(seconds)
+    return len(block)
+
+
+def zip_bytes(parts):
+    """An in-memory ZIP archive of {name: text} parts."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, text in parts.items():
+            archive.writestr(name, text)
+    return buffer.getvalue()
+
+
+def word_part(root, body):
+    return f'<w:{root} xmlns:w="{WORD}" xmlns:mc="{MARKUP_COMPATIBILITY}">{body}</w:{root}>'
+
+
+def word_paragraph(*texts):
+    return "<w:p><w:r>" + "".join(f"<w:t>{text}</w:t>" for text in texts) + "</w:r></w:p>"
+
+
+def api_error(headers):
+    """A stand-in for an openai error carrying a response with the given headers."""
+    return SimpleNamespace(response=SimpleNamespace(headers=headers))
+
+
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("api.llm_client.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reserve_within_capacity_does_not_wait(self):
+        bucket = TokenBucket(60)
+        self.assertEqual(bucket.reserve(60), 0.0)
+
+    def test_reserve_past_capacity_waits_for_refill(self):
+        bucket = TokenBucket(60)
+        bucket.reserve(60)
+        # One token per second at 60 per minute
+        self.assertAlmostEqual(bucket.reserve(3), 3.0)
+        self.assertAlmostEqual(bucket.reserve(1), 4.0)
+
+    def test_refills_over_time_up_to_capacity(self):
+        bucket = TokenBucket(60)
+        bucket.reserve(60)
+        self.now += 10
+        self.assertEqual(bucket.reserve(10), 0.0)
+        self.now += 3600
+        self.assertEqual(bucket.reserve(60), 0.0)
+        self.assertGreater(bucket.reserve(1), 0.0)
+
+    def test_refund_returns_tokens(self):
+        bucket = TokenBucket(60)
+        bucket.reserve(60)
+        bucket.refund(5)
+        self.assertEqual(bucket.reserve(5), 0.0)
+
+    def test_zero_rate_is_unlimited(self):
+        bucket = TokenBucket(0)
+        self.assertEqual(bucket.reserve(10 ** 9), 0.0)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("api.llm_client.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+
+    def open_circuit(self):
+        for _ in range(3):
+            self.breaker.before_call()
+            self.breaker.record_failure()
+
+    def test_closed_until_the_threshold(self):
+        for _ in range(2):
+            self.breaker.before_call()
+            self.breaker.record_failure()
+        self.assertFalse(self.breaker.before_call())
+
+    def test_success_resets_the_failure_count(self):
+        for _ in range(2):
+            self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertFalse(self.breaker.before_call())
+
+    def test_open_circuit_rejects_calls_with_retry_after(self):
+        self.open_circuit()
+        self.now += 10
+        with self.assertRaises(LLMUnavailableError) as raised:
+            self.breaker.before_call()
+        self.assertAlmostEqual(raised.exception.retry_after, 20.0)
+
+    def test_half_open_lets_one_trial_through(self):
+        self.open_circuit()
+        self.now += 31
+        self.assertTrue(self.breaker.before_call())
+        with self.assertRaises(LLMUnavailableError):
+            self.breaker.before_call()
+
+    def test_successful_trial_closes_the_circuit(self):
+        self.open_circuit()
+        self.now += 31
+        self.breaker.before_call()
+        self.breaker.record_success()
+        self.assertFalse(self.breaker.before_call())
+        self.assertFalse(self.breaker.before_call())
+
+    def test_failed_trial_reopens_the_circuit(self):
+        self.open_circuit()
+        self.now += 31
+        self.breaker.before_call()
+        self.breaker.record_failure()
+        self.now += 29
+        with self.assertRaises(LLMUnavailableError):
+            self.breaker.before_call()
+        self.now += 2
+        self.assertTrue(self.breaker.before_call())
+
+    def test_released_trial_lets_another_call_try(self):
+        # A trial cancelled before it finished records no outcome
+        self.open_circuit()
+        self.now += 31
+        self.breaker.before_call()
+        self.breaker.release_trial()
+        self.assertTrue(self.breaker.before_call())
+
+
+class RetryAfterTests(SimpleTestCase):
+    def test_milliseconds_header_takes_precedence(self):
+        self.assertEqual(retry_after_seconds(api_error({"retry-after-ms": "1500", "retry-after": "9"})), 1.5)
+
+    def test_seconds_header(self):
+        self.assertEqual(retry_after_seconds(api_error({"retry-after": "7"})), 7.0)
+
+    def test_http_date_header(self):
+        with mock.patch("api.llm_client.time.time", return_value=784111767.0):
+            # 10 seconds after the patched clock
+            self.assertEqual(retry_after_seconds(api_error({"retry-after": "Sun, 06 Nov 1994 08:49:37 GMT"})), 10.0)
+
+    def test_missing_or_invalid_header(self):
+        self.assertIsNone(retry_after_seconds(api_error({})))
+        self.assertIsNone(retry_after_seconds(api_error({"retry-after": "soon"})))
+        self.assertIsNone(retry_after_seconds(ValueError("no response")))
+
+
+@override_settings(LLM_BACKOFF_BASE=1.0, LLM_BACKOFF_MAX=8.0)
+class BackoffDelayTests(SimpleTestCase):
+    def test_full_jitter_grows_exponentially_up_to_the_cap(self):
+        with mock.patch("api.llm_client.random.uniform", side_effect=lambda low, high: high):
+            self.assertEqual([backoff_delay(attempt) for attempt in range(5)], [1.0, 2.0, 4.0, 8.0, 8.0])
+
+    def test_delay_is_random_below_the_bound(self):
+        for _ in range(20):
+            self.assertTrue(0 <= backoff_delay(2) <= 4.0)
+
+    def test_retry_after_takes_precedence_and_is_capped(self):
+        self.assertEqual(backoff_delay(0, api_error({"retry-after": "5"})), 5.0)
+        self.assertEqual(backoff_delay(0, api_error({"retry-after": "60"})), 8.0)
+
+
+class SandboxPoolTests(SimpleTestCase):
+    def make_pool(self, **options):
+        # Forked workers can run the helpers in this module without importing Django
+        pool = SandboxPool(size=1, timeout=10, start_method="fork", **options)
+        self.addCleanup(pool.shutdown)
+        return pool
+
+    def test_returns_the_job_result(self):
+        self.assertEqual(self.make_pool().run(pow, 2, 10), 1024)
+
+    def test_job_errors_are_raised_as_sandbox_errors(self):
+        with self.assertRaises(SandboxError) as raised:
+            self.make_pool().run(int, "not a number")
+        self.assertNotIsInstance(raised.exception, SandboxTimeout)
+        self.assertIn("not a number", str(raised.exception))
+
+    def test_timeout_kills_the_worker_and_the_pool_recovers(self):
+        pool = self.make_pool()
+        first_pid = pool.run(os.getpid)
+        started = time.monotonic()
+        with self.assertRaises(SandboxTimeout):
+            pool.run(time.sleep, 30, timeout=0.5)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertNotEqual(pool.run(os.getpid), first_pid)
+
+    @unittest.skipUnless(os.path.exists("/proc/self/statm"), "RSS is read from /proc")
+    def test_memory_limit_kills_the_worker_and_the_pool_recovers(self):
+        pool = self.make_pool(max_rss_bytes=64 * 1024 * 1024)
+        with self.assertRaises(SandboxMemoryExceeded):
+            pool.run(hold_memory, 256, 5)
+        self.assertEqual(pool.run(pow, 2, 3), 8)
+
+    def test_workers_are_recycled_after_max_jobs(self):
+        pool = self.make_pool(max_jobs_per_worker=1)
+        self.assertNotEqual(pool.run(os.getpid), pool.run(os.getpid))
+
+
+class DocxExtractionTests(SimpleTestCase):
+    def test_paragraphs_tables_and_text_boxes_in_document_order(self):
+        text_box = "<w:txbxContent>" + word_paragraph("Open to relocation") + "</w:txbxContent>"
+        body = (
+            word_paragraph("Jane Doe")
+            + "<w:p><w:r><w:t>Senior</w:t><w:tab/><w:t>Engineer</w:t><w:br/><w:t>Acme</w:t></w:r></w:p>"
+            + "<w:tbl><w:tr><w:tc>" + word_paragraph("Python") + "</w:tc>"
+            + "<w:tc>" + word_paragraph("5 years") + "</w:tc></w:tr></w:tbl>"
+            # The text box has a legacy fallback copy that must not be read twice
+            + "<w:p><w:r><mc:AlternateContent><mc:Choice>" + text_box + "</mc:Choice>"
+            + "<mc:Fallback>" + text_box + "</mc:Fallback></mc:AlternateContent>"
+            + "<w:t>Contact</w:t></w:r></w:p>"
+        )
+        docx = zip_bytes({"word/document.xml": word_part("document", f"<w:body>{body}</w:body>")})
+        self.assertEqual(
+            extract_docx_text(docx),
+            "Jane Doe\nSenior\tEngineer\nAcme\nPython\t5 years\nOpen to relocation\nContact"
+        )
+
+    def test_headers_and_footers_are_included_once(self):
+        docx = zip_bytes({
+            "word/document.xml": word_part("document", "<w:body>" + word_paragraph("Body") + "</w:body>"),
+            "word/header2.xml": word_part("hdr", word_paragraph("jane@example.com")),
+            "word/header1.xml": word_part("hdr", word_paragraph("jane@example.com")),
+            "word/footer1.xml": word_part("ftr", word_paragraph("Page 1")),
+        })
+        self.assertEqual(extract_docx_text(docx), "jane@example.com\nBody\nPage 1")
+
+    def test_rejects_archives_without_a_document(self):
+        with self.assertRaises(ValueError):
+            extract_docx_text(zip_bytes({"content.xml": "<office:document-content/>"}))
+
+
+class RtfExtractionTests(SimpleTestCase):
+    def test_text_escapes_and_special_characters(self):
+        rtf = (
+            rb"{\rtf1\ansi\ansicpg1252{\fonttbl{\f0 Arial;}}{\*\generator Word;}"
+            rb"Jos\'e9 Garc\'eda\par Caf\u233?\par Skills:\tab Python\emdash Django}"
+        )
+        self.assertEqual(extract_rtf_text(rtf), "José García\nCafé\nSkills:\tPython—Django")
+
+    def test_skips_ignorable_destinations(self):
+        rtf = rb"{\rtf1{\info{\author Someone}}{\*\unknowngroup hidden}Visible\{text\}}"
+        self.assertEqual(extract_rtf_text(rtf), "Visible{text}")
+
+
+class OdtExtractionTests(SimpleTestCase):
+    def test_headings_paragraphs_and_tables_in_document_order(self):
+        content = (
+            f"<office:document-content {ODT_NAMESPACES}><office:body><office:text>"
+            "<text:h>Jane Doe</text:h>"
+            "<text:p>Senior<text:tab/>Engineer<text:line-break/>Acme <text:span>Corp</text:span></text:p>"
+            '<text:p>A<text:s text:c="3"/>B</text:p>'
+            "<table:table><table:table-row>"
+            "<table:table-cell><text:p>Python</text:p></table:table-cell>"
+            "<table:table-cell><text:p>5 years</text:p></table:table-cell>"
+            "</table:table-row></table:table>"
+            "</office:text></office:body></office:document-content>"
+        )
+        odt = zip_bytes({"mimetype": "application/vnd.oasis.opendocument.text", "content.xml": content})
+        self.assertEqual(extract_odt_text(odt), "Jane Doe\nSenior\tEngineer\nAcme Corp\nA   B\nPython\t5 years")
+
+    def test_rejects_archives_without_content(self):
+        with self.assertRaises(ValueError):
+            extract_odt_text(zip_bytes({"word/document.xml": "<w:document/>"}))
+
+
+class HtmlExtractionTests(SimpleTestCase):
+    def test_visible_text_one_line_per_block(self):
+        html = (
+            b"<html><head><title>CV</title><style>p { color: red }</style></head><body>"
+            b"<h1>Jane&nbsp;Doe</h1><script>track()</script>"
+            b"<p>Python   developer<br>Remote</p>"
+            b"<table><tr><td>Skills</td><td>Django</td></tr></table></body></html>"
+        )
+        self.assertEqual(extract_html_text(html), "Jane Doe\nPython developer\nRemote\nSkills\tDjango")
+
+    def test_decodes_windows_1252(self):
+        self.assertEqual(extract_html_text("<p>René</p>".encode("cp1252")), "René")
+
+
+class DetectFormatTests(SimpleTestCase):
+    PDF = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n1 0 obj\n<< /Type /Catalog >>\nendobj\n"
+
+    def test_formats_identified_by_content_and_extension(self):
+        self.assertEqual(detect_format(self.PDF, "resume.pdf"), "pdf")
+        self.assertEqual(detect_format(self.PDF, "RESUME.PDF"), "pdf")
+        self.assertEqual(detect_format(rb"{\rtf1\ansi Jane Doe}", "resume.rtf"), "rtf")
+        self.assertEqual(detect_format(b"<html><body><p>Jane Doe</p></body></html>", "resume.html"), "html")
+        self.assertEqual(detect_format(b"Jane Doe\nPython developer\n", "resume.txt"), "txt")
+
+    def test_generic_zip_is_told_apart_by_extension(self):
+        archive = zip_bytes({"[Content_Types].xml": "<Types/>", "word/document.xml": "<w:document/>"})
+        self.assertEqual(detect_format(archive, "resume.docx"), "docx")
+        self.assertEqual(detect_format(archive, "resume.odt"), "odt")
+        with self.assertRaises(UnsupportedFileError):
+            detect_format(archive, "resume.zip")
+
+    def test_extension_that_contradicts_the_content(self):
+        with self.assertRaisesMessage(UnsupportedFileError, "does not match its content (PDF)"):
+            detect_format(self.PDF, "resume.docx")
+
+    def test_unsupported_content(self):
+        with self.assertRaisesMessage(UnsupportedFileError, "Unsupported file type"):
+            detect_format(b"\x89PNG\r\n\x1a\n" + b"\0" * 64, "resume.pdf")
+
+
+class SkillMatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.matcher = SkillMatcher({
+            "java": "java", "javascript": "javascript", "c++": "cpp", ".net": "dotnet",
+            "machine learning": "ml", "learning": "learning",
+        })
+
+    def values(self, text):
+        return [value for _, _, value in self.matcher.find(text)]
+
+    def test_matches_only_on_word_boundaries(self):
+        self.assertEqual(self.values("javascript and java"), ["javascript", "java"])
+        self.assertEqual(self.values("javanese"), [])
+
+    def test_keeps_the_longest_match(self):
+        self.assertEqual(self.values("machine learning engineer"), ["ml"])
+
+    def test_symbol_edges_need_no_boundary(self):
+        self.assertEqual(self.values("vb.net and c++ developer"), ["dotnet", "cpp"])
+
+    def test_returns_positions(self):
+        self.assertEqual(self.matcher.find("i use java"), [(6, 10, "java")])
+
+
+class SkillTaxonomyTests(SimpleTestCase):
+    def setUp(self):
+        self.taxonomy = SkillTaxonomy({"skills": [
+            {"id": "python", "name": "Python", "synonyms": ["python", "python3"]},
+            {"id": "django", "name": "Django", "synonyms": ["django"]},
+            {"id": "rest_api", "name": "REST APIs", "synonyms": ["rest api", "restful services"],
+             "exact_synonyms": ["rest"]},
+        ]})
+
+    def test_canonicalize_maps_synonyms_and_splits_compound_skills(self):
+        self.assertEqual(
+            self.taxonomy.canonicalize(["python3", "Python/Django", "REST", " Kubernetes. ", "django"]),
+            ["Python", "Django", "REST APIs", "Kubernetes"]
+        )
+
+    def test_canonical_keys(self):
+        self.assertEqual(
+            self.taxonomy.canonical([{"name": "Rest-API"}, "Kubernetes"]),
+            {"rest_api": "REST APIs", "kubernetes": "Kubernetes"}
+        )
+        self.assertEqual(self.taxonomy.key("Some  Skill"), "some skill")
+
+    def test_exact_synonyms_are_not_found_in_free_text(self):
+        self.assertEqual(self.taxonomy.find("Built RESTful services in python3, then took a rest"), ["rest_api", "python"])
+        self.assertEqual(self.taxonomy.find("time to rest"), [])
+
+
+class ParseMultiMatchTests(SimpleTestCase):
+    def entry(self, job_id, **fields):
+        return {"job_id": job_id, "match_score": 80, "missing_skills": [], "summary": "Good fit", **fields}
+
+    def test_keeps_well_formed_entries_for_requested_jobs(self):
+        response = json.dumps({"matches": [
+            self.entry(1),
+            self.entry("2", match_score=87.6, missing_skills=["AWS"]),
+            self.entry(3),
+        ]})
+        self.assertEqual(parse_multi_match(response, {1, 2}), {
+            1: {"match_score": 80, "missing_skills": [], "summary": "Good fit"},
+            2: {"match_score": 88, "missing_skills": ["AWS"], "summary": "Good fit"},
+        })
+
+    def test_drops_malformed_entries(self):
+        response = json.dumps({"matches": [
+            self.entry(1, match_score=140),
+            self.entry(2, missing_skills="AWS"),
+            self.entry(3, summary=None),
+            {"job_id": 4, "match_score": 50},
+            self.entry("five"),
+            "not an entry",
+        ]})
+        self.assertEqual(parse_multi_match(response, {1, 2, 3, 4, 5}), {})
+
+    def test_first_entry_for_a_job_wins(self):
+        response = json.dumps({"matches": [self.entry(1, match_score=10), self.entry(1, match_score=90)]})
+        self.assertEqual(parse_multi_match(response, {1})[1]["match_score"], 10)
+
+    def test_unusable_responses(self):
+        for response in [None, "not json", json.dumps({"results": []}), json.dumps({"matches": {"job_id": 1}})]:
+            self.assertEqual(parse_multi_match(response, {1}), {})
+
+
+class JobBatchesTests(SimpleTestCase):
+    candidate = {"name": "Jane Doe", "skills": ["Python"]}
+    jobs = [
+        {"id": index, "title": f"Job {index}", "company": "Acme", "required_skills": ["Python"], "description": "Build APIs"}
+        for index in range(7)
+    ]
+
+    @override_settings(MULTI_MATCH_TOKEN_BUDGET=10 ** 6, MULTI_MATCH_MAX_JOBS=3)
+    def test_batches_hold_at_most_max_jobs(self):
+        self.assertEqual(list(job_batches(self.candidate, self.jobs)), [[0, 1, 2], [3, 4, 5], [6]])
+
+    @override_settings(MULTI_MATCH_TOKEN_BUDGET=1, MULTI_MATCH_MAX_JOBS=10)
+    def test_each_batch_takes_at_least_one_job(self):
+        self.assertEqual(list(job_batches(self.candidate, self.jobs)), [[index] for index in range(7)])
+
+    @override_settings(MULTI_MATCH_MAX_JOBS=10, MULTI_MATCH_COMPLETION_TOKENS_PER_JOB=1000)
+    def test_token_budget_splits_batches(self):
+        base_tokens = estimate_text_tokens(
+            [MULTI_MATCH_PROMPT, self.candidate, FUNCTION_SCHEMAS["match_candidate_to_jobs"]]
+        )
+        job_tokens = estimate_text_tokens(compact_job(self.jobs[0])) + 1000
+        # Room for exactly two jobs per call
+        with override_settings(MULTI_MATCH_TOKEN_BUDGET=base_tokens + 2 * job_tokens):
+            batches = list(job_batches(self.candidate, self.jobs))
+        self.assertEqual(batches, [[0, 1], [2, 3], [4, 5], [6]])
+
+    def test_no_jobs(self):
+        self.assertEqual(list(job_batches(self.candidate, [])), [])
+
+
+class SkillLinkTests(TestCase):
+    def test_skills_longer_than_the_columns_are_not_linked(self):
+        job = JobPosting.objects.create(
+            title="Developer", company="Acme", description="Build APIs",
+            required_skills=["Python", "x" * 300, "Kubernetes"]
+        )
+        self.assertEqual(sorted(job.skill_links.values_list("name", flat=True)), ["Kubernetes", "Python"])
+        job.required_skills = ["y " * 200]
+        job.save()
+        self.assertFalse(job.skill_links.exists())
+        self.assertFalse(Skill.objects.filter(name__startswith="x").exists())
+
+
+class PromptSerializerTests(TestCase):
+    def test_saving_a_job_again_leaves_its_prompt_data_unchanged(self):
+        job = JobPosting.objects.create(title="Developer", company="Acme", description="Build APIs", required_skills=["Python"])
+        before = JobPostingPromptSerializer(job).data
+        job.save()
+        job.refresh_from_db()
+        self.assertEqual(JobPostingPromptSerializer(job).data, before)
+        self.assertNotIn("updated_at", before)
+        self.assertNotIn("content_fingerprint", before)
+
+    def test_candidate_prompt_data_leaves_out_bookkeeping_fields(self):
+        candidate = CandidateProfile.objects.create(
+            name="Ada", email="ada@example.com", skills=["Python"], resume_file="resumes/ada.pdf",
+            resume_hash="a" * 64, parse_schema_version=3
+        )
+        data = CandidateProfilePromptSerializer(candidate).data
+        self.assertEqual(data["skills"], ["Python"])
+        for field in ["content_fingerprint", "resume_hash", "parse_schema_version", "resume_text", "parse_response"]:
+            self.assertNotIn(field, data)
+
+
+class MatchViewTests(TestCase):
+    def setUp(self):
+        self.candidate = CandidateProfile.objects.create(
+            name="Ada", email="ada@example.com", skills=["Python"], resume_file="resumes/ada.pdf"
+        )
+        self.job = JobPosting.objects.create(
+            title="Developer", company="Acme", description="Build APIs", required_skills=["Python", "Go"]
+        )
+
+    def match(self, match_data):
+        with mock.patch("api.views.amatch_candidate_to_job", mock.AsyncMock(return_value=match_data)):
+            return self.client.post(
+                "/api/matches/match/", {"candidate_id": self.candidate.id, "job_id": self.job.id, "force": True},
+                content_type="application/json"
+            )
+
+    def test_llm_match_data_is_coerced_and_extra_keys_are_ignored(self):
+        response = self.match({"match_score": "87", "missing_skills": ["Go"], "summary": "Close fit", "reasoning": "..."})
+        self.assertEqual(response.status_code, 201)
+        match = JobMatch.objects.get()
+        self.assertEqual((match.match_score, match.missing_skills, match.summary), (87, ["Go"], "Close fit"))
+
+        response = self.match({"match_score": 60})
+        self.assertEqual(response.status_code, 200)
+        match = JobMatch.objects.get()
+        self.assertEqual((match.match_score, match.missing_skills, match.summary), (60, [], ""))
+
+    def test_malformed_match_data_stores_nothing(self):
+        response = self.match({"summary": "No score"})
+        self.assertEqual(response.status_code, 500)
+        self.assertFalse(JobMatch.objects.exists())
+
+
+def unit(dim, index):
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[index] = 1.0
+    return vector
+
+
+class VectorStoreTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = VectorStore(directory.name, "jobs", 4)
+        self.store.replace_all([(1, unit(4, 0)), (2, unit(4, 1)), (3, unit(4, 2))])
+
+    def ids(self, query, limit=10):
+        return [row_id for row_id, _ in self.store.search(query, limit)[0]]
+
+    def test_append_before_the_store_is_built_is_ignored(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = VectorStore(directory, "jobs", 4)
+            store.append(1, unit(4, 0))
+            self.assertFalse(store.exists())
+
+    def test_reindexed_row_supersedes_its_old_vector(self):
+        self.store.append(1, unit(4, 3))
+        self.assertEqual(self.ids(unit(4, 3), limit=1), [1])
+        # The old vector no longer matches, and the row is returned once
+        results = self.store.search(unit(4, 0), 10)[0]
+        self.assertEqual([row_id for row_id, score in results if score > 0], [])
+        self.assertEqual(sorted(self.ids(unit(4, 0))), [1, 2, 3])
+
+    def test_tombstoned_row_is_never_returned(self):
+        self.store.remove(2)
+        self.assertNotIn(2, self.ids(unit(4, 1)))
+        self.assertEqual(sorted(self.ids(unit(4, 1))), [1, 3])
+        # Appending after a tombstone brings the row back
+        self.store.append(2, unit(4, 1))
+        self.assertEqual(self.ids(unit(4, 1), limit=1), [2])
+
+    def test_replace_all_compaction_keeps_results(self):
+        self.store.append(1, unit(4, 3))
+        self.store.remove(2)
+        queries = np.stack([unit(4, index) for index in range(4)])
+        before = [sorted(results) for results in self.store.search(queries, 10)]
+        self.store.replace_all([(1, unit(4, 3)), (3, unit(4, 2))])
+        self.assertEqual([sorted(results) for results in self.store.search(queries, 10)], before)
+        self.assertEqual(os.path.getsize(self.store.ids_path), 2 * 8)
+
+
+PARSED_RESUME = {"name": "Ada", "email": "ada@example.com", "skills": ["Python"], "schema_version": 1}
+
+
+@override_settings(RESUME_TASK_MAX_ATTEMPTS=3, RESUME_TASK_VISIBILITY_TIMEOUT=300, RESUME_TASK_RETRY_DELAY=10)
+class ResumeTaskTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_root = override_settings(MEDIA_ROOT=media.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+
+    def queue(self, **fields):
+        name = default_storage.save("resumes/ada.pdf", ContentFile(b"%PDF-1.4"))
+        return ResumeParseTask.objects.create(resume_file=name, file_format="pdf", content_hash="a" * 64, **fields)
+
+    def process(self, task, **parse):
+        with mock.patch("api.resume_tasks.parse_resume", **parse) as parse_resume:
+            process_task(task)
+        task.refresh_from_db()
+        return parse_resume
+
+    def test_expired_lease_is_reclaimed(self):
+        task = self.queue(status=ResumeParseTask.RUNNING, attempts=1, available_at=timezone.now() + timedelta(seconds=60))
+        self.assertIsNone(claim_task())
+        ResumeParseTask.objects.filter(id=task.id).update(available_at=timezone.now() - timedelta(seconds=1))
+        claimed = claim_task()
+        self.assertEqual((claimed.id, claimed.status, claimed.attempts), (task.id, ResumeParseTask.RUNNING, 2))
+        self.assertGreater(claimed.available_at, timezone.now())
+
+    def test_worker_that_lost_its_lease_does_not_save(self):
+        task = self.queue()
+        claimed = claim_task()
+
+        def parse_resume(*args, **kwargs):
+            # Another worker takes the task over while this one is parsing
+            ResumeParseTask.objects.filter(id=task.id).update(attempts=claimed.attempts + 1)
+            return PARSED_RESUME
+
+        self.process(claimed, side_effect=parse_resume)
+        self.assertFalse(CandidateProfile.objects.exists())
+        self.assertEqual(claimed.status, ResumeParseTask.RUNNING)
+        self.assertTrue(default_storage.exists(claimed.resume_file.name))
+
+    def test_parsed_resume_creates_the_candidate(self):
+        self.queue()
+        task = claim_task()
+        self.process(task, return_value=PARSED_RESUME)
+        self.assertEqual(task.status, ResumeParseTask.DONE)
+        self.assertEqual(task.candidate.name, "Ada")
+        self.assertEqual(task.candidate.resume_hash, "a" * 64)
+
+    def test_sandbox_limit_fails_on_the_first_attempt(self):
+        self.queue()
+        task = claim_task()
+        self.process(task, side_effect=SandboxTimeout("Took longer than 30s"))
+        self.assertEqual((task.status, task.attempts), (ResumeParseTask.FAILED, 1))
+        self.assertIn("Took longer than 30s", task.error)
+        self.assertEqual(task.resume_file.name, "")
+
+    def test_failed_attempt_is_retried_with_backoff(self):
+        self.queue()
+        task = claim_task()
+        with self.assertLogs("api.resume_tasks", "WARNING"):
+            self.process(task, side_effect=ValueError("Bad response"))
+        self.assertEqual((task.status, task.error), (ResumeParseTask.QUEUED, "Bad response"))
+        self.assertGreater(task.available_at, timezone.now() + timedelta(seconds=5))
+
+    def test_last_attempt_failing_fails_the_task_and_deletes_the_file(self):
+        self.queue(attempts=2)
+        task = claim_task()
+        name = task.resume_file.name
+        self.process(task, side_effect=ValueError("Bad response"))
+        self.assertEqual((task.status, task.error), (ResumeParseTask.FAILED, "Bad response"))
+        self.assertEqual(task.resume_file.name, "")
+        self.assertFalse(default_storage.exists(name))
+
+    def test_task_past_max_attempts_times_out_without_parsing(self):
+        self.queue(status=ResumeParseTask.RUNNING, attempts=3, available_at=timezone.now() - timedelta(seconds=1))
+        task = claim_task()
+        name = task.resume_file.name
+        parse_resume = self.process(task)
+        parse_resume.assert_not_called()
+        self.assertEqual((task.status, task.error), (ResumeParseTask.FAILED, "Timed out"))
+        self.assertFalse(default_storage.exists(name))
+
+
+class JobListTests(TestCase):
+    def setUp(self):
+        self.jobs = [
+            JobPosting.objects.create(
+                title=f"Developer {index}", company="Acme", description="Build APIs", required_skills=["Python"]
+            )
+            for index in range(3)
+        ]
+
+    def test_matching_etag_returns_not_modified(self):
+        response = self.client.get("/api/jobs/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 3)
+        response = self.client.get("/api/jobs/", headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_changing_a_row_on_the_page_changes_the_etag(self):
+        etag = self.client.get("/api/jobs/")["ETag"]
+        self.jobs[1].title = "Senior Developer"
+        self.jobs[1].save()
+        response = self.client.get("/api/jobs/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+        etag = response["ETag"]
+        self.jobs[0].delete()
+        self.assertNotEqual(self.client.get("/api/jobs/", headers={"If-None-Match": etag}).status_code, 304)
+
+    def test_fields_selects_the_returned_fields_and_always_includes_id(self):
+        response = self.client.get("/api/jobs/", {"fields": "title, company"})
+        self.assertEqual(response.status_code, 200)
+        for row in response.json()["results"]:
+            self.assertEqual(set(row), {"id", "title", "company"})
+
+    def test_unknown_field_is_rejected(self):
+        for fields in ["title,salary", "job_text", "search_vector"]:
+            response = self.client.get("/api/jobs/", {"fields": fields})
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("Unknown fields", response.json()["error"])
+
+
+def rows_manager(rows):
+    """A stand-in for Model.objects whose values_list() yields the given (id, skills) rows."""
+    return SimpleNamespace(values_list=lambda *fields: SimpleNamespace(iterator=lambda: iter(rows)))
+
+
+class SkillIndexTests(SimpleTestCase):
+    def setUp(self):
+        taxonomy = SkillTaxonomy({"skills": [
+            {"id": "python", "name": "Python", "synonyms": ["python", "python3"]},
+            {"id": "django", "name": "Django", "synonyms": ["django"]},
+            {"id": "sql", "name": "SQL", "synonyms": ["sql"]},
+        ]})
+        patcher = mock.patch("api.skill_index.get_skill_taxonomy", return_value=taxonomy)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.index = SkillIndex()
+        self.index.set_job(1, ["Python", "Django", "SQL", "Go"])
+        self.index.set_job(2, ["python3"])
+        self.index.set_job(3, ["Django", "SQL"])
+        self.index.set_job(4, ["Rust"])
+
+    def test_rank_jobs_by_coverage_then_matched_count(self):
+        ranked = self.index.rank_jobs(["Python", "django", "SQL"])
+        self.assertEqual([(match.id, match.score) for match in ranked], [(3, 100), (2, 100), (1, 75)])
+        self.assertEqual(ranked[2].matched_skills, ["Django", "Python", "SQL"])
+        self.assertEqual(ranked[2].missing_skills, ["go"])
+        self.assertEqual([match.id for match in self.index.rank_jobs(["Python", "Django", "SQL"], limit=1)], [3])
+
+    def test_rank_candidates_by_skills_matched(self):
+        self.index.set_candidate(10, ["Python"])
+        self.index.set_candidate(11, ["Python", "SQL", "Rust"])
+        self.index.set_candidate(12, ["Rust"])
+        ranked = self.index.rank_candidates(["Python", "SQL", "Go"])
+        self.assertEqual([(match.id, match.score) for match in ranked], [(11, 67), (10, 33)])
+        self.assertEqual(ranked[1].missing_skills, ["SQL", "go"])
+        self.assertEqual(self.index.rank_candidates([]), [])
+
+    def test_removed_and_updated_rows_are_reranked(self):
+        self.index.remove_job(3)
+        self.index.set_job(2, ["Rust"])
+        self.assertEqual([match.id for match in self.index.rank_jobs(["Python", "Django", "SQL"])], [1])
+
+    @override_settings(SKILL_INDEX_TTL=60)
+    def test_index_is_rebuilt_once_older_than_the_ttl(self):
+        index = SkillIndex()
+        with mock.patch("api.skill_index.skill_index", index), \
+                mock.patch("api.skill_index.time.monotonic", return_value=1000.0) as monotonic, \
+                mock.patch("api.skill_index.JobPosting.objects", rows_manager([(1, ["Python"])])), \
+                mock.patch("api.skill_index.CandidateProfile.objects", rows_manager([(10, ["Python"])])):
+            self.assertEqual([match.id for match in get_skill_index().rank_jobs(["Python"])], [1])
+            self.assertEqual([match.id for match in get_skill_index().rank_candidates(["Python"])], [10])
+
+            with mock.patch("api.skill_index.JobPosting.objects", rows_manager([(1, ["Python"]), (2, ["Python"])])):
+                monotonic.return_value = 1060.0
+                self.assertEqual([match.id for match in get_skill_index().rank_jobs(["Python"])], [1])
+                monotonic.return_value = 1061.0
+                self.assertEqual([match.id for match in get_skill_index().rank_jobs(["Python"])], [1, 2])
+
+
+class CacheKeyTests(SimpleTestCase):
+    arguments = {"candidate_data": {"name": "Ada", "skills": ["Python"]}, "job_data": {"title": "Developer"}}
+
+    def key(self, **overrides):
+        call = {"model": "gpt-4o", "system_prompt": "Match them", "function_name": "match_candidate_to_job",
+                "arguments": self.arguments, **overrides}
+        return make_cache_key(call["model"], call["system_prompt"], call["function_name"], call["arguments"])
+
+    def test_key_changes_with_prompt_schema_and_model(self):
+        key = self.key()
+        self.assertNotEqual(self.key(system_prompt="Match them strictly"), key)
+        self.assertNotEqual(self.key(model="gpt-4o-mini"), key)
+        self.assertNotEqual(self.key(arguments={**self.arguments, "job_data": {"title": "Tester"}}), key)
+        schema = {**FUNCTION_SCHEMAS["match_candidate_to_job"], "description": "Score a candidate"}
+        with mock.patch.dict(FUNCTION_SCHEMAS, {"match_candidate_to_job": schema}):
+            self.assertNotEqual(self.key(), key)
+        self.assertEqual(self.key(), key)
+
+    def test_key_is_stable_across_argument_order(self):
+        reordered = {"job_data": {"title": "Developer"}, "candidate_data": {"skills": ["Python"], "name": "Ada"}}
+        self.assertEqual(self.key(arguments=reordered), self.key())
+
+
+@override_settings(OPENAI_MODEL="gpt-4o", LLM_CACHE_TTL={"generate_cover_letter": 60})
+class CallCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = CountingCache("llm", "test")
+        self.cache.backend.clear()
+        self.addCleanup(self.cache.backend.clear)
+        self.backend = mock.Mock()
+        self.backend.complete.side_effect = ['{"cover_letter": "First"}', '{"cover_letter": "Second"}']
+        for target, value in [("api.llm_client.llm_cache", self.cache), ("api.llm_client.get_backend", lambda: self.backend)]:
+            patcher = mock.patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def call(self, **kwargs):
+        return call_llm("Write a letter", "generate_cover_letter", {"candidate_data": {"name": "Ada"}}, **kwargs)
+
+    def test_repeated_call_is_served_from_the_cache(self):
+        self.assertEqual(self.call(), '{"cover_letter": "First"}')
+        self.assertEqual(self.call(), '{"cover_letter": "First"}')
+        self.assertEqual(self.backend.complete.call_count, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_bypass_cache_skips_the_read_but_stores_the_response(self):
+        self.call()
+        self.assertEqual(self.call(bypass_cache=True), '{"cover_letter": "Second"}')
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 1))
+        self.assertEqual(self.call(), '{"cover_letter": "Second"}')
+        self.assertEqual(self.backend.complete.call_count, 2)
+
+    @override_settings(LLM_CACHE_TTL={})
+    def test_uncached_function_never_touches_the_cache(self):
+        self.call()
+        self.call()
+        self.assertEqual(self.backend.complete.call_count, 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 0))
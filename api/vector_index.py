@@ -0,0 +1,317 @@
+"""
+Local vector retrieval between candidates and job postings.
+
+Profiles and postings are turned into fixed-size vectors with a hashing
+vectorizer: words, word pairs and canonical skills are hashed into
+VECTOR_INDEX_DIM signed buckets, weighted by 1 + log(count) and L2
+normalized, so cosine similarity is a dot product. Hashing needs no
+vocabulary, so any row can be vectorized on its own and appended as soon as
+it is saved.
+
+Each kind of row ("jobs", "candidates") is stored in VECTOR_INDEX_DIR as a
+float32 matrix file, memory-mapped for search, and a parallel file of row
+IDs. Saving a row appends a new vector; the last vector written for an ID
+wins. Deleting a row appends a tombstone, a zero vector under the negated
+ID, which hides the row from then on. rebuild_vector_index compacts the files. Appends and rebuilds
+from any process are serialized with an exclusive file lock.
+"""
+import fcntl
+import json
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from contextlib import contextmanager
+import numpy as np
+from django.conf import settings
+from .models import CandidateProfile, JobPosting
+from .skills import get_skill_taxonomy
+
+TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the their this to we will "
+    "with you your who what when where which while were was been being i me my us they them he she his her "
+    "not no but if so than then there these those into over under about after before such can could should "
+    "would may might must shall do does did done also other any all each more most some very etc".split()
+)
+
+# Relative weights of the parts of a profile or posting
+TITLE_WEIGHT = 2.0
+SKILL_WEIGHT = 3.0
+
+# Rows multiplied per matrix product during a search
+SEARCH_BATCH_ROWS = 8192
+
+
+def tokenize(text):
+    return [token for token in TOKEN.findall(str(text).lower()) if token not in STOP_WORDS]
+
+
+def text_features(text, weight=1.0):
+    """Word and adjacent word pair features of a piece of text."""
+    tokens = tokenize(text)
+    features = Counter(tokens)
+    features.update(f"{first} {second}" for first, second in zip(tokens, tokens[1:]))
+    return Counter({feature: count * weight for feature, count in features.items()})
+
+
+def skill_features(skills):
+    """One feature per canonical skill, on top of the skill names' words."""
+    taxonomy = get_skill_taxonomy()
+    features = Counter()
+    for skill in skills or []:
+        if isinstance(skill, dict):
+            skill = skill.get("name", "")
+        features[f"skill:{taxonomy.key(skill)}"] += SKILL_WEIGHT
+        features.update(text_features(skill))
+    return features
+
+
+def flatten_text(value):
+    """The strings inside a JSON value such as work_experience, joined by newlines."""
+    if isinstance(value, dict):
+        return "\n".join(flatten_text(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return "\n".join(flatten_text(item) for item in value)
+    return "" if value is None else str(value)
+
+
+def job_features(job):
+    features = text_features(job.title, TITLE_WEIGHT)
+    features.update(skill_features(job.required_skills))
+    features.update(text_features(job.description))
+    return features
+
+
+def candidate_features(candidate):
+    features = skill_features(candidate.skills)
+    features.update(text_features(flatten_text(candidate.work_experience)))
+    features.update(text_features(flatten_text(candidate.education)))
+    return features
+
+
+def hash_features(features, dim):
+    """Hashes weighted features into a unit-length float32 vector of size dim."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature, count in features.items():
+        if count <= 0:
+            continue
+        # crc32 is stable across processes, unlike hash()
+        h = zlib.crc32(feature.encode("utf-8"))
+        sign = 1.0 if h & 0x80000000 else -1.0
+        vector[h % dim] += sign * (1.0 + math.log(count))
+    norm = np.linalg.norm(vector)
+    if norm:
+        vector /= norm
+    return vector
+
+
+class VectorStore:
+    """An append-only matrix of row vectors plus their row IDs, for one kind of row."""
+
+    def __init__(self, directory, name, dim):
+        self.directory = directory
+        self.dim = dim
+        self.vectors_path = os.path.join(directory, f"{name}.vectors")
+        self.ids_path = os.path.join(directory, f"{name}.ids")
+        self.meta_path = os.path.join(directory, f"{name}.json")
+        self.lock_path = os.path.join(directory, f"{name}.lock")
+        self._snapshot = None
+        self._snapshot_key = None
+        self._snapshot_lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self, mode):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def exists(self):
+        """Whether the store has been built with the current dimension."""
+        try:
+            with open(self.meta_path, "r") as f:
+                return json.load(f).get("dim") == self.dim and os.path.exists(self.ids_path)
+        except (OSError, ValueError):
+            return False
+
+    def remove(self, row_id):
+        """Hides a row from searches by appending its tombstone."""
+        self.append(-row_id, np.zeros(self.dim, dtype=np.float32))
+
+    def append(self, row_id, vector):
+        with self._locked(fcntl.LOCK_EX):
+            if not self.exists():
+                # Never built: the next search builds it from the database instead
+                return
+            # Vector first, then its ID: readers only use rows that have an ID
+            with open(self.vectors_path, "ab") as f:
+                f.write(vector.astype(np.float32).tobytes())
+            with open(self.ids_path, "ab") as f:
+                f.write(np.array([row_id], dtype=np.int64).tobytes())
+
+    def _size(self, path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def replace_all(self, rows):
+        """
+        Writes a fresh, compacted store from (row_id, vector) pairs. Vectors
+        appended while it was being written are carried over, since they may
+        be newer than what `rows` read from the database.
+        """
+        with self._locked(fcntl.LOCK_SH):
+            appended_from = self._size(self.ids_path) // 8 if self.exists() else None
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        vectors_tmp = self.vectors_path + suffix
+        ids_tmp = self.ids_path + suffix
+        count = 0
+        with open(vectors_tmp, "wb") as vectors_file, open(ids_tmp, "wb") as ids_file:
+            for row_id, vector in rows:
+                vectors_file.write(vector.astype(np.float32).tobytes())
+                ids_file.write(np.array([row_id], dtype=np.int64).tobytes())
+                count += 1
+        with self._locked(fcntl.LOCK_EX):
+            if appended_from is not None:
+                appended = self._size(self.ids_path) // 8 - appended_from
+                if appended > 0:
+                    with open(self.vectors_path, "rb") as src, open(vectors_tmp, "ab") as dst:
+                        src.seek(appended_from * 4 * self.dim)
+                        dst.write(src.read(appended * 4 * self.dim))
+                    with open(self.ids_path, "rb") as src, open(ids_tmp, "ab") as dst:
+                        src.seek(appended_from * 8)
+                        dst.write(src.read(appended * 8))
+                    count += appended
+            os.replace(vectors_tmp, self.vectors_path)
+            os.replace(ids_tmp, self.ids_path)
+            with open(self.meta_path, "w") as f:
+                json.dump({"dim": self.dim, "rows": count}, f)
+        return count
+
+    def _load(self):
+        """
+        Returns (ids, matrix) for the current files, where matrix is a
+        read-only memory map and only the latest vector of each ID is kept in
+        ids (superseded rows and tombstones get ID -1). Reloaded only when the
+        files change.
+        """
+        with self._locked(fcntl.LOCK_SH):
+            ids_stat = os.stat(self.ids_path)
+            vectors_stat = os.stat(self.vectors_path)
+            key = (ids_stat.st_ino, ids_stat.st_size, vectors_stat.st_ino, vectors_stat.st_size)
+            with self._snapshot_lock:
+                if key == self._snapshot_key:
+                    return self._snapshot
+                ids = np.fromfile(self.ids_path, dtype=np.int64)
+                rows = min(len(ids), vectors_stat.st_size // (4 * self.dim))
+                ids = ids[:rows]
+                matrix = (
+                    np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+                    if rows else np.zeros((0, self.dim), dtype=np.float32)
+                )
+                # Mask every vector that a later one or a tombstone for the same ID replaced
+                _, last_from_end = np.unique(np.abs(ids[::-1]), return_index=True)
+                latest = np.full(rows, -1, dtype=np.int64)
+                keep = rows - 1 - last_from_end
+                keep = keep[ids[keep] > 0]
+                latest[keep] = ids[keep]
+                self._snapshot = (latest, matrix)
+                self._snapshot_key = key
+                return self._snapshot
+
+    def search(self, queries, limit, exclude_ids=()):
+        """
+        Returns, for each query vector (a row of `queries`), up to `limit`
+        (row_id, similarity) pairs, best first. The stored matrix is multiplied
+        against all queries at once, SEARCH_BATCH_ROWS rows at a time.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        ids, matrix = self._load()
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_ids = np.zeros((len(queries), 0), dtype=np.int64)
+        excluded = np.isin(ids, np.fromiter(exclude_ids, dtype=np.int64)) if exclude_ids else None
+
+        for start in range(0, len(ids), SEARCH_BATCH_ROWS):
+            batch_ids = ids[start:start + SEARCH_BATCH_ROWS]
+            scores = queries @ np.asarray(matrix[start:start + SEARCH_BATCH_ROWS]).T
+            scores[:, batch_ids < 0] = -np.inf
+            if excluded is not None:
+                scores[:, excluded[start:start + SEARCH_BATCH_ROWS]] = -np.inf
+            # Merge this batch with the best rows so far and keep the top `limit`
+            scores = np.concatenate([best_scores, scores], axis=1)
+            chunk_ids = np.concatenate([best_ids, np.broadcast_to(batch_ids, (len(queries), len(batch_ids)))], axis=1)
+            if scores.shape[1] > limit:
+                top = np.argpartition(-scores, limit - 1, axis=1)[:, :limit]
+                scores = np.take_along_axis(scores, top, axis=1)
+                chunk_ids = np.take_along_axis(chunk_ids, top, axis=1)
+            best_scores, best_ids = scores, chunk_ids
+
+        results = []
+        for scores, row_ids in zip(best_scores, best_ids):
+            order = np.argsort(-scores)
+            results.append([
+                (int(row_ids[i]), float(scores[i]))
+                for i in order
+                if np.isfinite(scores[i])
+            ])
+        return results
+
+
+KINDS = {
+    "jobs": (JobPosting, job_features),
+    "candidates": (CandidateProfile, candidate_features),
+}
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def _store(kind):
+    with _stores_lock:
+        if kind not in _stores:
+            _stores[kind] = VectorStore(settings.VECTOR_INDEX_DIR, kind, settings.VECTOR_INDEX_DIM)
+        return _stores[kind]
+
+
+def get_vector_store(kind):
+    """The store for "jobs" or "candidates", built from the database if it does not exist yet."""
+    store = _store(kind)
+    if not store.exists():
+        rebuild_vector_store(kind)
+    return store
+
+
+def vectorize(kind, instance):
+    return hash_features(KINDS[kind][1](instance), settings.VECTOR_INDEX_DIM)
+
+
+def index_row(kind, instance):
+    """Appends the vector of a saved row; a no-op until the store has been built."""
+    _store(kind).append(instance.pk, vectorize(kind, instance))
+
+
+def unindex_row(kind, row_id):
+    """Removes a deleted row from searches; a no-op until the store has been built."""
+    _store(kind).remove(row_id)
+
+
+def rebuild_vector_store(kind):
+    """Recomputes every vector of a kind from the database. Returns the number of rows."""
+    model, _ = KINDS[kind]
+    rows = ((row.pk, vectorize(kind, row)) for row in model.objects.order_by("pk").iterator(chunk_size=1000))
+    return _store(kind).replace_all(rows)
+
+
+def similar(kind, instance, limit, exclude_ids=()):
+    """The `limit` rows of `kind` most similar to a candidate or job posting instance."""
+    source_kind = "jobs" if isinstance(instance, JobPosting) else "candidates"
+    query = vectorize(source_kind, instance)
+    return get_vector_store(kind).search(query, limit, exclude_ids)[0]
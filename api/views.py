@@ -1,17 +1,150 @@
+import hashlib
+import json
 from rest_framework import status
-from rest_framework.viewsets import ViewSet
+from adrf.viewsets import ViewSet
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.conf import settings
-import os
-from django.core.files.storage import default_storage
-from api.models import CandidateProfile, JobPosting, JobMatch
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank
+from django.db.models import Count, F, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from asgiref.sync import sync_to_async
+from api.models import (
+    CandidateProfile, JobPosting, JobMatch, ResumeParseTask, Skill, CandidateSkill, JobSkill, match_fingerprint,
+    TEXT_SEARCH_CONFIG
+)
 from api.serializers import *
-from api.services import parse_resume, match_candidate_to_job, generate_cover_letter, parse_job_posting
+from api.services import (
+    aparse_resume, aparse_job_posting, amatch_candidate_to_job, amatch_many, amatch_candidate_to_jobs,
+    agenerate_cover_letter, build_match, asave_matches, candidate_fields
+)
+from api.cache import hash_uploaded_file, resume_text_cache, resume_parse_cache
+from api.llm_client import LLMUnavailableError
+from api.sandbox import SandboxLimitExceeded
+from api.skill_index import get_skill_index
+from api.skills import canonicalize_skills
+from api.vector_index import similar
+from api import precompute
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+def llm_unavailable_response(error):
+    """503 response for an LLM outage, passing on when to retry."""
+    headers = {"Retry-After": str(int(error.retry_after) + 1)} if error.retry_after else None
+    return Response({"error": str(error)}, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers=headers)
+
+def query_limit(request, default):
+    """The positive integer `limit` query parameter, or default."""
+    try:
+        return max(1, int(request.query_params.get("limit", default)))
+    except ValueError:
+        return default
+
+def similar_response(results, model, serializer_class, key):
+    """Serializes (row_id, similarity) search results, loading the rows in one query."""
+    rows = model.objects.in_bulk([row_id for row_id, _ in results])
+    return Response([
+        {key: serializer_class(rows[row_id]).data, "similarity": round(similarity, 4)}
+        for row_id, similarity in results
+        if row_id in rows
+    ])
+
+class SearchPagination(PageNumberPagination):
+    page_size = settings.SEARCH_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.SEARCH_MAX_PAGE_SIZE
+
+class JobListPagination(CursorPagination):
+    # Newest first; the primary key is unique and indexed, so every page is a range scan
+    ordering = "-id"
+    page_size = settings.JOB_LIST_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = settings.JOB_LIST_MAX_PAGE_SIZE
+
+# Lookups behind the `mode` parameter of the skill searches: rows with all
+# of the skills (jsonb @>) or with any of them (jsonb ?|), both served by
+# the fields' GIN indexes
+SKILL_SEARCH_LOOKUPS = {"all": "contains", "any": "has_any_keys"}
+
+skill_search_parameters = [
+    openapi.Parameter('skills', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True,
+                      description='Comma-separated skills, e.g. Python,Kubernetes; synonyms are canonicalized'),
+    openapi.Parameter('mode', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=list(SKILL_SEARCH_LOOKUPS),
+                      description='all (default): rows with every skill; any: rows with at least one'),
+    openapi.Parameter('page', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Page number'),
+    openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Results per page'),
+]
+
+def skill_search_response(request, view, queryset, field, serializer_class):
+    """A page of the rows whose `field` skill list has all or any of the requested skills, with a count."""
+    skills = canonicalize_skills([
+        skill.strip()
+        for value in request.query_params.getlist("skills")
+        for skill in value.split(",")
+        if skill.strip()
+    ])
+    if not skills:
+        return Response({"error": "skills is required"}, status=status.HTTP_400_BAD_REQUEST)
+    mode = request.query_params.get("mode", "all")
+    if mode not in SKILL_SEARCH_LOOKUPS:
+        return Response({"error": "mode must be all or any"}, status=status.HTTP_400_BAD_REQUEST)
+
+    queryset = queryset.filter(**{f"{field}__{SKILL_SEARCH_LOOKUPS[mode]}": skills})
+    paginator = SearchPagination()
+    page = paginator.paginate_queryset(queryset, request, view=view)
+    return paginator.get_paginated_response(serializer_class(page, many=True).data)
+
+text_search_parameters = [
+    openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True,
+                      description='Search terms in web search syntax: "quoted phrase", -excluded, a or b'),
+    openapi.Parameter('page', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Page number'),
+    openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description='Results per page'),
+]
+
+def text_search_response(request, view, model, serializer_class, key, headline_text):
+    """
+    A page of the rows whose search_vector matches the `q` parameter, best
+    ranked first, each with a highlighted excerpt of headline_text. Matching
+    and counting use the GIN index; headlines are only built for the page.
+    """
+    terms = request.query_params.get("q", "").strip()
+    if not terms:
+        return Response({"error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+    query = SearchQuery(terms, search_type="websearch", config=TEXT_SEARCH_CONFIG)
+    ranked = (
+        model.objects.filter(search_vector=query)
+        .annotate(rank=SearchRank(F("search_vector"), query))
+        .order_by("-rank", "-id")
+        .values_list("id", "rank")
+    )
+    paginator = SearchPagination()
+    page = paginator.paginate_queryset(ranked, request, view=view)
+
+    rows = (
+        model.objects.defer("search_vector")
+        .annotate(headline=SearchHeadline(
+            headline_text, query, config=TEXT_SEARCH_CONFIG, start_sel="<mark>", stop_sel="</mark>",
+            max_fragments=settings.TEXT_SEARCH_HEADLINE_FRAGMENTS
+        ))
+        .in_bulk([row_id for row_id, _ in page])
+    )
+    return paginator.get_paginated_response([
+        {key: serializer_class(rows[row_id]).data, "rank": round(rank, 4), "headline": rows[row_id].headline}
+        for row_id, rank in page
+        if row_id in rows
+    ])
+
+def link_count(through):
+    """The number of through rows linking each skill, counted from the (skill, row) index."""
+    counts = through.objects.filter(skill=OuterRef("pk")).order_by().values("skill").annotate(count=Count("*"))
+    return Coalesce(Subquery(counts.values("count")), 0)
+
 class CandidateProfileViewSet(ViewSet):
     queryset = CandidateProfile.objects.all()
     parser_classes = [MultiPartParser]
@@ -24,7 +157,13 @@ class CandidateProfileViewSet(ViewSet):
                 openapi.IN_FORM,
                 type=openapi.TYPE_FILE,
                 required=True,
-                description='Resume file in PDF or DOCX format'
+                description='Resume file in PDF, DOCX, ODT, RTF, HTML or TXT format'
+            ),
+            openapi.Parameter(
+                'async',
+                openapi.IN_QUERY,
+                type=openapi.TYPE_BOOLEAN,
+                description='Store the file and parse it in the background; answers 202 with a task to poll'
             )
         ],
         responses={
@@ -42,47 +181,166 @@ class CandidateProfileViewSet(ViewSet):
                     }
                 }
             ),
-            400: 'Bad Request'
+            202: ResumeParseTaskSerializer,
+            400: 'Bad Request',
+            422: 'Resume took too long or too much memory to process',
+            503: 'LLM API unavailable'
         }
     )
     @action(detail=False, methods=["post"])
-    def upload_resume(self, request):
+    async def upload_resume(self, request):
         upload_serializer = ResumeUploadSerializer(data=request.data)
         
         if not upload_serializer.is_valid():
             return Response(upload_serializer.errors, status=400)
             
         file = request.FILES["resume_file"]
-        
-        # Save the file first
-        path = default_storage.save(f"resumes/{file.name}", file)
-        
+
+        # Hash the contents so repeat uploads of the same file hit the cache
+        content_hash = await sync_to_async(hash_uploaded_file)(file)
+
+        if str(request.query_params.get("async", "")).lower() in ("1", "true"):
+            # Store the file and leave parsing to the process_resume_tasks workers
+            task = ResumeParseTask(file_format=upload_serializer.validated_data["file_format"], content_hash=content_hash)
+            await sync_to_async(task.resume_file.save)(file.name, file, save=False)
+            await task.asave()
+            status_url = request.build_absolute_uri(
+                reverse("candidateprofile-upload-status", kwargs={"task_id": task.id})
+            )
+            return Response(
+                {**ResumeParseTaskSerializer(task).data, "status_url": status_url},
+                status=status.HTTP_202_ACCEPTED,
+                headers={"Location": status_url}
+            )
+
         try:
-            # Get absolute path to the file for parsing
-            full_path = os.path.join(settings.MEDIA_ROOT, path)
-            
-            # Parse the resume
-            parsed_data = parse_resume(full_path)
-            
-            # Create the candidate profile
-            candidate = CandidateProfile(
-                name=parsed_data.get('name', ''),
-                email=parsed_data.get('email', ''),
-                phone=parsed_data.get('phone', ''),
-                skills=parsed_data.get('skills', []),
-                education=parsed_data.get('education', []),
-                work_experience=parsed_data.get('work_experience', []),
-                resume_file=path
-                # Remove created_at - it will be automatically set
+            # Parse straight from the upload; it is only stored once parsing succeeds
+            parsed_data = await aparse_resume(
+                file,
+                content_hash=content_hash,
+                file_format=upload_serializer.validated_data["file_format"]
             )
-            candidate.save()
-            
-            return Response(CandidateProfileSerializer(candidate).data, status=201)
+        except LLMUnavailableError as e:
+            return llm_unavailable_response(e)
+        except SandboxLimitExceeded as e:
+            # The file was too expensive to parse: killed for time or memory
+            return Response({"error": f"Could not process resume: {str(e)}"}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
         except Exception as e:
-            # Clean up the file if parsing fails
-            default_storage.delete(path)
             return Response({"error": str(e)}, status=400)
 
+        # Create the candidate profile
+        candidate = CandidateProfile(**candidate_fields(parsed_data), resume_hash=content_hash)
+        await sync_to_async(candidate.resume_file.save)(file.name, file, save=False)
+        try:
+            await candidate.asave()
+        except Exception:
+            await sync_to_async(candidate.resume_file.delete)(save=False)
+            raise
+
+        precompute.enqueue_candidate(candidate.id)
+        return Response(CandidateProfileSerializer(candidate).data, status=201)
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Progress of a resume uploaded with async=true: its status (queued, running, done or failed), "
+            "the stage reached (extracting, parsing or saving) and, once done, the new candidate's ID"
+        ),
+        responses={200: ResumeParseTaskSerializer, 404: 'Not Found'}
+    )
+    @action(detail=False, methods=["get"], url_path=r"upload_status/(?P<task_id>\d+)")
+    async def upload_status(self, request, task_id=None):
+        try:
+            task = await ResumeParseTask.objects.aget(id=task_id)
+        except ResumeParseTask.DoesNotExist:
+            return Response({"error": "Task not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ResumeParseTaskSerializer(task).data)
+
+    @swagger_auto_schema(
+        operation_description="Hit/miss counters of the resume text and parse caches in this process",
+        responses={200: 'Cache statistics'}
+    )
+    @action(detail=False, methods=["get"])
+    def cache_stats(self, request):
+        return Response({
+            "text": resume_text_cache.stats(),
+            "parsed": resume_parse_cache.stats(),
+        })
+
+    @swagger_auto_schema(
+        operation_description="Job postings most similar to the candidate's profile, from the local vector index",
+        manual_parameters=[
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description='Number of jobs to return'),
+        ],
+        responses={200: 'Jobs with a cosine similarity', 404: 'Not Found'}
+    )
+    @action(detail=True, methods=["get"])
+    def similar_jobs(self, request, pk=None):
+        try:
+            candidate = CandidateProfile.objects.get(pk=pk)
+        except (CandidateProfile.DoesNotExist, ValueError):
+            return Response({"error": "Candidate not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        results = similar("jobs", candidate, query_limit(request, settings.VECTOR_SEARCH_LIMIT))
+        return similar_response(results, JobPosting, JobPostingSerializer, "job")
+
+    @swagger_auto_schema(
+        operation_description="Job postings that require the most of the candidate's skills, from the skill tables",
+        manual_parameters=[
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description='Number of jobs to return'),
+        ],
+        responses={200: 'Jobs with the skills they share with the candidate', 404: 'Not Found'}
+    )
+    @action(detail=True, methods=["get"])
+    def shared_skill_jobs(self, request, pk=None):
+        try:
+            candidate = CandidateProfile.objects.get(pk=pk)
+        except (CandidateProfile.DoesNotExist, ValueError):
+            return Response({"error": "Candidate not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        skill_ids = CandidateSkill.objects.filter(candidate=candidate).values("skill_id")
+        shared = JobSkill.objects.filter(skill_id__in=skill_ids)
+        ranking = list(
+            shared.values("job_id").annotate(count=Count("*"))
+            .order_by("-count", "-job_id")[:query_limit(request, settings.SKILL_RANK_LIMIT)]
+        )
+        job_ids = [row["job_id"] for row in ranking]
+        jobs = JobPosting.objects.in_bulk(job_ids)
+        names = {}
+        for job_id, name in shared.filter(job_id__in=job_ids).order_by("skill__name").values_list("job_id", "skill__name"):
+            names.setdefault(job_id, []).append(name)
+        return Response([
+            {"job": JobPostingSerializer(jobs[row["job_id"]]).data, "shared_skills": names.get(row["job_id"], [])}
+            for row in ranking
+            if row["job_id"] in jobs
+        ])
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Full-text search over candidates' names, skills, work experience, education and resume text, "
+            "best matches first, with a highlighted excerpt"
+        ),
+        manual_parameters=text_search_parameters,
+        responses={200: 'count, next, previous and a page of candidates with rank and headline',
+                   400: 'Bad Request', 404: 'Invalid page'}
+    )
+    @action(detail=False, methods=["get"])
+    def text_search(self, request):
+        # Candidates saved before resume text was kept are excerpted from their work experience
+        headline_text = Coalesce(NullIf("resume_text", Value("")), Cast("work_experience", TextField()))
+        return text_search_response(request, self, CandidateProfile, CandidateProfileSerializer, "candidate", headline_text)
+
+    @swagger_auto_schema(
+        operation_description="Candidates with all (or any) of the given skills, newest first",
+        manual_parameters=skill_search_parameters,
+        responses={200: 'count, next, previous and a page of candidates', 400: 'Bad Request', 404: 'Invalid page'}
+    )
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        queryset = CandidateProfile.objects.order_by("-created_at", "-id")
+        return skill_search_response(request, self, queryset, "skills", CandidateProfileSerializer)
+
 class JobPostingViewSet(ViewSet):
     queryset = JobPosting.objects.all()
     serializer_class = JobPostingSerializer
@@ -92,13 +350,27 @@ class JobPostingViewSet(ViewSet):
         return self.serializer_class(*args, **kwargs)
 
     @swagger_auto_schema(
-        operation_description="List all job postings",
+        operation_description=(
+            "List job postings, newest first, a page at a time. Responses carry an ETag; "
+            "send it back in If-None-Match to get a 304 while the page is unchanged."
+        ),
+        manual_parameters=[
+            openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description='Opaque cursor from the next or previous link'),
+            openapi.Parameter('page_size', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description='Job postings per page'),
+            openapi.Parameter('fields', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description='Comma-separated fields to return, e.g. title,company,required_skills; id is always included'),
+        ],
         responses={
+            304: 'Not Modified',
+            400: 'Bad Request',
             200: openapi.Response(
-                description="List of job postings",
+                description="A page of job postings",
                 examples={
                     "application/json": {
-                        "count": 2,
+                        "next": "http://localhost:8000/api/jobs/?cursor=cD0y",
+                        "previous": None,
                         "results": [
                             {
                                 "id": 1,
@@ -121,9 +393,38 @@ class JobPostingViewSet(ViewSet):
         }
     )
     def list(self, request):
-        """List all job postings."""
-        serializer = self.get_serializer(self.queryset, many=True)
-        return Response(serializer.data)
+        """List job postings a page at a time."""
+        fields = None
+        if request.query_params.get("fields"):
+            readable = [name for name, field in self.get_serializer().fields.items() if not field.write_only]
+            fields = list(dict.fromkeys(["id"] + [name.strip() for name in request.query_params["fields"].split(",") if name.strip()]))
+            unknown = [name for name in fields if name not in readable]
+            if unknown:
+                return Response(
+                    {"error": f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(readable)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        # The page is found and validated from narrow rows first, so a 304 never loads descriptions
+        paginator = JobListPagination()
+        page = paginator.paginate_queryset(
+            JobPosting.objects.only("id", "content_fingerprint", "updated_at"), request, view=self
+        )
+        etag = quote_etag(hashlib.sha256(json.dumps(
+            [request.get_full_path(), [(job.id, job.content_fingerprint, job.updated_at.isoformat()) for job in page]]
+        ).encode("utf-8")).hexdigest())
+        # No Last-Modified: deleting a posting changes the page without raising any row's updated_at
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            queryset = JobPosting.objects.all() if fields is None else JobPosting.objects.only(*fields)
+            rows = queryset.in_bulk([job.id for job in page])
+            serializer = self.get_serializer([rows[job.id] for job in page if job.id in rows], many=True, fields=fields)
+            response = paginator.get_paginated_response(serializer.data)
+        for header, value in headers.items():
+            response[header] = value
+        return response
 
     @swagger_auto_schema(
     request_body=openapi.Schema(
@@ -138,7 +439,7 @@ class JobPostingViewSet(ViewSet):
     )
     )
     @action(detail=False, methods=['post'])
-    def create_from_text(self, request, *args, **kwargs):
+    async def create_from_text(self, request, *args, **kwargs):
         """Accept unstructured job posting text and parse it with LLM."""
         
         job_text = request.data.get("job_text", "").strip()
@@ -148,21 +449,120 @@ class JobPostingViewSet(ViewSet):
 
         try:
             # Pass unstructured job text to LLM for parsing
-            structured_data = parse_job_posting(job_text)  # Call LLM function here
+            structured_data = await aparse_job_posting(job_text)  # Call LLM function here
             
             # Ensure structured_data contains required fields
-            job_posting = JobPosting.objects.create(
+            job_posting = await JobPosting.objects.acreate(
                 title=structured_data.get("title", "Untitled"),
                 company=structured_data.get("company", "Unknown"),
                 required_skills=structured_data.get("required_skills", []),
                 description=structured_data.get("description", job_text)
             )
+            precompute.enqueue_job(job_posting.id)
 
             return Response(JobPostingSerializer(job_posting).data, status=status.HTTP_201_CREATED)
 
+        except LLMUnavailableError as e:
+            return llm_unavailable_response(e)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @swagger_auto_schema(
+        operation_description="Candidates most similar to the job posting, from the local vector index",
+        manual_parameters=[
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description='Number of candidates to return'),
+        ],
+        responses={200: 'Candidates with a cosine similarity', 404: 'Not Found'}
+    )
+    @action(detail=True, methods=["get"])
+    def similar_candidates(self, request, pk=None):
+        try:
+            job = JobPosting.objects.get(pk=pk)
+        except (JobPosting.DoesNotExist, ValueError):
+            return Response({"error": "Job posting not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        results = similar("candidates", job, query_limit(request, settings.VECTOR_SEARCH_LIMIT))
+        return similar_response(results, CandidateProfile, CandidateProfileSerializer, "candidate")
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Full-text search over job postings' titles, skills, companies and descriptions, "
+            "best matches first, with a highlighted excerpt of the description"
+        ),
+        manual_parameters=text_search_parameters,
+        responses={200: 'count, next, previous and a page of job postings with rank and headline',
+                   400: 'Bad Request', 404: 'Invalid page'}
+    )
+    @action(detail=False, methods=["get"])
+    def text_search(self, request):
+        return text_search_response(request, self, JobPosting, JobPostingSerializer, "job", "description")
+
+    @swagger_auto_schema(
+        operation_description="Job postings requiring all (or any) of the given skills, newest first",
+        manual_parameters=skill_search_parameters,
+        responses={200: 'count, next, previous and a page of job postings', 400: 'Bad Request', 404: 'Invalid page'}
+    )
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        queryset = JobPosting.objects.order_by("-id")
+        return skill_search_response(request, self, queryset, "required_skills", JobPostingSerializer)
+
+class SkillViewSet(ViewSet):
+    queryset = Skill.objects.all()
+
+    @swagger_auto_schema(
+        operation_description="Skills with the number of job postings and candidates listing each, most linked first",
+        manual_parameters=[
+            openapi.Parameter('order_by', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=["jobs", "candidates"],
+                              description='jobs (default): most demanded first; candidates: most common first'),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description='Number of skills to return'),
+        ],
+        responses={200: SkillSerializer(many=True), 400: 'Bad Request'}
+    )
+    def list(self, request):
+        order_by = request.query_params.get("order_by", "jobs")
+        if order_by not in ("jobs", "candidates"):
+            return Response({"error": "order_by must be jobs or candidates"}, status=status.HTTP_400_BAD_REQUEST)
+        skills = (
+            Skill.objects.annotate(job_count=link_count(JobSkill), candidate_count=link_count(CandidateSkill))
+            .order_by(f"-{order_by[:-1]}_count", "name")[:query_limit(request, settings.SKILL_RANK_LIMIT)]
+        )
+        return Response(SkillSerializer(skills, many=True).data)
+
+    def linked_rows(self, request, pk, queryset, serializer_class):
+        """A page of the rows linked to a skill, newest first."""
+        if not Skill.objects.filter(pk=pk).exists():
+            return Response({"error": "Skill not found"}, status=status.HTTP_404_NOT_FOUND)
+        paginator = SearchPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(serializer_class(page, many=True).data)
+
+    @swagger_auto_schema(
+        operation_description="Candidates who list the skill, newest first",
+        responses={200: 'count, next, previous and a page of candidates', 404: 'Not Found'}
+    )
+    @action(detail=True, methods=["get"])
+    def candidates(self, request, pk=None):
+        try:
+            queryset = CandidateProfile.objects.filter(skill_links=pk).order_by("-created_at", "-id")
+        except ValueError:
+            return Response({"error": "Skill not found"}, status=status.HTTP_404_NOT_FOUND)
+        return self.linked_rows(request, pk, queryset, CandidateProfileSerializer)
+
+    @swagger_auto_schema(
+        operation_description="Job postings that require the skill, newest first",
+        responses={200: 'count, next, previous and a page of job postings', 404: 'Not Found'}
+    )
+    @action(detail=True, methods=["get"])
+    def jobs(self, request, pk=None):
+        try:
+            queryset = JobPosting.objects.filter(skill_links=pk).order_by("-id")
+        except ValueError:
+            return Response({"error": "Skill not found"}, status=status.HTTP_404_NOT_FOUND)
+        return self.linked_rows(request, pk, queryset, JobPostingSerializer)
+
 class JobMatchViewSet(ViewSet):
     queryset = JobMatch.objects.all()
     serializer_class = JobMatchSerializer
@@ -174,33 +574,296 @@ class JobMatchViewSet(ViewSet):
             properties={
                 'candidate_id': openapi.Schema(type=openapi.TYPE_INTEGER, description='ID of the candidate'),
                 'job_id': openapi.Schema(type=openapi.TYPE_INTEGER, description='ID of the job posting'),
+                'force': openapi.Schema(type=openapi.TYPE_BOOLEAN,
+                                        description='Score the pair again even if neither row has changed'),
             },
         ),
-        responses={200: JobMatchSerializer, 404: 'Not Found'}
+        responses={200: JobMatchSerializer, 201: JobMatchSerializer, 404: 'Not Found'}
     )
     @action(detail=False, methods=["post"])
-    def match(self, request):
+    async def match(self, request):
         try:
-            candidate = CandidateProfile.objects.get(id=request.data["candidate_id"])
-            job = JobPosting.objects.get(id=request.data["job_id"])
+            candidate = await CandidateProfile.objects.aget(id=request.data["candidate_id"])
+            job = await JobPosting.objects.aget(id=request.data["job_id"])
+            force = str(request.data.get("force", "")).lower() in ("1", "true")
+
+            # Neither row has changed since this pair was last scored: reuse that result
+            fingerprint = match_fingerprint(candidate, job)
+            if not force:
+                match = await JobMatch.objects.select_related("candidate", "job").filter(
+                    candidate=candidate, job=job, fingerprint=fingerprint
+                ).afirst()
+                if match is not None:
+                    return Response(JobMatchSerializer(match).data, status=status.HTTP_200_OK)
 
             # Serialize data before sending to LLM
-            candidate_data = CandidateProfileSerializer(candidate).data
-            job_data = JobPostingSerializer(job).data
+            candidate_data = CandidateProfilePromptSerializer(candidate).data
+            job_data = JobPostingPromptSerializer(job).data
 
             # Call LLM
-            match_data = match_candidate_to_job(candidate_data, job_data)
+            match_data = await amatch_candidate_to_job(candidate_data, job_data, force)
+            scored = build_match(candidate, job, match_data)
 
-            match = JobMatch.objects.create(candidate=candidate, job=job, **match_data)
-            return Response(JobMatchSerializer(match).data, status=status.HTTP_201_CREATED)
+            match, created = await JobMatch.objects.aupdate_or_create(
+                candidate=candidate, job=job, fingerprint=fingerprint,
+                defaults={
+                    "match_score": scored.match_score,
+                    "missing_skills": scored.missing_skills,
+                    "summary": scored.summary,
+                }
+            )
+            # An updated row is fetched without its relations; reuse the loaded ones
+            match.candidate, match.job = candidate, job
+            return Response(
+                JobMatchSerializer(match).data,
+                status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+            )
         
         except CandidateProfile.DoesNotExist:
             return Response({"error": "Candidate not found"}, status=status.HTTP_404_NOT_FOUND)
         except JobPosting.DoesNotExist:
             return Response({"error": "Job posting not found"}, status=status.HTTP_404_NOT_FOUND)
+        except LLMUnavailableError as e:
+            return llm_unavailable_response(e)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @swagger_auto_schema(
+        operation_description=(
+            "Match one candidate with many job postings (candidate_id and job_ids), or one job posting "
+            "with many candidates (job_id and candidate_ids). The LLM calls run concurrently and each "
+            "result is streamed back as a line of JSON as soon as it is ready, ending with a summary line."
+        ),
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'candidate_id': openapi.Schema(type=openapi.TYPE_INTEGER, description='ID of the candidate'),
+                'job_ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                                          description='IDs of the job postings to match the candidate with'),
+                'job_id': openapi.Schema(type=openapi.TYPE_INTEGER, description='ID of the job posting'),
+                'candidate_ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                                                description='IDs of the candidates to match with the job posting'),
+                'concurrency': openapi.Schema(type=openapi.TYPE_INTEGER,
+                                              description='Maximum LLM calls in flight, up to BULK_MATCH_CONCURRENCY'),
+                'force': openapi.Schema(type=openapi.TYPE_BOOLEAN,
+                                        description='Score every pair again, including unchanged pairs that were scored before'),
+            },
+        ),
+        responses={
+            200: openapi.Response(
+                description="Newline-delimited JSON, one line per pair in the order they finish",
+                examples={
+                    "application/x-ndjson": (
+                        '{"candidate_id": 1, "job_id": 4, "match_score": 82, "missing_skills": ["Docker"], "summary": "..."}\n'
+                        '{"candidate_id": 1, "job_id": 9, "error": "Job posting not found"}\n'
+                        '{"done": true, "matched": 1, "failed": 1}\n'
+                    )
+                }
+            ),
+            400: 'Bad Request',
+            404: 'Not Found'
+        }
+    )
+    @action(detail=False, methods=["post"])
+    async def bulk_match(self, request):
+        candidate_id = request.data.get("candidate_id")
+        job_id = request.data.get("job_id")
+        if bool(candidate_id) == bool(job_id):
+            return Response(
+                {"error": "Provide either candidate_id with job_ids, or job_id with candidate_ids"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        target_key = "job_ids" if candidate_id else "candidate_ids"
+        try:
+            target_ids = list(dict.fromkeys(int(target_id) for target_id in request.data.get(target_key) or []))
+        except (TypeError, ValueError):
+            return Response({"error": f"{target_key} must be a list of IDs"}, status=status.HTTP_400_BAD_REQUEST)
+        if not target_ids:
+            return Response({"error": f"{target_key} is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(target_ids) > settings.BULK_MATCH_MAX_PAIRS:
+            return Response(
+                {"error": f"At most {settings.BULK_MATCH_MAX_PAIRS} {target_key} per request"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            concurrency = int(request.data.get("concurrency") or settings.BULK_MATCH_CONCURRENCY)
+        except (TypeError, ValueError):
+            concurrency = settings.BULK_MATCH_CONCURRENCY
+        concurrency = max(1, min(concurrency, settings.BULK_MATCH_CONCURRENCY))
+        force = str(request.data.get("force", "")).lower() in ("1", "true")
+
+        try:
+            if candidate_id:
+                candidate = await CandidateProfile.objects.aget(id=candidate_id)
+                jobs = {job.id: job async for job in JobPosting.objects.filter(id__in=target_ids)}
+                pairs = [(candidate, jobs[target_id]) for target_id in target_ids if target_id in jobs]
+                missing = [
+                    {"candidate_id": candidate.id, "job_id": target_id, "error": "Job posting not found"}
+                    for target_id in target_ids if target_id not in jobs
+                ]
+            else:
+                job = await JobPosting.objects.aget(id=job_id)
+                candidates = {candidate.id: candidate async for candidate in CandidateProfile.objects.filter(id__in=target_ids)}
+                pairs = [(candidates[target_id], job) for target_id in target_ids if target_id in candidates]
+                missing = [
+                    {"candidate_id": target_id, "job_id": job.id, "error": "Candidate not found"}
+                    for target_id in target_ids if target_id not in candidates
+                ]
+        except (CandidateProfile.DoesNotExist, JobPosting.DoesNotExist, ValueError):
+            error = "Candidate not found" if candidate_id else "Job posting not found"
+            return Response({"error": error}, status=status.HTTP_404_NOT_FOUND)
+
+        return StreamingHttpResponse(
+            self.stream_matches(pairs, missing, concurrency, batch_jobs=bool(candidate_id), force=force),
+            content_type="application/x-ndjson"
+        )
+
+    async def stream_matches(self, pairs, missing, concurrency, batch_jobs=False, force=False):
+        """
+        Yields one JSON line per pair as its LLM call finishes. Unless force
+        is set, pairs already scored with unchanged rows are answered from
+        the stored JobMatch first. With batch_jobs, all pairs share one
+        candidate and its jobs are scored several per call (see
+        services.match_candidate_to_jobs). Matches are saved with bulk_create
+        every BULK_MATCH_FLUSH_SIZE results, and the rest when the stream ends
+        or the client disconnects.
+        """
+        for line in missing:
+            yield json.dumps(line) + "\n"
+
+        matched = 0
+        if not force and pairs:
+            fingerprints = [match_fingerprint(candidate, job) for candidate, job in pairs]
+            stored = {
+                (match.candidate_id, match.job_id, match.fingerprint): match
+                async for match in JobMatch.objects.filter(
+                    candidate_id__in={candidate.id for candidate, _ in pairs},
+                    job_id__in={job.id for _, job in pairs},
+                    fingerprint__in=fingerprints,
+                )
+            }
+            unscored = []
+            for (candidate, job), fingerprint in zip(pairs, fingerprints):
+                match = stored.get((candidate.id, job.id, fingerprint))
+                if match is None:
+                    unscored.append((candidate, job))
+                    continue
+                matched += 1
+                yield self.match_line(match)
+            pairs = unscored
+
+        # Serialize each row once; the shared side of the pairs is the same object
+        serialized = {}
+
+        def data(row, serializer_class):
+            key = (type(row), row.id)
+            if key not in serialized:
+                serialized[key] = serializer_class(row).data
+            return serialized[key]
+
+        pair_data = [
+            (data(candidate, CandidateProfilePromptSerializer), data(job, JobPostingPromptSerializer))
+            for candidate, job in pairs
+        ]
+
+        pending = []
+        failed = len(missing)
+        try:
+            if batch_jobs and pair_data:
+                results = amatch_candidate_to_jobs(pair_data[0][0], [job for _, job in pair_data], concurrency, force)
+            else:
+                results = amatch_many(pair_data, concurrency, force)
+            async for index, match_data, error in results:
+                candidate, job = pairs[index]
+                try:
+                    if error:
+                        raise error
+                    match = build_match(candidate, job, match_data)
+                except Exception as e:
+                    failed += 1
+                    yield json.dumps({"candidate_id": candidate.id, "job_id": job.id, "error": str(e) or type(e).__name__}) + "\n"
+                    continue
+
+                pending.append(match)
+                matched += 1
+                yield self.match_line(match)
+                if len(pending) >= settings.BULK_MATCH_FLUSH_SIZE:
+                    await asave_matches(pending)
+                    pending = []
+        finally:
+            if pending:
+                await asave_matches(pending)
+        yield json.dumps({"done": True, "matched": matched, "failed": failed}) + "\n"
+
+    def match_line(self, match):
+        return json.dumps({
+            "candidate_id": match.candidate_id,
+            "job_id": match.job_id,
+            "match_score": match.match_score,
+            "missing_skills": match.missing_skills,
+            "summary": match.summary,
+        }) + "\n"
+
+    def ranked_response(self, ranking, model, serializer_class, key):
+        """Attaches the ranked rows, loaded in one query, to their skill overlap scores."""
+        rows = model.objects.in_bulk([match.id for match in ranking])
+        return Response([
+            {
+                key: serializer_class(rows[match.id]).data,
+                "score": match.score,
+                "matched_skills": match.matched_skills,
+                "missing_skills": match.missing_skills,
+            }
+            for match in ranking
+            if match.id in rows
+        ])
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Rank all job postings for a candidate by skill overlap, without calling the LLM. "
+            "Score is the percentage of the job's required skills the candidate has."
+        ),
+        manual_parameters=[
+            openapi.Parameter('candidate_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True,
+                              description='ID of the candidate'),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description='Number of jobs to return'),
+        ],
+        responses={200: 'Jobs with score, matched_skills and missing_skills', 404: 'Not Found'}
+    )
+    @action(detail=False, methods=["get"])
+    def rank_jobs(self, request):
+        try:
+            candidate = CandidateProfile.objects.get(id=request.query_params.get("candidate_id"))
+        except (CandidateProfile.DoesNotExist, ValueError):
+            return Response({"error": "Candidate not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        ranking = get_skill_index().rank_jobs(candidate.skills, limit=query_limit(request, settings.SKILL_RANK_LIMIT))
+        return self.ranked_response(ranking, JobPosting, JobPostingSerializer, "job")
+
+    @swagger_auto_schema(
+        operation_description=(
+            "Rank all candidates for a job posting by skill overlap, without calling the LLM. "
+            "Score is the percentage of the job's required skills each candidate has."
+        ),
+        manual_parameters=[
+            openapi.Parameter('job_id', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True,
+                              description='ID of the job posting'),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description='Number of candidates to return'),
+        ],
+        responses={200: 'Candidates with score, matched_skills and missing_skills', 404: 'Not Found'}
+    )
+    @action(detail=False, methods=["get"])
+    def rank_candidates(self, request):
+        try:
+            job = JobPosting.objects.get(id=request.query_params.get("job_id"))
+        except (JobPosting.DoesNotExist, ValueError):
+            return Response({"error": "Job posting not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        ranking = get_skill_index().rank_candidates(job.required_skills, limit=query_limit(request, settings.SKILL_RANK_LIMIT))
+        return self.ranked_response(ranking, CandidateProfile, CandidateProfileSerializer, "candidate")
+
 class CoverLetterViewSet(ViewSet):
     queryset = CoverLetter.objects.all()
     serializer_class = CoverLetterSerializer
@@ -212,6 +875,7 @@ class CoverLetterViewSet(ViewSet):
             properties={
                 'candidate_id': openapi.Schema(type=openapi.TYPE_INTEGER, description='ID of the candidate'),
                 'job_id': openapi.Schema(type=openapi.TYPE_INTEGER, description='ID of the job posting'),
+                'regenerate': openapi.Schema(type=openapi.TYPE_BOOLEAN, description='Generate a new letter instead of reusing a cached one'),
             },
             required=['candidate_id', 'job_id']
         ),
@@ -233,7 +897,7 @@ class CoverLetterViewSet(ViewSet):
         }
     )
     @action(detail=False, methods=["post"])
-    def generate_cover_letter(self, request):
+    async def generate_cover_letter(self, request):
         try:
             candidate_id = request.data.get('candidate_id')
             job_id = request.data.get('job_id')
@@ -245,21 +909,22 @@ class CoverLetterViewSet(ViewSet):
                 )
 
             # Get candidate and job objects
-            candidate = CandidateProfile.objects.get(id=candidate_id)
-            job = JobPosting.objects.get(id=job_id)
+            candidate = await CandidateProfile.objects.aget(id=candidate_id)
+            job = await JobPosting.objects.aget(id=job_id)
 
             # Serialize the data before sending to LLM
-            candidate_data = CandidateProfileSerializer(candidate).data
-            job_data = JobPostingSerializer(job).data
+            candidate_data = CandidateProfilePromptSerializer(candidate).data
+            job_data = JobPostingPromptSerializer(job).data
 
             # Generate cover letter using LLM with serialized data
-            cover_letter_text = generate_cover_letter(
+            cover_letter_text = await agenerate_cover_letter(
                 candidate_data,
-                job_data
+                job_data,
+                regenerate=str(request.data.get('regenerate', '')).lower() in ('1', 'true')
             )
 
             # Create and save the cover letter
-            cover_letter = CoverLetter.objects.create(
+            cover_letter = await CoverLetter.objects.acreate(
                 candidate=candidate,
                 job=job,
                 content=cover_letter_text
@@ -280,6 +945,8 @@ class CoverLetterViewSet(ViewSet):
                 {"error": "Job posting not found"}, 
                 status=status.HTTP_404_NOT_FOUND
             )
+        except LLMUnavailableError as e:
+            return llm_unavailable_response(e)
         except Exception as e:
             return Response(
                 {"error": str(e)}, 
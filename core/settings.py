@@ -95,6 +95,88 @@ DATABASES = {
 
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Extracted text and parsed data of uploaded resumes, keyed by file hash
+    'resumes': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'resumes',
+        'TIMEOUT': int(os.environ.get('RESUME_CACHE_TIMEOUT', 60 * 60 * 24)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('RESUME_CACHE_MAX_ENTRIES', 1000)),
+        },
+    },
+}
+
+# Backend for cached LLM responses: 'locmem', 'file', 'db' or 'dummy' (off).
+# The 'db' backend needs its table created with `python manage.py createcachetable`.
+LLM_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'llm',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 5000)),
+        },
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('LLM_CACHE_DIR', os.path.join(BASE_DIR, '.cache', 'llm')),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 5000)),
+        },
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'llm_cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 5000)),
+        },
+    },
+    'dummy': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+}
+CACHES['llm'] = LLM_CACHE_BACKENDS[os.environ.get('LLM_CACHE_BACKEND', 'locmem')]
+
+# Seconds to keep cached responses for each LLM function; 0 or a missing
+# entry turns caching off for that function.
+LLM_CACHE_TTL = {
+    'parse_resume': 60 * 60 * 24 * 7,
+    'parse_job_posting': 60 * 60 * 24 * 7,
+    'match_candidate_to_job': 60 * 60 * 24,
+    'match_candidate_to_jobs': 60 * 60 * 24,
+    'generate_cover_letter': 60 * 60 * 24,
+}
+
+
+# Resume text extraction
+# Uploads larger than this are rejected
+RESUME_MAX_UPLOAD_BYTES = int(os.environ.get('RESUME_MAX_UPLOAD_BYTES', 10 * 1024 * 1024))
+# PDFs with more pages than this are rejected before extraction
+PDF_REJECT_PAGES = int(os.environ.get('PDF_REJECT_PAGES', 100))
+# Pages checked for a text layer before rejecting a PDF as image-only
+PDF_PRECHECK_SAMPLE_PAGES = int(os.environ.get('PDF_PRECHECK_SAMPLE_PAGES', 3))
+# Only the first PDF_MAX_PAGES pages of a PDF are read
+PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', 10))
+# Text extracted from a resume of any format is cut off after RESUME_MAX_CHARS characters
+RESUME_MAX_CHARS = int(os.environ.get('RESUME_MAX_CHARS', 50000))
+# PDFs with more than PDF_PAGES_PER_TASK pages are split across the extraction workers
+PDF_PAGES_PER_TASK = int(os.environ.get('PDF_PAGES_PER_TASK', 2))
+# Sandboxed worker processes that run all document parsing. A job that runs
+# longer than EXTRACTION_TIMEOUT seconds or grows its worker past
+# EXTRACTION_MAX_RSS_MB is killed, and workers are replaced after
+# EXTRACTION_MAX_JOBS_PER_WORKER jobs.
+EXTRACTION_WORKERS = int(os.environ.get('EXTRACTION_WORKERS', 4))
+EXTRACTION_TIMEOUT = float(os.environ.get('EXTRACTION_TIMEOUT', 20.0))
+EXTRACTION_MAX_RSS_MB = int(os.environ.get('EXTRACTION_MAX_RSS_MB', 512))
+EXTRACTION_MAX_JOBS_PER_WORKER = int(os.environ.get('EXTRACTION_MAX_JOBS_PER_WORKER', 50))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -152,4 +234,106 @@ SWAGGER_SETTINGS = {
     }
 }
 
-OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
\ No newline at end of file
+OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
+OPENAI_MODEL = os.environ.get('OPENAI_MODEL', 'gpt-4o-mini')
+
+# Backend behind call_llm: 'openai' (live), 'record' (live, appending every
+# request/response pair to LLM_RECORDINGS_PATH) or 'replay' (answer from
+# LLM_RECORDINGS_PATH only, no network)
+LLM_BACKEND = os.environ.get('LLM_BACKEND', 'openai')
+LLM_RECORDINGS_PATH = os.environ.get('LLM_RECORDINGS_PATH', os.path.join(BASE_DIR, 'llm_recordings.jsonl'))
+
+# Resilience of LLM API calls (see api/llm_client.py). The rate limits apply
+# per process, so set them to each process's share of the account limits;
+# 0 disables a limit.
+LLM_REQUESTS_PER_MINUTE = int(os.environ.get('LLM_REQUESTS_PER_MINUTE', 500))
+LLM_TOKENS_PER_MINUTE = int(os.environ.get('LLM_TOKENS_PER_MINUTE', 200000))
+# Completion tokens assumed per call when reserving tokens-per-minute capacity
+LLM_COMPLETION_TOKENS_ESTIMATE = int(os.environ.get('LLM_COMPLETION_TOKENS_ESTIMATE', 500))
+LLM_MAX_RETRIES = int(os.environ.get('LLM_MAX_RETRIES', 4))
+# Backoff before retry n is a random delay up to min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2**n)
+LLM_BACKOFF_BASE = float(os.environ.get('LLM_BACKOFF_BASE', 1.0))
+LLM_BACKOFF_MAX = float(os.environ.get('LLM_BACKOFF_MAX', 30.0))
+# Per-call timeouts in seconds, with overrides for slower functions
+LLM_TIMEOUT = float(os.environ.get('LLM_TIMEOUT', 60.0))
+LLM_TIMEOUTS = {
+    'generate_cover_letter': 90.0,
+    'match_candidate_to_jobs': 120.0,
+}
+# Open the circuit after this many consecutive failures and retry after the reset timeout
+LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('LLM_CIRCUIT_FAILURE_THRESHOLD', 5))
+LLM_CIRCUIT_RESET_TIMEOUT = float(os.environ.get('LLM_CIRCUIT_RESET_TIMEOUT', 30.0))
+# Skill overlap ranking (api/skill_index.py)
+# The in-process index is rebuilt from the database when older than this many
+# seconds, to pick up changes made by other processes
+SKILL_INDEX_TTL = float(os.environ.get('SKILL_INDEX_TTL', 300))
+# Default number of jobs or candidates returned by the ranking endpoints
+SKILL_RANK_LIMIT = int(os.environ.get('SKILL_RANK_LIMIT', 20))
+# Canonical skills and their synonyms (api/skills.py)
+SKILL_TAXONOMY_PATH = os.environ.get('SKILL_TAXONOMY_PATH', str(BASE_DIR / 'api' / 'data' / 'skills.json'))
+
+# Local vector retrieval (api/vector_index.py)
+VECTOR_INDEX_DIR = os.environ.get('VECTOR_INDEX_DIR', str(BASE_DIR / '.cache' / 'vectors'))
+# Hash buckets per vector; changing it requires python manage.py rebuild_vector_index
+VECTOR_INDEX_DIM = int(os.environ.get('VECTOR_INDEX_DIM', 2048))
+# Default number of results from the similar_jobs and similar_candidates endpoints
+VECTOR_SEARCH_LIMIT = int(os.environ.get('VECTOR_SEARCH_LIMIT', 10))
+
+# Bulk matching (JobMatchViewSet.bulk_match)
+# Maximum LLM calls in flight per request; clients may ask for fewer
+BULK_MATCH_CONCURRENCY = int(os.environ.get('BULK_MATCH_CONCURRENCY', 10))
+# Maximum job postings or candidates per request
+BULK_MATCH_MAX_PAIRS = int(os.environ.get('BULK_MATCH_MAX_PAIRS', 200))
+# Matches are written with one bulk insert per this many results
+BULK_MATCH_FLUSH_SIZE = int(os.environ.get('BULK_MATCH_FLUSH_SIZE', 20))
+# Jobs scored for one candidate in a single match_candidate_to_jobs call:
+# batches are filled until the estimated prompt plus completion tokens reach
+# the budget, or until the job limit
+MULTI_MATCH_TOKEN_BUDGET = int(os.environ.get('MULTI_MATCH_TOKEN_BUDGET', 8000))
+MULTI_MATCH_MAX_JOBS = int(os.environ.get('MULTI_MATCH_MAX_JOBS', 20))
+# Completion tokens assumed per job in a batch
+MULTI_MATCH_COMPLETION_TOKENS_PER_JOB = int(os.environ.get('MULTI_MATCH_COMPLETION_TOKENS_PER_JOB', 120))
+# Job descriptions are cut to this many characters in the compact job summaries
+MULTI_MATCH_DESCRIPTION_CHARS = int(os.environ.get('MULTI_MATCH_DESCRIPTION_CHARS', 600))
+
+# Background match precomputation (api/precompute.py)
+# Score new candidates and job postings against their nearest rows in worker
+# threads of the web process; python manage.py precompute_matches does the
+# same work from the command line. Off by default: each upload or new job
+# posting then costs up to MATCH_PRECOMPUTE_LIMIT LLM scorings
+MATCH_PRECOMPUTE = os.environ.get('MATCH_PRECOMPUTE', 'false').lower() in ('1', 'true', 'yes')
+# Most similar rows of the other kind scored for each new row
+MATCH_PRECOMPUTE_LIMIT = int(os.environ.get('MATCH_PRECOMPUTE_LIMIT', 10))
+# Precompute tasks running at once, i.e. the most LLM calls they keep in flight
+MATCH_PRECOMPUTE_WORKERS = int(os.environ.get('MATCH_PRECOMPUTE_WORKERS', 2))
+
+# Asynchronous resume uploads (api/resume_tasks.py)
+# Seconds a worker holds a claimed task before another worker may take it over
+RESUME_TASK_VISIBILITY_TIMEOUT = int(os.environ.get('RESUME_TASK_VISIBILITY_TIMEOUT', 300))
+# Attempts per task; failed attempts are retried after RESUME_TASK_RETRY_DELAY * 2**(attempt - 1) seconds
+RESUME_TASK_MAX_ATTEMPTS = int(os.environ.get('RESUME_TASK_MAX_ATTEMPTS', 3))
+RESUME_TASK_RETRY_DELAY = float(os.environ.get('RESUME_TASK_RETRY_DELAY', 10))
+# Seconds an idle worker waits before checking for new tasks
+RESUME_TASK_POLL_INTERVAL = float(os.environ.get('RESUME_TASK_POLL_INTERVAL', 1))
+
+# Offline LLM batches (api/llm_batch.py)
+# Where python manage.py llm_batch submits request files: 'openai' (the Batch
+# API, results within 24 hours at batch pricing) or 'local' (runs the batch
+# at once through LLM_BACKEND, for tests)
+LLM_BATCH_BACKEND = os.environ.get('LLM_BATCH_BACKEND', 'openai')
+# Input and result files of local batches
+LLM_BATCH_DIR = os.environ.get('LLM_BATCH_DIR', os.path.join(BASE_DIR, '.cache', 'batches'))
+
+# Skill searches (CandidateProfileViewSet.search, JobPostingViewSet.search)
+# Results per page by default, and the most a client may ask for with page_size
+SEARCH_PAGE_SIZE = int(os.environ.get('SEARCH_PAGE_SIZE', 20))
+SEARCH_MAX_PAGE_SIZE = int(os.environ.get('SEARCH_MAX_PAGE_SIZE', 100))
+
+# Job posting list (JobPostingViewSet.list): cursor pages of this many
+# postings by default, and the most a client may ask for with page_size
+JOB_LIST_PAGE_SIZE = int(os.environ.get('JOB_LIST_PAGE_SIZE', 50))
+JOB_LIST_MAX_PAGE_SIZE = int(os.environ.get('JOB_LIST_MAX_PAGE_SIZE', 200))
+
+# Full-text search (text_search endpoints), paged like the skill searches
+# Highlighted excerpts in each result's headline
+TEXT_SEARCH_HEADLINE_FRAGMENTS = int(os.environ.get('TEXT_SEARCH_HEADLINE_FRAGMENTS', 2))
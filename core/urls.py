@@ -24,7 +24,7 @@ from django.contrib.staticfiles.urls import static, staticfiles_urlpatterns
 from django.urls import include
 import os
 from dotenv import load_dotenv
-from api.views import CandidateProfileViewSet, JobPostingViewSet, JobMatchViewSet, CoverLetterViewSet
+from api.views import CandidateProfileViewSet, JobPostingViewSet, JobMatchViewSet, CoverLetterViewSet, SkillViewSet
 
 
 load_dotenv()
@@ -45,6 +45,7 @@ router.register("candidates", CandidateProfileViewSet)
 router.register("jobs", JobPostingViewSet)
 router.register("matches", JobMatchViewSet)
 router.register("coverletters", CoverLetterViewSet, basename='coverletter')
+router.register("skills", SkillViewSet)
 re_path(
     r'^swagger(?P<format>\.json|\.yaml)$',
     schema_view.without_ui(cache_timeout=0),
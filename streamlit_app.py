@@ -32,12 +32,31 @@ page = st.sidebar.radio(
 # API base URL
 API_BASE_URL = "http://localhost:8000/api"
 
+# Fields of the job list; descriptions are only fetched when asked for
+JOB_LIST_FIELDS = "title,company,required_skills"
+
+def get_with_etag(url, params=None):
+    """
+    GET a URL, revalidating the last response for it with If-None-Match so an
+    unchanged page comes back as an empty 304. Returns (status_code, data).
+    """
+    cache = st.session_state.setdefault("etag_cache", {})
+    key = (url, tuple(sorted((params or {}).items())))
+    cached = cache.get(key)
+    headers = {"If-None-Match": cached["etag"]} if cached else {}
+    response = requests.get(url, params=params, headers=headers)
+    if response.status_code == 304 and cached:
+        return 200, cached["data"]
+    if response.status_code == 200 and response.headers.get("ETag"):
+        cache[key] = {"etag": response.headers["ETag"], "data": response.json()}
+    return response.status_code, response.json() if response.status_code == 200 else None
+
 def upload_resume_page():
     st.title("📄 Upload Resume")
     st.write("Upload your resume to be parsed and matched with jobs")
     
     # File uploader
-    uploaded_file = st.file_uploader("Choose a resume file", type=["pdf", "docx"])
+    uploaded_file = st.file_uploader("Choose a resume file", type=["pdf", "docx", "odt", "rtf", "html", "htm", "txt"])
     
     if uploaded_file:
         
@@ -115,13 +134,22 @@ def add_job_page():
     # Section 1: List All Jobs
     st.subheader("Available Job Postings")
     
+    show_descriptions = st.checkbox("Show descriptions")
+    # The job list is paged with cursors; the URL of the page being shown is kept across reruns
+    page_url = st.session_state.get("jobs_page_url") or f"{API_BASE_URL}/jobs/"
+    fields = JOB_LIST_FIELDS + (",description" if show_descriptions else "")
+
     with st.spinner("Loading job postings..."):
         try:
-            # Fetch all jobs from the API
-            response = requests.get(f"{API_BASE_URL}/jobs/")
-            
-            if response.status_code == 200:
-                jobs = response.json()
+            # next/previous links repeat the fields they were made with; the last fields parameter wins
+            status_code, page_data = get_with_etag(page_url, {"fields": fields})
+            if status_code == 400 and "cursor=" in page_url:
+                # A stale cursor; start again from the first page
+                st.session_state.jobs_page_url = None
+                status_code, page_data = get_with_etag(f"{API_BASE_URL}/jobs/", {"fields": fields})
+
+            if status_code == 200:
+                jobs = page_data["results"]
                 
                 if jobs and len(jobs) > 0:
                     # Create a table/list of jobs
@@ -141,12 +169,23 @@ def add_job_page():
                                 st.write("No specific skills listed")
                             
                             # Display job description
-                            st.write("**Description:**")
-                            st.write(job.get('description', 'No description available'))
+                            if show_descriptions:
+                                st.write("**Description:**")
+                                st.write(job.get('description', 'No description available'))
+
+                    previous_column, next_column = st.columns(2)
+                    with previous_column:
+                        if page_data.get("previous") and st.button("← Newer"):
+                            st.session_state.jobs_page_url = page_data["previous"]
+                            st.rerun()
+                    with next_column:
+                        if page_data.get("next") and st.button("Older →"):
+                            st.session_state.jobs_page_url = page_data["next"]
+                            st.rerun()
                 else:
                     st.info("No job postings available yet. Add one below!")
             else:
-                st.error(f"⚠️ Could not load job postings. Status code: {response.status_code}")
+                st.error(f"⚠️ Could not load job postings. Status code: {status_code}")
                 
         except requests.exceptions.RequestException as e:
             st.error(f"🚨 Error connecting to server: {str(e)}")
@@ -337,7 +376,11 @@ def match_jobs_page():
                     try:
                         cover_letter_response = requests.post(
                             f"{API_BASE_URL}/coverletters/generate_cover_letter/",
-                            json={"candidate_id": candidate_id, "job_id": job_id}
+                            json={
+                                "candidate_id": candidate_id,
+                                "job_id": job_id,
+                                "regenerate": st.session_state.pop('regenerate_cover_letter', False)
+                            }
                         )
                         
                         if cover_letter_response.status_code in [200, 201]:
@@ -388,7 +431,8 @@ def match_jobs_page():
                         st.error(f"🚨 Error connecting to server: {str(e)}")
                 
                 # Add a button to regenerate the cover letter if needed
-                if st.button("Regenerate Cover Letter", key="regenerate_cover_letter"):
+                if st.button("Regenerate Cover Letter", key="regenerate_cover_letter_button"):
+                    st.session_state.regenerate_cover_letter = True
                     st.rerun()
 
 # Main content based on navigation